@@ -0,0 +1,200 @@
+"""
+export.py
+=========
+
+Streaming‑Export der Signale als NDJSON, CSV, Arrow IPC oder Parquet.
+Die Zeilen werden blockweise über einen serverseitigen Cursor gelesen und
+sofort serialisiert, sodass der Speicherbedarf unabhängig von der Größe
+des Exports konstant bleibt. Arrow und Parquet benötigen ``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..db import crud
+from ..db.database import SessionLocal
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+Chunks = Iterable[List[Dict[str, Any]]]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Nicht serialisierbar: {type(value).__name__}")
+
+
+def _ndjson(chunks: Chunks, fields: Sequence[str]) -> Iterator[bytes]:
+    for rows in chunks:
+        lines = [
+            json.dumps(row, default=_json_default, ensure_ascii=False) for row in rows
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return value
+
+
+def _csv(chunks: Chunks, fields: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for rows in chunks:
+        writer.writerows([_csv_value(row[field]) for field in fields] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Schreibbares Dateiobjekt, dessen Inhalt blockweise abgeholt wird.
+
+    ``pyarrow`` verlangt eine Datei als Ziel; die geschriebenen Bytes
+    werden hier gesammelt und nach jedem Batch an den Client gestreamt.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(fields: Sequence[str]):
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "created_at": pa.timestamp("us"),
+        "score": pa.float64(),
+        "sentiment_label": pa.string(),
+        "sentiment_score": pa.float64(),
+        "events": pa.list_(pa.string()),
+        "article.id": pa.int64(),
+        "article.url": pa.string(),
+        "article.title": pa.string(),
+        "article.authors": pa.string(),
+        "article.text": pa.string(),
+        "article.published_at": pa.timestamp("us"),
+        "article.created_at": pa.timestamp("us"),
+    }
+    return pa.schema([(field, types[field]) for field in fields])
+
+
+def _arrow(chunks: Chunks, fields: Sequence[str], parquet: bool) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema(fields)
+    sink = _ChunkSink()
+    if parquet:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in chunks:
+            batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+            if parquet:
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def arrow_available() -> bool:
+    """Prüft, ob ``pyarrow`` für Arrow‑ und Parquet‑Exporte installiert ist."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_signals(
+    fields: Sequence[str],
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event: Optional[str] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Liefert den Export der Signale als Byte‑Blöcke.
+
+    Der Generator öffnet eine eigene Session, da er erst nach dem Ende des
+    Request‑Handlers abgearbeitet wird. Es wird bewusst keine Session aus
+    der ``scoped_session`` verwendet, weil der Thread zwischen zwei Blöcken
+    wechseln kann.
+
+    Args:
+        fields: Zu exportierende Felder aus ``crud.SIGNAL_FIELDS``.
+        fmt: Eines von ``ndjson``, ``csv``, ``arrow`` oder ``parquet``.
+        start: Nur Signale ab diesem Zeitpunkt.
+        end: Nur Signale vor diesem Zeitpunkt.
+        event: Nur Signale mit dieser Ereigniskategorie.
+        chunk_size: Anzahl Zeilen pro Block.
+
+    Yields:
+        Serialisierte Blöcke im gewünschten Format.
+    """
+    db = SessionLocal.session_factory()
+    try:
+        chunks = crud.iter_signal_rows(
+            db, fields, start=start, end=end, event=event, chunk_size=chunk_size
+        )
+        if fmt == "ndjson":
+            yield from _ndjson(chunks, fields)
+        elif fmt == "csv":
+            yield from _csv(chunks, fields)
+        elif fmt in ("arrow", "parquet"):
+            yield from _arrow(chunks, fields, parquet=fmt == "parquet")
+        else:
+            raise ValueError(f"Unbekanntes Format: {fmt}")
+    finally:
+        db.close()
@@ -5,97 +5,247 @@ main.py
 Definiert die FastAPI‑Anwendung für das Frühindikator‑Tool. Die API
 ermöglicht das Starten der Dateningestion, die Verarbeitung einzelner
 Artikel sowie den Abruf gespeicherter Signale.
+
+Ingestion und Verarbeitung laufen als Celery‑Tasks; die Endpoints legen
+nur einen Auftrag an und liefern dessen ID, deren Fortschritt unter
+``/jobs/{job_id}`` abgefragt werden kann.
+
+Die lesenden Endpunkte ``/signals`` und ``/signals/aggregate`` sind
+asynchron und nutzen die asynchrone Engine aus :mod:`src.db.database`;
+sie belegen während der Abfrage keinen Thread des Threadpools.
 """
 
 from __future__ import annotations
 
+import base64
+import binascii
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
-from ..db import crud
-from ..db.database import get_db
+from .. import metrics, profiling
+from ..db import async_crud, crud
+from ..db.database import get_async_db, get_db
 from ..db.models import Base, Article, Signal
-from ..ingestion.rss_fetcher import fetch_rss_feed
-from ..ingestion.article_processor import download_article
-from ..nlp.pipeline import process_text
-from ..nlp.events import classify_events
-from ..scoring.scoring import heuristic_score
-from . import schemas
+from ..jobs import get_job_store
+from . import export, schemas
 
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Economic Signals API")
+if profiling.PROFILE_ENABLED:
+    app.middleware("http")(profiling.profile_request)
 
 
-@app.post("/refresh", summary="Aktualisiert die Datenbasis")
-def refresh_data(db=Depends(get_db)) -> dict:
-    """Lädt neue Artikel aus vordefinierten Feeds und verarbeitet sie.
+@app.post(
+    "/refresh",
+    summary="Aktualisiert die Datenbasis",
+    status_code=202,
+    response_model=schemas.JobOut,
+)
+def refresh_data() -> schemas.JobOut:
+    """Startet den Abruf und die Verarbeitung neuer Artikel im Hintergrund.
 
-    In einer produktiven Umgebung sollte diese Funktion als asynchroner
-    Task umgesetzt werden. Hier erfolgt die Verarbeitung synchron und
-    dient lediglich als Prototyp.
+    Der Endpoint legt nur einen Auftrag an und reiht ``refresh_task`` ein;
+    der Fortschritt ist unter ``/jobs/{job_id}`` abrufbar.
     """
-    feed_urls = [
-        "https://www.handelsblatt.com/rss",
-        "https://www.faz.net/rss/aktuell/",  # Beispiele; in Produktion konfigurieren
-    ]
-    processed = 0
-    for url in feed_urls:
-        for entry in fetch_rss_feed(url):
-            if crud.get_article_by_url(db, entry.link):
-                continue  # bereits verarbeitet
-            article_content = download_article(entry.link)
-            article = crud.create_article(
-                db=db,
-                url=article_content.url,
-                title=article_content.title,
-                authors=", ".join(article_content.authors),
-                text=article_content.text,
-                published_at=article_content.publish_date,
-            )
-            nlp_result = process_text(article.text)
-            events = classify_events(article.text)
-            score = heuristic_score(nlp_result["sentiment"], events)
-            crud.create_signal(
-                db=db,
-                article=article,
-                sentiment_label=nlp_result["sentiment"][0]["label"],
-                sentiment_score=float(nlp_result["sentiment"][0]["score"]),
-                events=events,
-                score=score,
-            )
-            processed += 1
-    return {"processed": processed}
-
-
-@app.post("/process/{article_id}", response_model=schemas.SignalOut)
-def process_article(article_id: int, db=Depends(get_db)) -> schemas.SignalOut:
-    """Verarbeitet einen existierenden Artikel erneut und erstellt ein neues Signal."""
-    article = db.query(Article).get(article_id)
-    if not article:
+    from ..tasks import refresh_task
+
+    job_id = get_job_store().create("refresh")
+    refresh_task.delay(job_id=job_id)
+    return schemas.JobOut(job_id=job_id, status="queued")
+
+
+@app.post("/process/{article_id}", status_code=202, response_model=schemas.JobOut)
+def process_article(
+    article_id: int, request: Request, db=Depends(get_db)
+) -> schemas.JobOut:
+    """Verarbeitet einen existierenden Artikel erneut und erstellt ein neues Signal.
+
+    Die Verarbeitung läuft als ``process_article_task`` im Hintergrund.
+    Mit dem Header ``X-Profile: 1`` wird auch der Task profiliert.
+    """
+    exists = db.query(Article.id).filter(Article.id == article_id).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Artikel nicht gefunden")
-    nlp_result = process_text(article.text)
-    events = classify_events(article.text)
-    score = heuristic_score(nlp_result["sentiment"], events)
-    signal = crud.create_signal(
-        db=db,
-        article=article,
-        sentiment_label=nlp_result["sentiment"][0]["label"],
-        sentiment_score=float(nlp_result["sentiment"][0]["score"]),
-        events=events,
-        score=score,
-    )
-    return schemas.SignalOut.from_orm(signal)
+    from ..tasks import process_article_task
+
+    job_id = get_job_store().create("process", blocks_total=1)
+    headers = {"profile": "1"} if profiling.requested(request.headers) else None
+    process_article_task.apply_async((article_id,), {"job_id": job_id}, headers=headers)
+    return schemas.JobOut(job_id=job_id, status="queued")
+
+
+@app.get("/jobs/{job_id}", response_model=schemas.JobStatus)
+def get_job(job_id: str) -> schemas.JobStatus:
+    """Liefert Status und Fortschritt eines Auftrags."""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Auftrag nicht gefunden")
+    return schemas.JobStatus(**job)
+
+
+@app.get("/profiles", response_model=List[schemas.ProfileInfo])
+def list_profiles(
+    limit: int = 20, kind: Optional[str] = None
+) -> List[schemas.ProfileInfo]:
+    """Listet die langsamsten gespeicherten Profile (``PROFILE_ENABLED=1``)."""
+    if not profiling.PROFILE_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling ist deaktiviert")
+    return [
+        schemas.ProfileInfo(**vars(record))
+        for record in profiling.list_profiles(limit=limit, kind=kind)
+    ]
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """Liefert die Prometheus‑Metriken im Textformat."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+def _encode_cursor(created_at: datetime, signal_id: int) -> str:
+    """Kodiert ``(created_at, id)`` eines Signals als URL‑sicheren Cursor."""
+    raw = f"{created_at.isoformat()}|{signal_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
 
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Gegenstück zu :func:`_encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, signal_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(signal_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
 
-@app.get("/signals", response_model=List[schemas.SignalOut])
-def list_signals(
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Zerlegt den Parameter ``fields`` und prüft die Feldnamen."""
+    if not fields:
+        return list(crud.DEFAULT_SIGNAL_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in crud.SIGNAL_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unbekannte Felder: {', '.join(unknown)}"
+        )
+    return selected
+
+
+def _nest(row: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Wandelt ``article.title`` usw. in ein verschachteltes Dict um."""
+    item: Dict[str, Any] = {}
+    for field in fields:
+        if field.startswith("article."):
+            item.setdefault("article", {})[field[len("article.") :]] = row[field]
+        else:
+            item[field] = row[field]
+    return item
+
+
+@app.get(
+    "/signals",
+    response_model=None,
+    responses={200: {"model": List[schemas.SignalSummary]}},
+)
+async def list_signals(
+    response: Response,
     limit: int = 100,
     offset: int = 0,
-    db=Depends(get_db),
-) -> List[schemas.SignalOut]:
-    """Listet gespeicherte Signale mit Paginierung."""
-    signals = crud.list_signals(db, limit=limit, offset=offset)
-    return [schemas.SignalOut.from_orm(sig) for sig in signals]
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db=Depends(get_async_db),
+) -> List[Dict[str, Any]]:
+    """Listet gespeicherte Signale mit Paginierung.
+
+    Ohne ``fields`` wird eine schlanke Darstellung ohne Artikeltext
+    geliefert (``SignalSummary``). Mit ``fields`` lassen sich die Felder
+    gezielt auswählen, z. B. ``fields=id,score,events,article.title``;
+    die Datenbankabfrage liest dann nur diese Spalten.
+
+    Für tiefe Seiten sollte statt ``offset`` der Cursor verwendet werden:
+    Ist eine Seite voll, enthält der Header ``X-Next-Cursor`` den Wert für
+    den Parameter ``cursor`` der nächsten Seite.
+    """
+    selected = _parse_fields(fields)
+    before = _decode_cursor(cursor) if cursor else None
+    rows = await async_crud.list_signal_fields(
+        db, fields=selected, limit=limit, offset=offset, before=before
+    )
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(
+            last["created_at"], last["id"]
+        )
+    return [_nest(row, selected) for row in rows]
+
+
+@app.get("/signals/aggregate", response_model=List[schemas.SignalAggregate])
+async def aggregate_signals(
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_async_db),
+) -> List[schemas.SignalAggregate]:
+    """Liefert Frühindikator‑Kennzahlen je Stunde oder Tag.
+
+    Die Werte stammen aus der Rollup‑Tabelle, die ein periodischer
+    Celery‑Task inkrementell fortschreibt; die jüngsten Minuten sind
+    daher ggf. noch nicht enthalten.
+    """
+    if granularity not in crud.ROLLUP_GRANULARITIES:
+        raise HTTPException(
+            status_code=400, detail="granularity muss 'hour' oder 'day' sein"
+        )
+    rollups = await async_crud.get_rollups(
+        db, granularity=granularity, start=start, end=end
+    )
+    return [
+        schemas.SignalAggregate(
+            bucket_start=rollup.bucket_start,
+            count=rollup.signal_count,
+            mean_score=(
+                rollup.score_sum / rollup.signal_count if rollup.signal_count else 0.0
+            ),
+            sentiment_counts=rollup.sentiment_counts or {},
+            event_counts=rollup.event_counts or {},
+        )
+        for rollup in rollups
+    ]
+
+
+@app.get("/signals/export", summary="Exportiert Signale als Datenstrom")
+def export_signals(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> StreamingResponse:
+    """Streamt alle passenden Signale als NDJSON, CSV, Arrow IPC oder Parquet.
+
+    Die Daten werden blockweise über einen serverseitigen Cursor gelesen,
+    sodass auch Millionen von Zeilen mit konstantem Speicherbedarf
+    exportiert werden können. ``start``/``end`` begrenzen den Zeitraum,
+    ``event`` filtert auf eine Ereigniskategorie.
+    """
+    if format not in export.MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format muss eines von {', '.join(export.MEDIA_TYPES)} sein",
+        )
+    if format in ("arrow", "parquet") and not export.arrow_available():
+        raise HTTPException(
+            status_code=501, detail="Für diesen Export wird pyarrow benötigt"
+        )
+    selected = _parse_fields(fields)
+    return StreamingResponse(
+        export.stream_signals(selected, format, start=start, end=end, event=event),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="signals.{format}"'},
+    )
@@ -9,7 +9,7 @@ Eingaben und Ausgaben der API validiert werden.
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -44,3 +44,68 @@ class SignalOut(SignalBase):
 
     class Config:
         orm_mode = True
+
+
+class ArticleSummary(BaseModel):
+    """Artikel ohne Volltext, für Listen."""
+
+    id: int
+    url: str
+    title: str
+    published_at: Optional[datetime]
+
+
+class SignalSummary(SignalBase):
+    """Standardantwort von ``GET /signals``."""
+
+    id: int
+    article: ArticleSummary
+    created_at: datetime
+
+
+class SignalAggregate(BaseModel):
+    """Kennzahlen der Signale eines Zeitfensters."""
+
+    bucket_start: datetime
+    count: int
+    mean_score: float
+    sentiment_counts: Dict[str, int] = Field(default_factory=dict)
+    event_counts: Dict[str, int] = Field(default_factory=dict)
+
+
+class JobOut(BaseModel):
+    """Antwort beim Start eines asynchronen Auftrags."""
+
+    job_id: str
+    status: str
+
+
+class JobStatus(BaseModel):
+    """Status und Fortschritt eines Auftrags aus ``GET /jobs/{job_id}``."""
+
+    id: str
+    kind: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    feeds_total: int = 0
+    feeds_fetched: int = 0
+    links_found: int = 0
+    articles_downloaded: int = 0
+    duplicates: int = 0
+    articles_processed: int = 0
+    failures: int = 0
+    blocks_total: int = 0
+    blocks_done: int = 0
+
+
+class ProfileInfo(BaseModel):
+    """Metadaten eines gespeicherten Profils."""
+
+    id: str
+    kind: str
+    name: str
+    duration_ms: float
+    started_at: datetime
+    file: str
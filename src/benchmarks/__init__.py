@@ -0,0 +1 @@
+"""Benchmarks für die einzelnen Stufen der Verarbeitungspipeline."""
@@ -0,0 +1,443 @@
+"""
+run.py
+======
+
+Misst den Durchsatz der einzelnen Pipeline‑Stufen auf einem synthetischen
+Korpus: RSS‑Parsing, Ereigniserkennung, NLP‑Verarbeitung, Scoring und den
+Schreibpfad in die Datenbank. Pro Stufe werden Artikel pro Sekunde sowie
+p50‑ und p99‑Latenz je Aufruf ausgegeben. ``classify_events_large`` misst
+die Ereigniserkennung mit einem großen Regelwerk, ``classify_events_scan``
+zum Vergleich eine einfache Teilstring‑Suche über dasselbe Regelwerk.
+
+Die Ergebnisse können als Baseline gespeichert werden; spätere Läufe
+werden damit verglichen und enden mit Exit‑Code 1, wenn eine Stufe um
+mehr als die Toleranz langsamer geworden ist::
+
+    python -m src.benchmarks.run --save-baseline
+    python -m src.benchmarks.run --articles 2000
+
+Ohne ``--real-models`` laufen spaCy und FinBERT über die Ersatzmodelle
+aus :mod:`src.benchmarks.stubs`. Ohne ``--database-url`` wird eine
+temporäre SQLite‑Datenbank verwendet. Die Artikel‑URLs erhalten eine
+Kennung pro Lauf, damit wiederholte Läufe gegen dieselbe Datenbank
+tatsächlich schreiben; die angelegten Zeilen werden danach gelöscht.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import sessionmaker
+
+from ..db import crud, models
+from ..ingestion.article_processor import ArticleContent
+from ..ingestion.rss_fetcher import fetch_rss_feed
+from ..nlp.events import EventMatcher, classify_events
+from ..scoring.scoring import heuristic_score
+from .corpus import (
+    SyntheticArticle,
+    generate_corpus,
+    generate_event_rules,
+    write_feeds,
+)
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_BASELINE = os.getenv("BENCHMARK_BASELINE", "benchmarks/baseline.json")
+# Erlaubte relative Verschlechterung gegenüber der Baseline
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.2"))
+
+STAGES = (
+    "rss_parse",
+    "classify_events",
+    "classify_events_large",
+    "classify_events_scan",
+    "process_text",
+    "process_texts_batch",
+    "heuristic_score",
+    "score_rows",
+    "crud_write",
+    "store_articles",
+)
+
+# Ein Aufruf liefert die Anzahl der darin verarbeiteten Artikel
+Call = Callable[[], int]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Perzentil nach dem Nearest‑Rank‑Verfahren."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure(calls: Iterable[Call]) -> Dict[str, float]:
+    """Führt die Aufrufe nacheinander aus und fasst die Zeiten zusammen.
+
+    Returns:
+        Anzahl Artikel und Aufrufe, Artikel pro Sekunde sowie p50/p99 der
+        Latenz pro Aufruf in Millisekunden.
+    """
+    latencies: List[float] = []
+    items = 0
+    for call in calls:
+        started = time.perf_counter()
+        items += call()
+        latencies.append(time.perf_counter() - started)
+    total = sum(latencies)
+    return {
+        "items": items,
+        "calls": len(latencies),
+        "items_per_sec": items / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def _chunks(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def _rss_calls(paths: Sequence[Path]) -> List[Call]:
+    return [lambda path=path: len(fetch_rss_feed(str(path))) for path in paths]
+
+
+def _each(func: Callable[..., Any], items: Iterable[Any]) -> List[Call]:
+    """Ein Aufruf pro Element, der jeweils einen Artikel zählt."""
+
+    def call(item: Any) -> int:
+        func(*item) if isinstance(item, tuple) else func(item)
+        return 1
+
+    return [lambda item=item: call(item) for item in items]
+
+
+def _keyword_scan(rules: Dict[str, List[str]]) -> Callable[[str], List[str]]:
+    """Teilstring‑Suche pro Schlüsselwort als Vergleich zum Matcher."""
+
+    def classify(text: str) -> List[str]:
+        lowered = text.lower()
+        return [
+            category
+            for category, keywords in rules.items()
+            if any(keyword in lowered for keyword in keywords)
+        ]
+
+    return classify
+
+
+def _process_calls(texts: Sequence[str], batch_size: Optional[int]) -> List[Call]:
+    from ..nlp.pipeline import process_text, process_texts
+
+    if batch_size is None:
+        return _each(process_text, texts)
+    return [
+        lambda chunk=chunk: len(process_texts(chunk))
+        for chunk in _chunks(texts, batch_size)
+    ]
+
+
+def _signal_inputs(
+    articles: Sequence[SyntheticArticle],
+) -> List[Dict[str, Any]]:
+    from .stubs import StubSentimentModel
+
+    sentiments = StubSentimentModel()([article.text for article in articles])
+    return [
+        {"sentiment": [sentiment], "events": classify_events(article.text)}
+        for article, sentiment in zip(articles, sentiments)
+    ]
+
+
+def _score_rows_calls(inputs: Sequence[Dict[str, Any]]) -> List[Call]:
+    from ..scoring.batch import score_rows
+
+    def call() -> int:
+        return len(
+            score_rows(
+                [item["sentiment"][0]["label"] for item in inputs],
+                [item["sentiment"][0]["score"] for item in inputs],
+                [item["events"] for item in inputs],
+            )
+        )
+
+    return [call]
+
+
+def _article_row(article: SyntheticArticle, tag: str) -> Dict[str, Any]:
+    return {
+        "url": f"{article.url}?{tag}",
+        "title": article.title,
+        "authors": "",
+        "text": article.text,
+        "published_at": article.published.replace(tzinfo=None),
+        "minhash": None,
+        "canonical_id": None,
+    }
+
+
+def _crud_calls(
+    session_factory,
+    inputs: Sequence[Dict[str, Any]],
+    articles,
+    batch_size: int,
+    run_id: str,
+) -> List[Call]:
+    def call(chunk: Sequence[int]) -> int:
+        with session_factory() as db:
+            stored = crud.create_articles_bulk(
+                db, [_article_row(articles[i], f"crud={run_id}") for i in chunk]
+            )
+            crud.create_signals_bulk(
+                db,
+                [
+                    {
+                        "article_id": article.id,
+                        "sentiment_label": inputs[i]["sentiment"][0]["label"],
+                        "sentiment_score": inputs[i]["sentiment"][0]["score"],
+                        "events": inputs[i]["events"],
+                        "score": heuristic_score(
+                            inputs[i]["sentiment"], inputs[i]["events"]
+                        ),
+                    }
+                    for article, i in zip(stored, chunk)
+                ],
+            )
+            return len(stored)
+
+    indices = list(range(len(articles)))
+    return [lambda chunk=chunk: call(chunk) for chunk in _chunks(indices, batch_size)]
+
+
+def _store_calls(
+    session_factory,
+    articles: Sequence[SyntheticArticle],
+    batch_size: int,
+    run_id: str,
+) -> List[Call]:
+    from ..refresh import store_articles
+
+    def call(chunk: Sequence[SyntheticArticle]) -> int:
+        contents = [
+            ArticleContent(
+                url=f"{article.url}?store={run_id}",
+                title=article.title,
+                text=article.text,
+                authors=[],
+                publish_date=article.published.replace(tzinfo=None),
+            )
+            for article in chunk
+        ]
+        with session_factory() as db:
+            return len(store_articles(db, contents))
+
+    return [lambda chunk=chunk: call(chunk) for chunk in _chunks(articles, batch_size)]
+
+
+def _cleanup(session_factory, run_id: str) -> None:
+    """Löscht die Artikel eines Laufs samt Signalen, Merkmalen und LSH‑Bändern."""
+    with session_factory() as db:
+        run_articles = select(models.Article.id).where(
+            models.Article.url.like(f"%={run_id}")
+        )
+        for model in (models.Signal, models.ArticleFeatures, models.ArticleLSHBand):
+            db.execute(delete(model).where(model.article_id.in_(run_articles)))
+        # Duplikate zuerst, da sie auf ihren kanonischen Artikel verweisen
+        db.execute(
+            delete(models.Article).where(
+                models.Article.url.like(f"%={run_id}"),
+                models.Article.canonical_id.isnot(None),
+            )
+        )
+        db.execute(delete(models.Article).where(models.Article.url.like(f"%={run_id}")))
+        db.commit()
+
+
+def run_benchmarks(
+    articles: int = 1000,
+    seed: int = 42,
+    database_url: Optional[str] = None,
+    real_models: bool = False,
+    stages: Sequence[str] = STAGES,
+    batch_size: int = 50,
+    keywords: int = 300,
+) -> Dict[str, Dict[str, float]]:
+    """Erzeugt den Korpus und misst die gewählten Stufen.
+
+    Args:
+        articles: Anzahl der synthetischen Artikel.
+        seed: Startwert für den Korpus.
+        database_url: Datenbank für die Schreibstufen; ohne Angabe eine
+            temporäre SQLite‑Datei. Die Tabellen werden bei Bedarf angelegt,
+            die geschriebenen Zeilen am Ende wieder gelöscht.
+        real_models: Die konfigurierten spaCy‑ und FinBERT‑Modelle statt
+            der Ersatzmodelle verwenden.
+        stages: Zu messende Stufen aus ``STAGES``.
+        batch_size: Artikel pro Aufruf für die gebündelten Stufen.
+        keywords: Anzahl der Schlüsselwörter für ``classify_events_large``
+            und ``classify_events_scan``.
+
+    Returns:
+        Pro Stufe die Kennzahlen aus :func:`measure`.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unbekannte Stufen: {sorted(unknown)}")
+    corpus = generate_corpus(articles, seed=seed)
+    texts = [article.text for article in corpus]
+    run_id = uuid.uuid4().hex[:12]
+    results: Dict[str, Dict[str, float]] = {}
+
+    with ExitStack() as stack:
+        workdir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        inputs = _signal_inputs(corpus)
+        engine = create_engine(database_url or f"sqlite:///{workdir / 'bench.db'}")
+        stack.callback(engine.dispose)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        if {"crud_write", "store_articles"} & set(stages):
+            models.Base.metadata.create_all(engine)
+            if database_url:
+                stack.callback(_cleanup, session_factory, run_id)
+
+        if "rss_parse" in stages:
+            paths = write_feeds(corpus, workdir / "feeds")
+            results["rss_parse"] = measure(_rss_calls(paths))
+        if "classify_events" in stages:
+            results["classify_events"] = measure(_each(classify_events, texts))
+        if {"classify_events_large", "classify_events_scan"} & set(stages):
+            rules = generate_event_rules(keywords, seed=seed)
+            if "classify_events_large" in stages:
+                results["classify_events_large"] = measure(
+                    _each(EventMatcher(rules).classify, texts)
+                )
+            if "classify_events_scan" in stages:
+                results["classify_events_scan"] = measure(
+                    _each(_keyword_scan(rules), texts)
+                )
+        if {"process_text", "process_texts_batch"} & set(stages):
+            try:
+                from .stubs import stub_models
+
+                models_context = nullcontext() if real_models else stub_models()
+                with models_context:
+                    if "process_text" in stages:
+                        results["process_text"] = measure(_process_calls(texts, None))
+                    if "process_texts_batch" in stages:
+                        results["process_texts_batch"] = measure(
+                            _process_calls(texts, batch_size)
+                        )
+            except ImportError:
+                logger.warning("spaCy ist nicht installiert; NLP‑Stufen entfallen")
+        if "heuristic_score" in stages:
+            results["heuristic_score"] = measure(
+                _each(
+                    heuristic_score,
+                    [(item["sentiment"], item["events"]) for item in inputs],
+                )
+            )
+        if "score_rows" in stages:
+            results["score_rows"] = measure(_score_rows_calls(inputs))
+        if "crud_write" in stages:
+            results["crud_write"] = measure(
+                _crud_calls(session_factory, inputs, corpus, batch_size, run_id)
+            )
+        if "store_articles" in stages:
+            results["store_articles"] = measure(
+                _store_calls(session_factory, corpus, batch_size, run_id)
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = BENCHMARK_TOLERANCE,
+) -> List[str]:
+    """Vergleicht Ergebnisse mit einer Baseline.
+
+    Returns:
+        Eine Meldung pro Stufe, deren Durchsatz unter oder deren p99‑Latenz
+        über der Toleranz liegt.
+    """
+    regressions = []
+    for stage, current in results.items():
+        reference = baseline.get(stage)
+        if not reference:
+            continue
+        if current["items_per_sec"] < reference["items_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: {current['items_per_sec']:.1f} Artikel/s statt "
+                f"{reference['items_per_sec']:.1f}"
+            )
+        if current["p99_ms"] > reference["p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: p99 {current['p99_ms']:.2f} ms statt "
+                f"{reference['p99_ms']:.2f} ms"
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks der Pipeline‑Stufen.")
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument(
+        "--keywords", type=int, default=300, help="Schlüsselwörter großer Regelwerke"
+    )
+    parser.add_argument("--database-url", help="Standard: temporäre SQLite‑Datei")
+    parser.add_argument(
+        "--real-models", action="store_true", help="Echte Modelle statt Ersatz"
+    )
+    parser.add_argument(
+        "--stages", default=",".join(STAGES), help="Kommagetrennte Stufen"
+    )
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Ergebnis als Baseline sichern"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        articles=args.articles,
+        seed=args.seed,
+        database_url=args.database_url,
+        real_models=args.real_models,
+        stages=[stage.strip() for stage in args.stages.split(",") if stage.strip()],
+        batch_size=args.batch_size,
+        keywords=args.keywords,
+    )
+    print(json.dumps(results, indent=2))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        return 0
+    if not baseline_path.exists():
+        return 0
+    regressions = compare(
+        results, json.loads(baseline_path.read_text()), tolerance=args.tolerance
+    )
+    for message in regressions:
+        print(f"Regression: {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+stubs.py
+========
+
+Kleine lokale Ersatzmodelle, mit denen die NLP‑Stufe ohne heruntergeladene
+Modelle und ohne Netzwerk gemessen werden kann. Sie bilden die
+Schnittstellen von spaCy und der transformers‑Pipeline nach, liefern aber
+nur grobe Ergebnisse; gemessen wird damit der Overhead der Pipeline, nicht
+die Modellinferenz.
+"""
+
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence
+
+from ..nlp import pipeline
+from .corpus import COMPANIES
+
+_NEGATIVE = re.compile(
+    r"warn|verliert|fell|lower|untersuchung|review|schwächer", re.IGNORECASE
+)
+_POSITIVE = re.compile(r"erhöht|raised|recover|merger|übernahme", re.IGNORECASE)
+
+
+class StubSentimentModel:
+    """Lexikonbasiertes Sentiment mit der Aufrufschnittstelle der Pipeline."""
+
+    def __call__(
+        self, texts: Sequence[str], batch_size: int = 1, truncation: bool = True
+    ) -> List[Dict[str, Any]]:
+        results = []
+        for text in texts:
+            negative = len(_NEGATIVE.findall(text))
+            positive = len(_POSITIVE.findall(text))
+            total = negative + positive
+            if total == 0:
+                results.append({"label": "neutral", "score": 0.9})
+            elif negative >= positive:
+                results.append({"label": "negative", "score": negative / total})
+            else:
+                results.append({"label": "positive", "score": positive / total})
+        return results
+
+
+def stub_spacy_model():
+    """Leeres spaCy‑Modell mit Satzsegmentierung und Regel‑NER.
+
+    Die Komponenten heißen wie in den trainierten Modellen ``parser`` und
+    ``ner``, damit die Merkmalsauswahl der Pipeline unverändert greift.
+    """
+    import spacy
+
+    nlp = spacy.blank("xx")
+    nlp.add_pipe("sentencizer", name="parser")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([{"label": "ORG", "pattern": name} for name in COMPANIES])
+    return nlp
+
+
+@contextmanager
+def stub_models() -> Iterator[None]:
+    """Ersetzt die Modelle der NLP‑Pipeline für die Dauer des Blocks."""
+    original = (pipeline.get_spacy_model, pipeline.get_sentiment_model)
+    nlp = stub_spacy_model()
+    sentiment = StubSentimentModel()
+    pipeline.get_spacy_model = lambda: nlp
+    pipeline.get_sentiment_model = lambda: sentiment
+    try:
+        yield
+    finally:
+        pipeline.get_spacy_model, pipeline.get_sentiment_model = original
@@ -4,13 +4,56 @@ celery_app.py
 
 Konfiguriert die Celery‑Anwendung zur asynchronen Ausführung von Tasks.
 Die Anwendung nutzt Redis als Message‑Broker und Backend.
+
+Tasks werden auf drei Queues verteilt:
+
+* ``io`` – Feed‑Abruf und Artikel‑Downloads; wartet überwiegend auf das
+  Netzwerk und läuft daher mit einem Thread‑Pool hoher Parallelität
+  (``celery -A src.tasks worker -Q io -P threads -c 32``).
+* ``cpu`` – NLP‑Verarbeitung; läuft mit Prefork‑Prozessen, etwa einem pro
+  Kern (``celery -A src.tasks worker -Q cpu -P prefork``).
+* ``default`` – Steuerungs‑ und Wartungstasks.
+
+Mit ``PRELOAD_MODELS=1`` lädt der Hauptprozess eines Workers spaCy und
+FinBERT vor dem Forken der Kindprozesse. Die Modellgewichte liegen dann
+nur einmal im Speicher und werden per Copy‑on‑Write mit allen
+Prefork‑Kindern geteilt; jedes Kind stellt lediglich seine Torch‑Threads
+ein und führt einen kurzen Warm‑up‑Lauf aus.
+
+Mit ``METRICS_PORT`` stellt der Hauptprozess eines Workers die
+Prometheus‑Metriken aller Kindprozesse per HTTP bereit; mit
+``METRICS_TEXTFILE`` schreiben die Prozesse sie nach ihren Tasks in eine
+Datei (siehe :mod:`src.metrics`).
 """
 
 from __future__ import annotations
 
+import gc
+import logging
 import os
+from pathlib import Path
+from typing import Optional
 
 from celery import Celery
+from celery.signals import (
+    task_postrun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+)
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"
+# Torch‑Threads pro Kindprozess; ohne Angabe Kerne / Parallelität
+TORCH_NUM_THREADS = os.getenv("TORCH_NUM_THREADS")
+# Datei, die angelegt wird, sobald der Worker bereit ist (z. B. für
+# Health‑Checks in Docker/Kubernetes)
+WORKER_READY_FILE = os.getenv("WORKER_READY_FILE")
+
+# Parallelität des Workers; wird vor dem Forken gesetzt und vererbt
+_worker_concurrency: Optional[int] = None
 
 
 def make_celery_app() -> Celery:
@@ -22,8 +65,107 @@ def make_celery_app() -> Celery:
         backend=backend_url,
         include=["src.tasks"],
     )
-    celery_app.conf.task_routes = {"src.tasks.*": {"queue": "default"}}
+    celery_app.conf.task_default_queue = "default"
+    celery_app.conf.task_routes = {
+        "src.tasks.fetch_feed_task": {"queue": "io"},
+        "src.tasks.download_articles_task": {"queue": "io"},
+        "src.tasks.process_articles_task": {"queue": "cpu"},
+        "src.tasks.process_article_task": {"queue": "cpu"},
+        "src.tasks.train_scorer_task": {"queue": "cpu"},
+        "src.tasks.ml_rescore_task": {"queue": "cpu"},
+        "src.tasks.*": {"queue": "default"},
+    }
+    # Lange NLP‑Tasks nicht vorab an einen Prozess binden, der noch
+    # beschäftigt ist
+    celery_app.conf.worker_prefetch_multiplier = 1
+    # Der Warm‑up in ``worker_process_init`` dauert länger als die
+    # voreingestellten 4 Sekunden
+    celery_app.conf.worker_proc_alive_timeout = float(
+        os.getenv("WORKER_PROC_ALIVE_TIMEOUT", "60")
+    )
+    celery_app.conf.beat_schedule = {
+        "update-signal-rollups": {
+            "task": "src.tasks.rollup_task",
+            "schedule": float(os.getenv("ROLLUP_INTERVAL", "60")),
+        },
+    }
     return celery_app
 
 
 celery_app = make_celery_app()
+
+
+@worker_init.connect
+def preload_models(sender=None, **kwargs) -> None:
+    """Lädt die Modelle im Hauptprozess, bevor die Kindprozesse starten.
+
+    Hier wird bewusst keine Inferenz ausgeführt: Ein im Elternprozess
+    gestarteter OpenMP‑Threadpool ist nach ``fork`` nicht nutzbar.
+    """
+    global _worker_concurrency
+    _worker_concurrency = getattr(sender, "concurrency", None)
+    if not PRELOAD_MODELS:
+        return
+    from .nlp.pipeline import get_sentiment_model, get_spacy_model
+
+    logger.info("Lade NLP‑Modelle vor dem Forken")
+    get_spacy_model()
+    get_sentiment_model()
+    # Bereits geladene Objekte aus der Garbage Collection nehmen, damit
+    # GC‑Läufe in den Kindern die geteilten Seiten nicht beschreiben
+    gc.freeze()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs) -> None:
+    """Stellt die Torch‑Threads ein und wärmt die Modelle im Kindprozess auf."""
+    if not PRELOAD_MODELS:
+        return
+    import torch
+
+    if TORCH_NUM_THREADS:
+        threads = int(TORCH_NUM_THREADS)
+    else:
+        threads = max(1, (os.cpu_count() or 1) // (_worker_concurrency or 1))
+    torch.set_num_threads(threads)
+
+    from .nlp.pipeline import process_texts
+
+    process_texts(["Warm-up: the company raised its guidance."])
+    logger.info("Worker‑Prozess %s bereit (%d Torch‑Threads)", os.getpid(), threads)
+
+
+@worker_ready.connect
+def mark_worker_ready(**kwargs) -> None:
+    """Signalisiert die Bereitschaft über ``WORKER_READY_FILE``."""
+    if WORKER_READY_FILE:
+        Path(WORKER_READY_FILE).write_text(str(os.getpid()), encoding="utf-8")
+
+
+@worker_ready.connect
+def start_metrics_server(**kwargs) -> None:
+    """Startet den HTTP‑Endpunkt für die Metriken unter ``METRICS_PORT``."""
+    from . import metrics
+
+    if metrics.METRICS_PORT:
+        from prometheus_client import start_http_server
+
+        start_http_server(int(metrics.METRICS_PORT), registry=metrics.registry())
+        logger.info("Metriken unter Port %s verfügbar", metrics.METRICS_PORT)
+
+
+@task_postrun.connect
+def export_metrics(**kwargs) -> None:
+    """Schreibt die Metriken nach einem Task, höchstens im eingestellten Takt."""
+    from . import metrics
+
+    metrics.write_textfile()
+
+
+@worker_process_shutdown.connect
+def release_process_metrics(pid=None, **kwargs) -> None:
+    """Entfernt die Live‑Gauges eines beendeten Prefork‑Kindprozesses."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
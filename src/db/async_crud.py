@@ -0,0 +1,77 @@
+"""
+async_crud.py
+=============
+
+Asynchrone Varianten der lesenden Funktionen aus :mod:`src.db.crud` für
+``AsyncSession``. Abfragen, Sortierung und Cursor sind dieselben; die
+Statements werden von den synchronen Funktionen übernommen. Schreibende
+Funktionen gibt es nur synchron, da sie in Celery‑Tasks laufen.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..metrics import timed
+from . import models
+from .crud import (
+    DEFAULT_SIGNAL_FIELDS,
+    _rollups_stmt,
+    _signal_fields_page_stmt,
+)
+
+
+@timed("crud.async.get_article_by_url")
+async def get_article_by_url(db: AsyncSession, url: str) -> Optional[models.Article]:
+    """Sucht einen Artikel anhand seiner URL."""
+    stmt = select(models.Article).where(models.Article.url == url).limit(1)
+    return (await db.scalars(stmt)).first()
+
+
+@timed("crud.async.article_exists")
+async def article_exists(db: AsyncSession, article_id: int) -> bool:
+    """Prüft, ob ein Artikel mit dieser ID existiert."""
+    stmt = select(models.Article.id).where(models.Article.id == article_id)
+    return (await db.scalar(stmt)) is not None
+
+
+@timed("crud.async.get_existing_urls")
+async def get_existing_urls(
+    db: AsyncSession, urls: Iterable[str], chunk_size: int = 1000
+) -> Set[str]:
+    """Wie :func:`src.db.crud.get_existing_urls`."""
+    candidates = list(dict.fromkeys(urls))
+    existing: Set[str] = set()
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start : start + chunk_size]
+        stmt = select(models.Article.url).where(models.Article.url.in_(chunk))
+        existing.update(await db.scalars(stmt))
+    return existing
+
+
+@timed("crud.async.list_signal_fields")
+async def list_signal_fields(
+    db: AsyncSession,
+    fields: Sequence[str] = DEFAULT_SIGNAL_FIELDS,
+    limit: int = 100,
+    offset: int = 0,
+    before: Optional[Tuple[datetime, int]] = None,
+) -> List[Dict[str, Any]]:
+    """Wie :func:`src.db.crud.list_signal_fields`."""
+    stmt = _signal_fields_page_stmt(fields, limit, offset, before)
+    return [dict(row) for row in (await db.execute(stmt)).mappings()]
+
+
+@timed("crud.async.get_rollups")
+async def get_rollups(
+    db: AsyncSession,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[models.SignalRollup]:
+    """Wie :func:`src.db.crud.get_rollups`."""
+    return list(await db.scalars(_rollups_stmt(granularity, start, end)))
@@ -2,24 +2,115 @@
 crud.py
 =======
 
-Stellt grundlegende CRUD‑Operationen für Artikel und Signale bereit.
+Stellt grundlegende CRUD‑Operationen für Artikel, Signale und Feeds bereit.
 Diese Funktionen kapseln die Nutzung des SQLAlchemy‑ORMs.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+from sqlalchemy import case, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
+from ..metrics import timed
 from . import models
 
 
+@timed("crud.get_article_by_url")
 def get_article_by_url(db: Session, url: str) -> Optional[models.Article]:
     """Sucht einen Artikel anhand seiner URL."""
     return db.query(models.Article).filter(models.Article.url == url).first()
 
 
+@timed("crud.get_existing_urls")
+def get_existing_urls(
+    db: Session, urls: Iterable[str], chunk_size: int = 1000
+) -> Set[str]:
+    """Ermittelt, welche der übergebenen URLs bereits gespeichert sind.
+
+    Statt einer Abfrage pro URL wird pro ``chunk_size`` URLs eine einzige
+    ``IN``‑Abfrage gestellt.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        urls: Die zu prüfenden URLs.
+        chunk_size: Maximale Anzahl URLs pro Abfrage.
+
+    Returns:
+        Die Teilmenge der URLs, zu denen bereits ein Artikel existiert.
+    """
+    candidates = list(dict.fromkeys(urls))
+    existing: Set[str] = set()
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start : start + chunk_size]
+        rows = db.query(models.Article.url).filter(models.Article.url.in_(chunk))
+        existing.update(url for (url,) in rows)
+    return existing
+
+
+@timed("crud.get_unprocessed_article_ids")
+def get_unprocessed_article_ids(
+    db: Session, created_before: Optional[datetime] = None, limit: int = 1000
+) -> List[int]:
+    """Sucht kanonische Artikel, zu denen noch kein Signal existiert.
+
+    Solche Artikel bleiben zurück, wenn die Verarbeitung nach dem Speichern
+    fehlschlägt. Über ihre URL werden sie nicht erneut gefunden, da
+    bekannte URLs beim Abruf übersprungen werden.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        created_before: Nur vor diesem Zeitpunkt angelegte Artikel; jüngere
+            werden womöglich gerade verarbeitet.
+        limit: Maximale Anzahl IDs.
+
+    Returns:
+        Die IDs aufsteigend sortiert.
+    """
+    query = db.query(models.Article.id).filter(
+        models.Article.canonical_id.is_(None), ~models.Article.signals.any()
+    )
+    if created_before is not None:
+        query = query.filter(models.Article.created_at < created_before)
+    rows = query.order_by(models.Article.id).limit(limit)
+    return [article_id for (article_id,) in rows]
+
+
+@timed("crud.get_unprocessed_articles")
+def get_unprocessed_articles(
+    db: Session, article_ids: Sequence[int]
+) -> List[models.Article]:
+    """Lädt die Artikel mit diesen IDs, die noch kein Signal haben.
+
+    Damit kann ein Block nach einem Fehler erneut verarbeitet werden, ohne
+    doppelte Signale anzulegen.
+    """
+    if not article_ids:
+        return []
+    return (
+        db.query(models.Article)
+        .filter(models.Article.id.in_(article_ids), ~models.Article.signals.any())
+        .order_by(models.Article.id)
+        .all()
+    )
+
+
+@timed("crud.create_article")
 def create_article(
     db: Session,
     url: str,
@@ -42,6 +133,7 @@ def create_article(
     return article
 
 
+@timed("crud.create_signal")
 def create_signal(
     db: Session,
     article: models.Article,
@@ -64,16 +156,643 @@ def create_signal(
     return signal
 
 
-def list_signals(
+def _insert_ignoring_conflicts(db: Session, model, index_elements: List[str]):
+    """Erzeugt ein INSERT, das Konflikte auf ``index_elements`` überspringt.
+
+    PostgreSQL und SQLite unterstützen ``ON CONFLICT DO NOTHING``; für
+    andere Datenbanken wird ein einfaches INSERT verwendet.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(
+            index_elements=index_elements
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(
+            index_elements=index_elements
+        )
+    return insert(model)
+
+
+@timed("crud.create_articles_bulk")
+def create_articles_bulk(
+    db: Session, rows: Sequence[Dict[str, Any]]
+) -> List[models.Article]:
+    """Legt viele Artikel in einer Transaktion an.
+
+    Die Zeilen werden per ``INSERT ... ON CONFLICT (url) DO NOTHING
+    RETURNING`` geschrieben, sodass parallel laufende Worker bei doppelten
+    URLs nicht abbrechen. Bereits vorhandene Artikel fehlen im Ergebnis.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        rows: Ein Dict pro Artikel mit den Feldern von ``create_article``.
+
+    Returns:
+        Die tatsächlich neu angelegten Artikel.
+    """
+    if not rows:
+        return []
+    stmt = _insert_ignoring_conflicts(db, models.Article, ["url"])
+    articles = db.scalars(stmt.returning(models.Article), list(rows)).all()
+    ids = [article.id for article in articles]
+    db.commit()
+    if not ids:
+        return []
+    # Nach dem Commit sind die Objekte abgelaufen; eine Abfrage lädt alle
+    # wieder, statt beim ersten Zugriff je Artikel eine eigene auszulösen.
+    return (
+        db.query(models.Article)
+        .filter(models.Article.id.in_(ids))
+        .order_by(models.Article.id)
+        .all()
+    )
+
+
+@timed("crud.create_signals_bulk")
+def create_signals_bulk(
+    db: Session, rows: Sequence[Dict[str, Any]]
+) -> List[models.Signal]:
+    """Legt viele Signale in einer Transaktion an.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        rows: Ein Dict pro Signal mit ``article_id``, ``sentiment_label``,
+            ``sentiment_score``, ``events`` und ``score``.
+
+    Returns:
+        Die neu angelegten Signale in der Reihenfolge von ``rows``.
+    """
+    if not rows:
+        return []
+    stmt = insert(models.Signal).returning(models.Signal, sort_by_parameter_order=True)
+    signals = db.scalars(stmt, list(rows)).all()
+    db.commit()
+    return list(signals)
+
+
+# Per ``fields`` auswählbare Felder der Signal‑Liste und ihre Spalten
+SIGNAL_FIELDS = {
+    "id": models.Signal.id,
+    "created_at": models.Signal.created_at,
+    "score": models.Signal.score,
+    "ml_score": models.Signal.ml_score,
+    "scorer_version": models.Signal.scorer_version,
+    "sentiment_label": models.Signal.sentiment_label,
+    "sentiment_score": models.Signal.sentiment_score,
+    "events": models.Signal.events,
+    "article.id": models.Article.id,
+    "article.url": models.Article.url,
+    "article.title": models.Article.title,
+    "article.authors": models.Article.authors,
+    "article.text": models.Article.text,
+    "article.published_at": models.Article.published_at,
+    "article.created_at": models.Article.created_at,
+}
+
+# Standardauswahl ohne den vollständigen Artikeltext
+DEFAULT_SIGNAL_FIELDS = (
+    "id",
+    "created_at",
+    "score",
+    "sentiment_label",
+    "sentiment_score",
+    "events",
+    "article.id",
+    "article.url",
+    "article.title",
+    "article.published_at",
+)
+
+
+def _signal_fields_stmt(
+    fields: Sequence[str],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event: Optional[str] = None,
+):
+    """Baut ein SELECT über die angeforderten Felder und Filter."""
+    unknown = [field for field in fields if field not in SIGNAL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unbekannte Felder: {', '.join(unknown)}")
+    stmt = select(*(SIGNAL_FIELDS[field].label(field) for field in fields))
+    stmt = stmt.select_from(models.Signal)
+    if any(field.startswith("article.") for field in fields):
+        stmt = stmt.join(models.Article, models.Signal.article_id == models.Article.id)
+    if start is not None:
+        stmt = stmt.where(models.Signal.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(models.Signal.created_at < end)
+    if event is not None:
+        stmt = stmt.where(models.Signal.events.contains([event]))
+    return stmt
+
+
+@timed("crud.list_signal_fields")
+def list_signal_fields(
     db: Session,
+    fields: Sequence[str] = DEFAULT_SIGNAL_FIELDS,
     limit: int = 100,
     offset: int = 0,
-) -> List[models.Signal]:
-    """Liest eine Liste von Signalen aus der Datenbank."""
+    before: Optional[Tuple[datetime, int]] = None,
+) -> List[Dict[str, Any]]:
+    """Liest Signale als flache Dicts und lädt nur die angeforderten Spalten.
+
+    Die Signale sind absteigend nach ``(created_at, id)`` sortiert. Für
+    Keyset‑Paginierung wird ``before`` mit ``(created_at, id)`` des letzten
+    Signals der vorherigen Seite übergeben; dank des Index auf diesen
+    Spalten kostet jede Seite gleich viel, unabhängig von ihrer Tiefe.
+    ``id`` und ``created_at`` werden für den Cursor immer mitgelesen; die
+    Tabelle ``articles`` wird nur verbunden, wenn ein ``article.*``‑Feld
+    gefragt ist.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        fields: Feldnamen aus ``SIGNAL_FIELDS``.
+        limit: Maximale Anzahl Signale.
+        offset: Anzahl zu überspringender Signale (veraltet, langsam bei
+            tiefen Seiten).
+        before: Cursor ``(created_at, id)``; nur ältere Signale werden
+            geliefert.
+
+    Returns:
+        Pro Signal ein Dict von Feldname zu Wert.
+    """
+    stmt = _signal_fields_page_stmt(fields, limit, offset, before)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def _signal_fields_page_stmt(
+    fields: Sequence[str],
+    limit: int,
+    offset: int,
+    before: Optional[Tuple[datetime, int]],
+):
+    """SELECT einer Seite von Feldern, siehe :func:`list_signal_fields`."""
+    selected = list(dict.fromkeys(["id", "created_at", *fields]))
+    stmt = _signal_fields_stmt(selected)
+    if before is not None:
+        stmt = stmt.where(
+            tuple_(models.Signal.created_at, models.Signal.id) < tuple_(*before)
+        )
     return (
-        db.query(models.Signal)
-        .order_by(models.Signal.created_at.desc())
+        stmt.order_by(models.Signal.created_at.desc(), models.Signal.id.desc())
         .offset(offset)
         .limit(limit)
-        .all()
     )
+
+
+def iter_signal_rows(
+    db: Session,
+    fields: Sequence[str] = DEFAULT_SIGNAL_FIELDS,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    event: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Liest Signale blockweise über einen serverseitigen Cursor.
+
+    Es befinden sich nie mehr als ``chunk_size`` Zeilen gleichzeitig im
+    Speicher, unabhängig von der Größe des Ergebnisses.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        fields: Feldnamen aus ``SIGNAL_FIELDS``.
+        start: Nur Signale ab diesem Zeitpunkt (inklusive).
+        end: Nur Signale vor diesem Zeitpunkt (exklusive).
+        event: Nur Signale mit dieser Ereigniskategorie.
+        chunk_size: Anzahl Zeilen pro Block.
+
+    Yields:
+        Listen von Dicts, aufsteigend nach ``(created_at, id)`` sortiert.
+    """
+    stmt = _signal_fields_stmt(fields, start=start, end=end, event=event)
+    stmt = stmt.order_by(models.Signal.created_at, models.Signal.id)
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+
+@timed("crud.get_feed")
+def get_feed(db: Session, url: str) -> Optional[models.Feed]:
+    """Liest den gespeicherten Abrufzustand eines Feeds."""
+    return db.query(models.Feed).filter(models.Feed.url == url).first()
+
+
+@timed("crud.save_feed_state")
+def save_feed_state(
+    db: Session,
+    url: str,
+    etag: Optional[str],
+    modified: Optional[str],
+    seen_guids: List[str],
+) -> models.Feed:
+    """Speichert ETag, Last‑Modified und gesehene Eintrags‑IDs eines Feeds."""
+    feed = get_feed(db, url)
+    if feed is None:
+        feed = models.Feed(url=url)
+        db.add(feed)
+    feed.etag = etag
+    feed.modified = modified
+    feed.seen_guids = seen_guids
+    feed.last_fetched_at = datetime.utcnow()
+    db.commit()
+    return feed
+
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+
+def _bucket_start(created_at: datetime, granularity: str) -> datetime:
+    hour = created_at.replace(minute=0, second=0, microsecond=0)
+    return hour if granularity == "hour" else hour.replace(hour=0)
+
+
+def _merge_counts(current: Optional[dict], delta: Counter) -> dict:
+    merged = Counter(current or {})
+    merged.update(delta)
+    return dict(merged)
+
+
+@timed("crud.update_rollups")
+def update_rollups(
+    db: Session,
+    chunk_size: int = 10000,
+    lag: timedelta = timedelta(seconds=60),
+) -> int:
+    """Aggregiert alle seit dem letzten Lauf hinzugekommenen Signale.
+
+    Verarbeitet werden nur Signale mit einer ID oberhalb der gespeicherten
+    Watermark. Die Watermark‑Zeile wird gesperrt, sodass parallele Läufe
+    nacheinander arbeiten. Signale, die jünger als ``lag`` sind, bleiben
+    für den nächsten Lauf liegen, damit noch offene Transaktionen mit
+    kleinerer ID nicht übersprungen werden. Signale ohne ``created_at``
+    lassen sich keinem Bucket zuordnen; sie werden übersprungen, ohne die
+    Watermark aufzuhalten.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        chunk_size: Anzahl Signale pro Transaktion.
+        lag: Mindestalter eines Signals, bevor es aggregiert wird.
+
+    Returns:
+        Anzahl der neu aggregierten Signale.
+    """
+    processed = 0
+    while True:
+        watermark = db.get(models.RollupWatermark, "signals", with_for_update=True)
+        if watermark is None:
+            watermark = models.RollupWatermark(name="signals", last_signal_id=0)
+            db.add(watermark)
+            db.flush()
+        cutoff = datetime.utcnow() - lag
+        rows = (
+            db.query(
+                models.Signal.id,
+                models.Signal.created_at,
+                models.Signal.score,
+                models.Signal.sentiment_label,
+                models.Signal.events,
+            )
+            .filter(models.Signal.id > watermark.last_signal_id)
+            .order_by(models.Signal.id)
+            .limit(chunk_size)
+            .all()
+        )
+        # Nur bis zum ersten zu jungen Signal, damit keine Lücke entsteht
+        ready = []
+        for row in rows:
+            if row.created_at is not None and row.created_at >= cutoff:
+                break
+            ready.append(row)
+        if not ready:
+            db.commit()
+            return processed
+
+        aggregated = [row for row in ready if row.created_at is not None]
+        deltas: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        for row in aggregated:
+            for granularity in ROLLUP_GRANULARITIES:
+                key = (granularity, _bucket_start(row.created_at, granularity))
+                delta = deltas.setdefault(
+                    key,
+                    {
+                        "count": 0,
+                        "score": 0.0,
+                        "labels": Counter(),
+                        "events": Counter(),
+                    },
+                )
+                delta["count"] += 1
+                delta["score"] += row.score or 0.0
+                delta["labels"][(row.sentiment_label or "unknown").lower()] += 1
+                delta["events"].update(row.events or [])
+
+        existing: Dict[Tuple[str, datetime], models.SignalRollup] = {}
+        if deltas:
+            existing = {
+                (rollup.granularity, rollup.bucket_start): rollup
+                for rollup in db.query(models.SignalRollup)
+                .filter(
+                    tuple_(
+                        models.SignalRollup.granularity,
+                        models.SignalRollup.bucket_start,
+                    ).in_(list(deltas))
+                )
+                .with_for_update()
+            }
+        for (granularity, bucket_start), delta in deltas.items():
+            rollup = existing.get((granularity, bucket_start))
+            if rollup is None:
+                rollup = models.SignalRollup(
+                    granularity=granularity,
+                    bucket_start=bucket_start,
+                    signal_count=0,
+                    score_sum=0.0,
+                )
+                db.add(rollup)
+            rollup.signal_count += delta["count"]
+            rollup.score_sum += delta["score"]
+            rollup.sentiment_counts = _merge_counts(
+                rollup.sentiment_counts, delta["labels"]
+            )
+            rollup.event_counts = _merge_counts(rollup.event_counts, delta["events"])
+
+        watermark.last_signal_id = ready[-1].id
+        watermark.updated_at = datetime.utcnow()
+        db.commit()
+        processed += len(aggregated)
+        if len(ready) < len(rows) or len(rows) < chunk_size:
+            return processed
+
+
+@timed("crud.get_rollups")
+def get_rollups(
+    db: Session,
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[models.SignalRollup]:
+    """Liest die vorberechneten Aggregate eines Zeitraums.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        granularity: ``"hour"`` oder ``"day"``.
+        start: Erster Bucket (inklusive).
+        end: Ende des Zeitraums (exklusive).
+
+    Returns:
+        Die Aggregate, aufsteigend nach Zeit sortiert.
+    """
+    return list(db.scalars(_rollups_stmt(granularity, start, end)).all())
+
+
+def _rollups_stmt(granularity: str, start: Optional[datetime], end: Optional[datetime]):
+    """SELECT der Aggregate eines Zeitraums, siehe :func:`get_rollups`."""
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unbekannte Granularität: {granularity}")
+    stmt = select(models.SignalRollup).where(
+        models.SignalRollup.granularity == granularity
+    )
+    if start is not None:
+        stmt = stmt.where(models.SignalRollup.bucket_start >= start)
+    if end is not None:
+        stmt = stmt.where(models.SignalRollup.bucket_start < end)
+    return stmt.order_by(models.SignalRollup.bucket_start)
+
+
+@timed("crud.reset_rollups")
+def reset_rollups(db: Session) -> None:
+    """Verwirft alle Aggregate, damit sie neu aufgebaut werden.
+
+    Die Watermark wird auf 0 zurückgesetzt; der nächste Lauf von
+    :func:`update_rollups` aggregiert alle Signale erneut.
+    """
+    watermark = db.get(models.RollupWatermark, "signals", with_for_update=True)
+    db.query(models.SignalRollup).delete(synchronize_session=False)
+    if watermark is not None:
+        watermark.last_signal_id = 0
+        watermark.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def _rescore_stmt(
+    sentiment_weights: Mapping[str, float], event_weights: Mapping[str, float]
+):
+    """UPDATE aller Scores mit den Gewichten als ``CASE``‑Ausdrücken.
+
+    Ereignisse werden per JSONB‑Operator ``@>`` geprüft; die Anweisung ist
+    daher nur unter PostgreSQL ausführbar.
+    """
+    label = func.lower(models.Signal.sentiment_label)
+    label_weight = case(dict(sentiment_weights), value=label, else_=0.0)
+    score = label_weight * func.coalesce(models.Signal.sentiment_score, 0.0)
+    for event, weight in event_weights.items():
+        if weight:
+            score = score + case(
+                (models.Signal.events.contains([event]), weight), else_=0.0
+            )
+    return (
+        update(models.Signal)
+        .values(score=score)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _rescore_in_sql(
+    db: Session,
+    sentiment_weights: Mapping[str, float],
+    event_weights: Mapping[str, float],
+) -> int:
+    result = db.execute(_rescore_stmt(sentiment_weights, event_weights))
+    db.commit()
+    return result.rowcount
+
+
+@timed("crud.rescore_signals")
+def rescore_signals(
+    db: Session,
+    sentiment_weights: Optional[Mapping[str, float]] = None,
+    event_weights: Optional[Mapping[str, float]] = None,
+    chunk_size: int = 50000,
+) -> int:
+    """Berechnet den Score aller gespeicherten Signale neu.
+
+    Unter PostgreSQL geschieht dies mit einem einzigen ``UPDATE``, in dem
+    die Gewichte als ``CASE``‑Ausdrücke stehen. Andere Datenbanken lesen
+    die Signale blockweise nach ID, bewerten sie mit
+    :func:`src.scoring.batch.score_rows` und schreiben die Scores per
+    Bulk‑UPDATE zurück. Die NLP‑Ergebnisse bleiben unverändert.
+
+    Da die Aggregate Score‑Summen enthalten, sollte anschließend
+    :func:`reset_rollups` aufgerufen werden.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        sentiment_weights: Gewichte pro Label, standardmäßig
+            ``SENTIMENT_WEIGHTS``.
+        event_weights: Gewichte pro Ereignis, standardmäßig
+            ``EVENT_WEIGHTS``.
+        chunk_size: Anzahl Signale pro Block und Transaktion.
+
+    Returns:
+        Anzahl der neu bewerteten Signale.
+    """
+    from ..scoring.batch import score_rows
+    from ..scoring.scoring import EVENT_WEIGHTS, SENTIMENT_WEIGHTS
+
+    sentiment_weights = (
+        SENTIMENT_WEIGHTS if sentiment_weights is None else sentiment_weights
+    )
+    event_weights = EVENT_WEIGHTS if event_weights is None else event_weights
+    if db.get_bind().dialect.name == "postgresql":
+        return _rescore_in_sql(db, sentiment_weights, event_weights)
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(
+                models.Signal.id,
+                models.Signal.sentiment_label,
+                models.Signal.sentiment_score,
+                models.Signal.events,
+            )
+            .filter(models.Signal.id > last_id)
+            .order_by(models.Signal.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return updated
+        scores = score_rows(
+            [row.sentiment_label for row in rows],
+            [row.sentiment_score for row in rows],
+            [row.events for row in rows],
+            sentiment_weights=sentiment_weights,
+            event_weights=event_weights,
+        )
+        db.execute(
+            update(models.Signal),
+            [{"id": row.id, "score": float(score)} for row, score in zip(rows, scores)],
+        )
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+@timed("crud.latest_signals_for_articles")
+def latest_signals_for_articles(
+    db: Session, article_ids: Iterable[int]
+) -> Dict[int, models.Signal]:
+    """Liefert pro Artikel das zuletzt angelegte Signal.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        article_ids: IDs der Artikel.
+
+    Returns:
+        Zuordnung Artikel‑ID → Signal; Artikel ohne Signal fehlen.
+    """
+    latest: Dict[int, models.Signal] = {}
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return latest
+    signals = (
+        db.query(models.Signal)
+        .filter(models.Signal.article_id.in_(ids))
+        .order_by(models.Signal.id)
+    )
+    for signal in signals:
+        latest[signal.article_id] = signal
+    return latest
+
+
+@timed("crud.get_article_features")
+def get_article_features(
+    db: Session, article_ids: Iterable[int], feature_version: str
+) -> Dict[int, List[float]]:
+    """Liest gespeicherte Merkmalsvektoren einer Version.
+
+    Returns:
+        Zuordnung Artikel‑ID → Merkmalsvektor; fehlende Artikel fehlen.
+    """
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return {}
+    rows = db.query(
+        models.ArticleFeatures.article_id, models.ArticleFeatures.values
+    ).filter(
+        models.ArticleFeatures.feature_version == feature_version,
+        models.ArticleFeatures.article_id.in_(ids),
+    )
+    return {row.article_id: row.values for row in rows}
+
+
+@timed("crud.save_article_features")
+def save_article_features(
+    db: Session, features: Mapping[int, Sequence[float]], feature_version: str
+) -> None:
+    """Speichert Merkmalsvektoren mit einem Bulk‑INSERT.
+
+    Bereits vorhandene Vektoren derselben Version bleiben unverändert.
+    """
+    if not features:
+        return
+    stmt = _insert_ignoring_conflicts(
+        db, models.ArticleFeatures, ["article_id", "feature_version"]
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "article_id": article_id,
+                "feature_version": feature_version,
+                "values": [float(value) for value in values],
+            }
+            for article_id, values in features.items()
+        ],
+    )
+    db.commit()
+
+
+@timed("crud.find_lsh_candidates")
+def find_lsh_candidates(
+    db: Session, keys: Iterable[Tuple[int, int]], chunk_size: int = 1000
+) -> Dict[Tuple[int, int], List[Tuple[int, bytes]]]:
+    """Sucht kanonische Artikel, die in einem LSH‑Band übereinstimmen.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        keys: ``(Band, Bucket)``‑Paare der gesuchten Signaturen.
+        chunk_size: Maximale Anzahl Paare pro Abfrage.
+
+    Returns:
+        Pro gefundenem Paar die Liste ``(Artikel‑ID, MinHash)``.
+    """
+    keys = list(dict.fromkeys(keys))
+    lsh = models.ArticleLSHBand
+    candidates: Dict[Tuple[int, int], List[Tuple[int, bytes]]] = {}
+    for start in range(0, len(keys), chunk_size):
+        rows = (
+            db.query(lsh.band, lsh.bucket, models.Article.id, models.Article.minhash)
+            .join(models.Article, lsh.article_id == models.Article.id)
+            .filter(tuple_(lsh.band, lsh.bucket).in_(keys[start : start + chunk_size]))
+        )
+        for row in rows:
+            candidates.setdefault((row.band, row.bucket), []).append(
+                (row.id, row.minhash)
+            )
+    return candidates
+
+
+@timed("crud.save_lsh_bands")
+def save_lsh_bands(db: Session, rows: Sequence[Dict[str, int]]) -> None:
+    """Speichert LSH‑Bänder (``band``, ``bucket``, ``article_id``)."""
+    if not rows:
+        return
+    stmt = _insert_ignoring_conflicts(
+        db, models.ArticleLSHBand, ["band", "bucket", "article_id"]
+    )
+    db.execute(stmt, list(rows))
+    db.commit()
@@ -4,14 +4,27 @@ database.py
 
 Stellt die Verbindung zur PostgreSQL‑Datenbank über SQLAlchemy her.
 Unterstützt sowohl synchrone als auch asynchrone Sessions.
+
+Die synchrone Engine nutzen Celery‑Tasks und schreibende Endpunkte. Die
+asynchrone Engine (asyncpg) bedient die lesenden Endpunkte der API, die
+dadurch keinen Thread des Threadpools belegen. Sie wird erst bei der
+ersten Nutzung angelegt, sodass Prozesse ohne asynchronen Zugriff
+asyncpg nicht benötigen.
 """
 
 from __future__ import annotations
 
 import os
-from typing import Generator
+from functools import lru_cache
+from typing import AsyncIterator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 
@@ -20,6 +33,26 @@ DATABASE_URL = os.getenv(
     "postgresql+psycopg2://econ_user:econ_pass@db:5432/econ_signals",  # default for Docker
 )
 
+# Asynchrone Treiber je Datenbank für ``ASYNC_DATABASE_URL``
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_url(url: str) -> str:
+    """Ersetzt den Treiber einer Datenbank‑URL durch seine asynchrone Variante.
+
+    Aus ``postgresql+psycopg2://...`` wird z. B. ``postgresql+asyncpg://...``.
+    URLs ohne bekannte asynchrone Variante bleiben unverändert.
+    """
+    scheme, separator, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    driver = _ASYNC_DRIVERS.get(backend)
+    if not separator or driver is None:
+        return url
+    return f"{backend}+{driver}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_url(DATABASE_URL))
+
 # Engine für synchrone Nutzung
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
@@ -39,3 +72,25 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Erzeugt die prozessweite asynchrone Engine einmalig."""
+    return create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session Factory für asynchrone Sessions."""
+    # Ohne ``expire_on_commit`` bleiben geladene Objekte nach einem Commit
+    # lesbar, ohne dass ein implizites (hier unzulässiges) Nachladen nötig ist
+    return async_sessionmaker(
+        get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Stellt eine asynchrone Datenbank‑Session als FastAPI‑Dependency bereit."""
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -2,7 +2,9 @@
 models.py
 =========
 
-Definiert die ORM‑Modelle für Artikel und Signale.
+Definiert die ORM‑Modelle für Artikel, Signale, den Abrufzustand der
+Feeds, die vorberechneten Zeitreihen‑Aggregate der Signale sowie die
+zwischengespeicherten Merkmalsvektoren für das ML‑Scoring.
 """
 
 from __future__ import annotations
@@ -10,12 +12,30 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    JSON,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship
 
 
 Base = declarative_base()
+# Die Modelle verwenden einfache Annotationen statt ``Mapped[...]``; ohne
+# diese Option verweigert SQLAlchemy 2.0 das Mapping
+Base.__allow_unmapped__ = True
+
+# JSONB unter PostgreSQL; unter SQLite (z. B. für Benchmarks) einfaches JSON
+JSONType = JSONB().with_variant(JSON(), "sqlite")
 
 
 class Article(Base):  # type: ignore[call-arg]
@@ -28,19 +48,95 @@ class Article(Base):  # type: ignore[call-arg]
     text: str = Column(Text, nullable=False)
     published_at: Optional[datetime] = Column(DateTime)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    # MinHash‑Signatur für die Duplikaterkennung
+    minhash: Optional[bytes] = Column(LargeBinary)
+    # Bei Duplikaten der kanonische Artikel; Duplikate erhalten kein Signal
+    canonical_id: Optional[int] = Column(Integer, ForeignKey("articles.id"), index=True)
 
     signals: List["Signal"] = relationship("Signal", back_populates="article")
 
 
 class Signal(Base):  # type: ignore[call-arg]
     __tablename__ = "signals"
+    __table_args__ = (
+        # Für Keyset‑Paginierung nach (created_at, id)
+        Index("ix_signals_created_at_id", "created_at", "id"),
+    )
 
     id: int = Column(Integer, primary_key=True, index=True)
-    article_id: int = Column(Integer, ForeignKey("articles.id"), nullable=False)
+    article_id: int = Column(
+        Integer, ForeignKey("articles.id"), nullable=False, index=True
+    )
     sentiment_label: str = Column(String)
     sentiment_score: float = Column(Float)
-    events: Optional[dict] = Column(JSONB)
+    events: Optional[dict] = Column(JSONType)
+    # Heuristischer Score; wird nur von ``heuristic_score`` bzw. der
+    # Neubewertung mit geänderten Gewichten geschrieben
     score: float = Column(Float)
+    # Optionales explizites Trainingsziel für das ML‑Scoring
+    label: Optional[float] = Column(Float)
+    # Vorhersage des ML‑Scorers und dessen Version
+    ml_score: Optional[float] = Column(Float)
+    scorer_version: Optional[str] = Column(String)
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
 
     article: Article = relationship("Article", back_populates="signals")
+
+
+class Feed(Base):  # type: ignore[call-arg]
+    __tablename__ = "feeds"
+
+    id: int = Column(Integer, primary_key=True, index=True)
+    url: str = Column(String, unique=True, nullable=False)
+    etag: Optional[str] = Column(String)
+    modified: Optional[str] = Column(String)
+    seen_guids: Optional[list] = Column(JSONType)
+    last_fetched_at: Optional[datetime] = Column(DateTime)
+
+
+class SignalRollup(Base):  # type: ignore[call-arg]
+    """Aggregierte Signale je Stunde bzw. Tag."""
+
+    __tablename__ = "signal_rollups"
+
+    granularity: str = Column(String, primary_key=True)  # "hour" oder "day"
+    bucket_start: datetime = Column(DateTime, primary_key=True)
+    signal_count: int = Column(Integer, nullable=False, default=0)
+    score_sum: float = Column(Float, nullable=False, default=0.0)
+    sentiment_counts: Optional[dict] = Column(JSONType)
+    event_counts: Optional[dict] = Column(JSONType)
+
+
+class RollupWatermark(Base):  # type: ignore[call-arg]
+    """Höchste bereits aggregierte Signal‑ID."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name: str = Column(String, primary_key=True)
+    last_signal_id: int = Column(Integer, nullable=False, default=0)
+    updated_at: Optional[datetime] = Column(DateTime)
+
+
+class ArticleFeatures(Base):  # type: ignore[call-arg]
+    """Merkmalsvektor eines Artikels für das ML‑Scoring.
+
+    Pro Artikel und Merkmalsversion wird ein Vektor gespeichert, damit
+    Training und Neubewertung die NLP‑Verarbeitung nicht wiederholen.
+    """
+
+    __tablename__ = "article_features"
+
+    article_id: int = Column(Integer, ForeignKey("articles.id"), primary_key=True)
+    feature_version: str = Column(String, primary_key=True)
+    values: list = Column(JSONType, nullable=False)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+
+
+class ArticleLSHBand(Base):  # type: ignore[call-arg]
+    """LSH‑Band eines kanonischen Artikels für die Duplikatsuche."""
+
+    __tablename__ = "article_lsh_bands"
+
+    band: int = Column(Integer, primary_key=True)
+    bucket: int = Column(BigInteger, primary_key=True)
+    article_id: int = Column(Integer, ForeignKey("articles.id"), primary_key=True)
@@ -5,19 +5,35 @@ article_processor.py
 Dieses Modul stellt Funktionen bereit, um Artikel anhand ihrer URL
 herunterzuladen und den Text sowie Metadaten zu extrahieren. Es nutzt
 ``newspaper3k`` für die Extraktion.
+
+Mit :func:`download_articles` lassen sich viele Artikel parallel laden,
+wobei sowohl die Gesamtzahl gleichzeitiger Downloads als auch die Anzahl
+pro Host begrenzt wird.
 """
 
 from __future__ import annotations
 
 import logging
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 
-from newspaper import Article
+from ..metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# Standardwerte für parallele Downloads; per Umgebungsvariable anpassbar
+DOWNLOAD_MAX_WORKERS = int(os.getenv("DOWNLOAD_MAX_WORKERS", "16"))
+DOWNLOAD_PER_HOST = int(os.getenv("DOWNLOAD_PER_HOST", "2"))
+DOWNLOAD_TIMEOUT = float(os.getenv("DOWNLOAD_TIMEOUT", "10"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "2"))
+DOWNLOAD_BACKOFF = float(os.getenv("DOWNLOAD_BACKOFF", "0.5"))
+
 
 @dataclass
 class ArticleContent:
@@ -30,18 +46,22 @@ class ArticleContent:
     publish_date: Optional[datetime]
 
 
-def download_article(url: str) -> ArticleContent:
+@timed("article.download")
+def download_article(url: str, timeout: Optional[float] = None) -> ArticleContent:
     """Lädt einen Artikel von der angegebenen URL herunter.
 
     Args:
         url: Ziel‑URL des Artikels.
+        timeout: Timeout der HTTP‑Anfrage in Sekunden.
 
     Returns:
         Ein ``ArticleContent``‑Objekt mit Titel, Text, Autoren und
         Veröffentlichungsdatum.
     """
+    from newspaper import Article
+
     logger.info("Lade Artikel von %s", url)
-    article = Article(url)
+    article = Article(url, request_timeout=timeout or DOWNLOAD_TIMEOUT)
     article.download()
     article.parse()
     return ArticleContent(
@@ -51,3 +71,100 @@ def download_article(url: str) -> ArticleContent:
         authors=article.authors or [],
         publish_date=article.publish_date,
     )
+
+
+def _download_with_retries(
+    url: str, timeout: float, retries: int, backoff: float
+) -> ArticleContent:
+    """Lädt einen Artikel und wiederholt fehlgeschlagene Versuche.
+
+    Zwischen den Versuchen wird exponentiell länger gewartet
+    (``backoff``, ``2 * backoff``, ``4 * backoff`` …).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return download_article(url, timeout=timeout)
+        except Exception as exc:
+            if attempt == retries:
+                raise
+            delay = backoff * 2**attempt
+            logger.warning(
+                "Download von %s fehlgeschlagen (%s), neuer Versuch in %.1fs",
+                url,
+                exc,
+                delay,
+            )
+            time.sleep(delay)
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def download_articles(
+    urls: Iterable[str],
+    max_workers: Optional[int] = None,
+    per_host: Optional[int] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+) -> Iterator[ArticleContent]:
+    """Lädt mehrere Artikel parallel herunter.
+
+    Die URLs werden nach Host gruppiert und reihum an einen Thread‑Pool
+    übergeben, sodass höchstens ``per_host`` Anfragen gleichzeitig an
+    denselben Server gehen. Ein langsamer Server blockiert damit nur seine
+    eigenen Artikel.
+
+    Args:
+        urls: Die zu ladenden Artikel‑URLs.
+        max_workers: Maximale Anzahl gleichzeitiger Downloads insgesamt.
+        per_host: Maximale Anzahl gleichzeitiger Downloads pro Host.
+        timeout: Timeout pro HTTP‑Anfrage in Sekunden.
+        retries: Anzahl der Wiederholungen nach einem Fehler.
+        backoff: Wartezeit vor der ersten Wiederholung in Sekunden.
+
+    Yields:
+        ``ArticleContent``‑Objekte in der Reihenfolge, in der die Downloads
+        abgeschlossen werden. Endgültig fehlgeschlagene Artikel werden
+        protokolliert und übersprungen.
+    """
+    max_workers = max_workers or DOWNLOAD_MAX_WORKERS
+    per_host = per_host or DOWNLOAD_PER_HOST
+    timeout = timeout or DOWNLOAD_TIMEOUT
+    retries = DOWNLOAD_RETRIES if retries is None else retries
+    backoff = DOWNLOAD_BACKOFF if backoff is None else backoff
+
+    pending: Dict[str, Deque[str]] = {}
+    for url in dict.fromkeys(urls):
+        pending.setdefault(urlsplit(url).netloc, deque()).append(url)
+    active: Counter = Counter()
+    running: Dict[Future, Tuple[str, str]] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def submit_ready() -> None:
+            for host in list(pending):
+                queue = pending[host]
+                while queue and active[host] < per_host and len(running) < max_workers:
+                    url = queue.popleft()
+                    future = pool.submit(
+                        _download_with_retries, url, timeout, retries, backoff
+                    )
+                    running[future] = (url, host)
+                    active[host] += 1
+                if not queue:
+                    del pending[host]
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            completed: List[ArticleContent] = []
+            for future in done:
+                url, host = running.pop(future)
+                active[host] -= 1
+                try:
+                    completed.append(future.result())
+                except Exception:
+                    logger.exception("Artikel %s konnte nicht geladen werden", url)
+            # Freie Plätze sofort nachbesetzen, bevor der Aufrufer die
+            # Ergebnisse verarbeitet
+            submit_ready()
+            yield from completed
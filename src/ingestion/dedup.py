@@ -0,0 +1,141 @@
+"""
+dedup.py
+========
+
+Erkennung nahezu identischer Artikel mit MinHash und Locality‑Sensitive
+Hashing (LSH). Syndizierte oder leicht überarbeitete Agenturmeldungen
+erscheinen in mehreren Feeds; erkannte Duplikate werden einem
+kanonischen Artikel zugeordnet und nicht erneut durch die NLP‑Pipeline
+geschickt.
+
+Jeder Text wird in überlappende Wort‑Shingles zerlegt, aus denen eine
+MinHash‑Signatur berechnet wird. Die Signatur wird in Bänder geteilt;
+Artikel, die in mindestens einem Band übereinstimmen, sind Kandidaten,
+deren geschätzte Jaccard‑Ähnlichkeit anschließend geprüft wird. Die
+Band‑Hashes liegen in der Datenbank, sodass die Suche nur die Kandidaten
+lädt statt aller Artikel.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+# Kürzere Texte erhalten keine Signatur: Bei wenigen Shingles sagt die
+# geschätzte Ähnlichkeit nichts aus
+DEDUP_MIN_SHINGLES = int(os.getenv("DEDUP_MIN_SHINGLES", "5"))
+# Ab dieser geschätzten Jaccard‑Ähnlichkeit gilt ein Artikel als Duplikat
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+BandKey = Tuple[int, int]
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> Set[str]:
+    """Zerlegt einen Text in überlappende Folgen von ``size`` Wörtern.
+
+    Groß‑/Kleinschreibung und Satzzeichen werden ignoriert. Kürzere Texte
+    ergeben ein einziges Shingle.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    # Koeffizienten < 2**32, damit ``a * x + b`` nicht über 64 Bit läuft
+    generator = np.random.RandomState(seed)
+    a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(
+    text: str,
+    num_perm: int = DEDUP_NUM_PERM,
+    size: int = DEDUP_SHINGLE_SIZE,
+    min_shingles: int = DEDUP_MIN_SHINGLES,
+) -> Optional[np.ndarray]:
+    """Berechnet die MinHash‑Signatur eines Texts.
+
+    Returns:
+        Ein ``uint32``‑Array der Länge ``num_perm`` oder ``None`` für Texte
+        mit weniger als ``min_shingles`` Shingles. Sonst würden z. B. alle
+        Texte aus höchstens ``size`` Wörtern auf ein einziges Shingle
+        reduziert und untereinander leicht als Duplikate gelten.
+    """
+    tokens = shingles(text, size)
+    if not tokens or len(tokens) < min_shingles:
+        return None
+    hashes = np.array(
+        [_hash64(token.encode("utf-8")) & 0xFFFFFFFF for token in tokens],
+        dtype=np.uint64,
+    )
+    a, b = _permutations(num_perm)
+    permuted = (hashes[:, None] * a + b) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Schätzt die Jaccard‑Ähnlichkeit zweier Signaturen."""
+    return float(np.mean(first == second))
+
+
+def band_keys(signature: np.ndarray, bands: int = DEDUP_BANDS) -> List[BandKey]:
+    """Teilt eine Signatur in Bänder und hasht jedes Band.
+
+    Returns:
+        Pro Band ``(Bandnummer, Hash)``; der Hash passt in eine
+        vorzeichenbehaftete 64‑Bit‑Spalte.
+    """
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        chunk = signature[band * rows : (band + 1) * rows].tobytes()
+        bucket = _hash64(chunk) - (1 << 63)
+        keys.append((band, bucket))
+    return keys
+
+
+def to_bytes(signature: np.ndarray) -> bytes:
+    """Serialisiert eine Signatur für die Datenbank."""
+    return signature.astype("<u4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    """Gegenstück zu :func:`to_bytes`."""
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+@dataclass
+class Fingerprint:
+    """MinHash‑Signatur eines Artikels zusammen mit seinen LSH‑Bändern."""
+
+    signature: np.ndarray
+    bands: List[BandKey]
+
+    @classmethod
+    def from_text(cls, text: str) -> Optional["Fingerprint"]:
+        signature = minhash(text)
+        if signature is None:
+            return None
+        return cls(signature=signature, bands=band_keys(signature))
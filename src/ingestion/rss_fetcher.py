@@ -6,19 +6,28 @@ Dieses Modul enthält Funktionen zur Abfrage und Verarbeitung von RSS‑Feeds.
 Es nutzt das Paket ``feedparser``, um Feeds zu laden und einfache
 Metadaten wie Titel, Link, Veröffentlichungsdatum und Beschreibung zu
 extrahieren.
+
+Über einen ``FeedState`` merkt sich der Abruf ETag, Last‑Modified und die
+zuletzt gesehenen Eintrags‑IDs eines Feeds. Unveränderte Feeds werden dann
+per Conditional GET mit ``304 Not Modified`` beantwortet, und es werden nur
+neue Einträge zurückgegeben.
 """
 
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Sequence
 
-import feedparser
+from ..metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# Anzahl der Eintrags‑IDs, die pro Feed als „bereits gesehen“ gespeichert werden
+FEED_SEEN_GUIDS_LIMIT = int(os.getenv("FEED_SEEN_GUIDS_LIMIT", "1000"))
+
 
 @dataclass
 class FeedEntry:
@@ -28,6 +37,16 @@ class FeedEntry:
     link: str
     published: datetime | None
     summary: str
+    guid: str = ""
+
+
+@dataclass
+class FeedState:
+    """Zwischen zwei Abrufen gespeicherter Zustand eines Feeds."""
+
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    seen_guids: List[str] = field(default_factory=list)
 
 
 def parse_date(date_str: str | None) -> datetime | None:
@@ -49,19 +68,41 @@ def parse_date(date_str: str | None) -> datetime | None:
         return None
 
 
-def fetch_rss_feed(url: str) -> List[FeedEntry]:
+@timed("rss.fetch")
+def fetch_rss_feed(url: str, state: Optional[FeedState] = None) -> List[FeedEntry]:
     """Lädt einen RSS‑Feed und gibt eine Liste von ``FeedEntry`` zurück.
 
     Args:
         url: URL des RSS‑Feeds.
+        state: Optionaler Zustand des letzten Abrufs. Ist er angegeben,
+            wird ein Conditional GET gesendet und nur Einträge, deren ID
+            noch nicht in ``state.seen_guids`` steht, werden geliefert.
+            ETag und Last‑Modified werden dabei aktualisiert; die
+            gelieferten Einträge markiert erst :func:`mark_seen`, sobald
+            ihre Artikel gespeichert sind.
 
     Returns:
         Liste von ``FeedEntry`` mit grundlegenden Informationen.
     """
+    import feedparser
+
     logger.info("Lade RSS‑Feed von %s", url)
-    feed = feedparser.parse(url)
+    if state is None:
+        feed = feedparser.parse(url)
+    else:
+        feed = feedparser.parse(url, etag=state.etag, modified=state.modified)
+        if getattr(feed, "status", None) == 304:
+            logger.debug("Feed %s unverändert", url)
+            return []
+        state.etag = feed.get("etag", state.etag)
+        state.modified = feed.get("modified", state.modified)
+
+    seen = set(state.seen_guids) if state is not None else set()
     entries: List[FeedEntry] = []
     for entry in feed.entries:
+        guid = getattr(entry, "id", "") or getattr(entry, "link", "")
+        if guid in seen:
+            continue
         published = None
         # ``published_parsed`` kann fehlen
         if hasattr(entry, "published_parsed") and entry.published_parsed:
@@ -74,7 +115,19 @@ def fetch_rss_feed(url: str) -> List[FeedEntry]:
                 link=getattr(entry, "link", ""),
                 published=published,
                 summary=getattr(entry, "summary", ""),
+                guid=guid,
             )
         )
     logger.debug("%d Einträge aus dem Feed gelesen", len(entries))
     return entries
+
+
+def mark_seen(state: FeedState, guids: Sequence[str]) -> None:
+    """Nimmt Eintrags‑IDs vorne in ``state.seen_guids`` auf.
+
+    Die Liste wird auf ``FEED_SEEN_GUIDS_LIMIT`` Einträge begrenzt.
+    """
+    new_guids = [guid for guid in dict.fromkeys(guids) if guid]
+    known = set(new_guids)
+    rest = [guid for guid in state.seen_guids if guid not in known]
+    state.seen_guids = (new_guids + rest)[:FEED_SEEN_GUIDS_LIMIT]
@@ -0,0 +1,85 @@
+"""
+urls.py
+=======
+
+Hilfsfunktionen zur Normalisierung von Artikel‑URLs. Feeds verlinken
+denselben Artikel häufig mit unterschiedlichen Tracking‑Parametern,
+Groß‑/Kleinschreibung im Host oder abschließendem Schrägstrich; für die
+Duplikaterkennung werden solche Varianten auf eine gemeinsame Form
+gebracht.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query‑Parameter, die nur der Reichweitenmessung dienen
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+    "cmp",
+    "xtor",
+    "ito",
+    "ocid",
+    "igshid",
+}
+
+# Präfixe von Tracking‑Parametern (Google Analytics, Webtrekk, comScore …)
+TRACKING_PREFIXES = ("utm_", "wt_", "ns_", "at_", "pk_")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """Bringt eine URL in eine kanonische Form für den Vergleich.
+
+    Schema und Host werden kleingeschrieben, Standard‑Ports, Fragmente und
+    Tracking‑Parameter entfernt, die übrigen Parameter sortiert und ein
+    abschließender Schrägstrich im Pfad gestrichen.
+
+    Args:
+        url: Die ursprüngliche URL.
+
+    Returns:
+        Die normalisierte URL. Nicht parsebare Werte werden unverändert
+        zurückgegeben.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username
+        if parts.password:
+            credentials += f":{parts.password}"
+        host = f"{credentials}@{host}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    params = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ]
+    query = urlencode(sorted(params))
+    return urlunsplit((scheme, host, path, query, ""))
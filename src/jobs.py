@@ -0,0 +1,159 @@
+"""
+jobs.py
+=======
+
+Fortschrittsverfolgung für asynchrone Aufträge. Die API legt beim Start
+eines Auftrags einen Eintrag an und gibt dessen ID zurück; die
+Celery‑Tasks zählen dort mit, wie viele Feeds gelesen, Artikel
+verarbeitet und Fehler aufgetreten sind.
+
+Jeder Auftrag ist ein Redis‑Hash. Zähler werden mit ``HINCRBY`` erhöht,
+sodass parallel laufende Tasks sich nicht gegenseitig überschreiben.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_REDIS_URL = os.getenv(
+    "JOB_REDIS_URL", os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/1")
+)
+# Aufbewahrungsdauer eines Auftrags in Sekunden
+JOB_TTL = int(os.getenv("JOB_TTL", str(24 * 3600)))
+
+COUNTERS = (
+    "feeds_total",
+    "feeds_fetched",
+    "links_found",
+    "articles_downloaded",
+    "duplicates",
+    "articles_processed",
+    "failures",
+    "blocks_total",
+    "blocks_done",
+)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobStore:
+    """Speichert Status und Zähler von Aufträgen in Redis.
+
+    Alle Methoden, die von Tasks aufgerufen werden, akzeptieren ``None``
+    als Auftrags‑ID und tun dann nichts. So laufen die Tasks auch ohne
+    Auftrag, z. B. wenn sie von Celery Beat gestartet werden.
+
+    Args:
+        redis_client: Redis‑Client für die Hashes.
+        ttl: Lebensdauer eines Auftrags in Sekunden.
+    """
+
+    def __init__(self, redis_client: Any, ttl: int = JOB_TTL) -> None:
+        self.redis = redis_client
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _set(self, job_id: str, **fields: Any) -> None:
+        key = self._key(job_id)
+        self.redis.hset(key, mapping={**fields, "updated_at": _now()})
+        self.redis.expire(key, self.ttl)
+
+    def create(self, kind: str, **counters: int) -> str:
+        """Legt einen neuen Auftrag im Status ``queued`` an.
+
+        Args:
+            kind: Art des Auftrags, z. B. ``"refresh"`` oder ``"process"``.
+            counters: Startwerte für Zähler aus ``COUNTERS``.
+
+        Returns:
+            Die ID des Auftrags.
+        """
+        job_id = uuid.uuid4().hex
+        fields: Dict[str, Any] = {name: 0 for name in COUNTERS}
+        fields.update(counters)
+        self._set(job_id, kind=kind, status="queued", created_at=_now(), **fields)
+        return job_id
+
+    def start(self, job_id: Optional[str]) -> None:
+        """Markiert einen Auftrag als laufend."""
+        if job_id is not None:
+            self._set(job_id, status="running")
+
+    def update(self, job_id: Optional[str], **fields: Any) -> None:
+        """Setzt einzelne Felder eines Auftrags."""
+        if job_id is not None:
+            self._set(job_id, **fields)
+
+    def incr(self, job_id: Optional[str], **amounts: int) -> None:
+        """Erhöht Zähler eines Auftrags um die angegebenen Beträge."""
+        if job_id is None:
+            return
+        key = self._key(job_id)
+        for name, amount in amounts.items():
+            if amount:
+                self.redis.hincrby(key, name, amount)
+
+    def block_done(self, job_id: Optional[str], **amounts: int) -> None:
+        """Zählt einen abgeschlossenen Block und beendet ggf. den Auftrag.
+
+        Args:
+            job_id: ID des Auftrags oder ``None``.
+            amounts: Zusätzliche Zählerstände des Blocks, z. B.
+                ``articles_processed`` oder ``failures``.
+        """
+        if job_id is None:
+            return
+        self.incr(job_id, **amounts)
+        done = self.redis.hincrby(self._key(job_id), "blocks_done", 1)
+        total = int(self.redis.hget(self._key(job_id), "blocks_total") or 0)
+        if done >= total:
+            self.finish(job_id)
+
+    def finish(self, job_id: Optional[str]) -> None:
+        """Beendet einen Auftrag.
+
+        Der Status ist ``failed``, wenn nur Fehler und keine verarbeiteten
+        Artikel gezählt wurden, sonst ``done``.
+        """
+        if job_id is None:
+            return
+        job = self.get(job_id) or {}
+        failed = job.get("failures", 0) and not job.get("articles_processed", 0)
+        self._set(job_id, status="failed" if failed else "done", finished_at=_now())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Liest einen Auftrag.
+
+        Returns:
+            Status, Zeitstempel und Zähler des Auftrags oder ``None``, wenn
+            er nicht (mehr) existiert.
+        """
+        raw = self.redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job: Dict[str, Any] = {"id": job_id}
+        for name, value in raw.items():
+            name = name.decode("utf-8") if isinstance(name, bytes) else name
+            value = value.decode("utf-8") if isinstance(value, bytes) else value
+            job[name] = int(value) if name in COUNTERS else value
+        return job
+
+
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    """Erzeugt den prozessweiten Auftragsspeicher einmalig."""
+    import redis
+
+    return JobStore(redis.Redis.from_url(JOB_REDIS_URL))
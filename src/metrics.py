@@ -0,0 +1,183 @@
+"""
+metrics.py
+==========
+
+Prometheus‑Metriken für die einzelnen Verarbeitungsstufen. Feed‑Abruf,
+Artikel‑Download, NLP, Ereigniserkennung, Scoring und die
+Datenbankfunktionen werden mit :func:`timed` versehen; pro Stufe gibt es
+ein Latenz‑Histogramm und einen Fehlerzähler. Dazu kommen Zähler für
+verarbeitete Artikel und Treffer im NLP‑Cache.
+
+Die API liefert die Metriken unter ``/metrics`` aus. Celery‑Worker
+starten mit ``METRICS_PORT`` einen eigenen HTTP‑Endpunkt oder schreiben
+sie mit ``METRICS_TEXTFILE`` regelmäßig in eine Datei im Textformat (für
+den Textfile‑Collector des Node‑Exporters oder einen Push an das
+Pushgateway). Bei mehreren Prozessen (Prefork‑Worker, mehrere
+Uvicorn‑Worker) muss ``PROMETHEUS_MULTIPROC_DIR`` auf ein gemeinsames,
+beim Start leeres Verzeichnis zeigen; die Werte aller Prozesse werden
+dann beim Auslesen zusammengefasst.
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+import time
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    write_to_textfile,
+)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Port für den HTTP‑Endpunkt der Celery‑Worker; ohne Angabe keiner
+METRICS_PORT = os.getenv("METRICS_PORT")
+# Zieldatei für das Textformat; ohne Angabe wird keine geschrieben
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE")
+# Mindestabstand zwischen zwei Schreibvorgängen der Datei in Sekunden
+METRICS_TEXTFILE_INTERVAL = float(os.getenv("METRICS_TEXTFILE_INTERVAL", "15"))
+
+# Die Dateien der Prozesse entstehen schon beim Import (siehe ``timed``)
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Von Mikrosekunden (Scoring) bis Minuten (Download, FinBERT)
+_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "econ_stage_duration_seconds",
+    "Dauer eines Aufrufs je Verarbeitungsstufe",
+    ["stage"],
+    buckets=_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "econ_stage_failures_total",
+    "Mit einer Ausnahme beendete Aufrufe je Verarbeitungsstufe",
+    ["stage"],
+)
+ARTICLES_PROCESSED = Counter(
+    "econ_articles_processed_total", "Analysierte Artikel mit neuem Signal"
+)
+NLP_CACHE_LOOKUPS = Counter(
+    "econ_nlp_cache_lookups_total",
+    "Abfragen des NLP‑Caches nach Ergebnis",
+    ["result"],
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Misst Dauer und Fehler einer Funktion unter dem Namen ``stage``.
+
+    Die Label‑Kinder werden einmal beim Dekorieren aufgelöst, sodass pro
+    Aufruf nur zwei Zeitmessungen und ein ``observe`` anfallen. Bei
+    Coroutine‑Funktionen wird bis zum Ende des ``await`` gemessen. Mit
+    ``METRICS_ENABLED=0`` bleibt die Funktion unverändert.
+
+    Args:
+        stage: Name der Stufe, z. B. ``"nlp.process_texts"``.
+    """
+    histogram = STAGE_SECONDS.labels(stage)
+    failures = STAGE_FAILURES.labels(stage)
+
+    def decorator(func: F) -> F:
+        if not METRICS_ENABLED:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    failures.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                failures.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def registry() -> CollectorRegistry:
+    """Registry zum Auslesen; im Multiprozessmodus über alle Prozesse."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        collected = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collected)
+        return collected
+    return REGISTRY
+
+
+def render() -> Tuple[bytes, str]:
+    """Erzeugt die Metriken im Textformat.
+
+    Returns:
+        Inhalt und Content‑Type für die HTTP‑Antwort.
+    """
+    return generate_latest(registry()), CONTENT_TYPE_LATEST
+
+
+_last_textfile_write = 0.0
+
+
+def write_textfile(path: Optional[str] = None, force: bool = False) -> bool:
+    """Schreibt die Metriken atomar in eine Datei im Textformat.
+
+    Args:
+        path: Zieldatei; Standard ist ``METRICS_TEXTFILE``.
+        force: Auch schreiben, wenn ``METRICS_TEXTFILE_INTERVAL`` seit dem
+            letzten Schreiben noch nicht vergangen ist.
+
+    Returns:
+        ``True``, wenn die Datei geschrieben wurde.
+    """
+    global _last_textfile_write
+    path = path or METRICS_TEXTFILE
+    if not path:
+        return False
+    now = time.monotonic()
+    if not force and now - _last_textfile_write < METRICS_TEXTFILE_INTERVAL:
+        return False
+    _last_textfile_write = now
+    write_to_textfile(path, registry())
+    return True
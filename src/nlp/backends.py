@@ -0,0 +1,197 @@
+"""
+backends.py
+===========
+
+Austauschbare Backends für die FinBERT‑Sentiment‑Analyse auf der CPU.
+Alle Backends liefern eine transformers‑Pipeline und verhalten sich für
+:func:`src.nlp.pipeline.predict_sentiments` daher identisch:
+
+* ``transformers`` – das unveränderte PyTorch‑Modell in fp32.
+* ``quantized`` – dynamisch auf int8 quantisierte Linear‑Schichten
+  (``torch.quantization.quantize_dynamic``).
+* ``onnx`` – Export nach ONNX und Ausführung mit ONNX Runtime; benötigt
+  ``optimum[onnxruntime]``.
+
+Das Backend wird über ``SENTIMENT_BACKEND`` gewählt. Mit
+``python -m src.nlp.backends`` lassen sich die Backends hinsichtlich
+Übereinstimmung mit dem fp32‑Modell und Durchsatz vergleichen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "transformers")
+# Optionales Verzeichnis, in dem der ONNX‑Export zwischengespeichert wird
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR")
+
+# Kurze Beispieltexte für den Vergleich, falls keine Datei angegeben ist
+SAMPLE_TEXTS = [
+    "The company issued a profit warning and lowered its full-year guidance.",
+    "Quarterly revenue rose 12 percent, beating analyst expectations.",
+    "The board proposed an unchanged dividend for the fiscal year.",
+    "Regulators opened an investigation into the bank's lending practices.",
+    "Shares jumped after the merger with its largest competitor was approved.",
+    "Operating margin declined due to higher energy and labour costs.",
+    "The firm reported results in line with the previous quarter.",
+    "Management expects demand to recover in the second half of the year.",
+]
+
+
+def _load_transformers(model_name: str):
+    from transformers import pipeline as hf_pipeline
+
+    return hf_pipeline("sentiment-analysis", model=model_name, tokenizer=model_name)
+
+
+def _load_quantized(model_name: str):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    from transformers import pipeline as hf_pipeline
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model = torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return hf_pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def _load_onnx(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        logger.error("Für SENTIMENT_BACKEND=onnx wird `optimum[onnxruntime]` benötigt.")
+        raise
+    from transformers import AutoTokenizer
+    from transformers import pipeline as hf_pipeline
+
+    if ONNX_MODEL_DIR and os.path.isdir(ONNX_MODEL_DIR):
+        model = ORTModelForSequenceClassification.from_pretrained(ONNX_MODEL_DIR)
+        tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_DIR)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(
+            model_name, export=True
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if ONNX_MODEL_DIR:
+            model.save_pretrained(ONNX_MODEL_DIR)
+            tokenizer.save_pretrained(ONNX_MODEL_DIR)
+    return hf_pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "transformers": _load_transformers,
+    "quantized": _load_quantized,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend(name: str, model_name: str):
+    """Lädt ein Sentiment‑Backend.
+
+    Args:
+        name: Name des Backends aus ``BACKENDS``.
+        model_name: Name oder Pfad des HuggingFace‑Modells.
+
+    Returns:
+        Eine aufrufbare Pipeline, die Listen von Texten verarbeitet.
+    """
+    try:
+        loader = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unbekanntes Sentiment‑Backend '{name}', "
+            f"erlaubt sind: {', '.join(BACKENDS)}"
+        ) from None
+    logger.info("Lade Sentiment‑Backend %s für %s", name, model_name)
+    return loader(model_name)
+
+
+def compare_backends(
+    texts: Sequence[str],
+    model_name: str,
+    backends: Sequence[str] = ("transformers", "quantized", "onnx"),
+    reference: str = "transformers",
+    batch_size: int = 32,
+) -> Dict[str, Dict[str, float]]:
+    """Vergleicht Backends mit dem Referenzmodell.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+        model_name: Name oder Pfad des HuggingFace‑Modells.
+        backends: Zu vergleichende Backends.
+        reference: Backend, dessen Labels als korrekt gelten.
+        batch_size: Batch‑Größe für die Inferenz.
+
+    Returns:
+        Pro Backend die Label‑Übereinstimmung mit der Referenz, die
+        maximale Abweichung des Scores bei gleichem Label und den Durchsatz
+        in Texten pro Sekunde.
+    """
+    from .pipeline import MAX_SENTIMENT_CHARS
+
+    truncated = [text[:MAX_SENTIMENT_CHARS] for text in texts]
+    outputs: Dict[str, List[Dict[str, Any]]] = {}
+    report: Dict[str, Dict[str, float]] = {}
+    for name in dict.fromkeys([reference, *backends]):
+        model = load_backend(name, model_name)
+        model(truncated[:batch_size], batch_size=batch_size, truncation=True)
+        started = time.perf_counter()
+        outputs[name] = model(truncated, batch_size=batch_size, truncation=True)
+        elapsed = time.perf_counter() - started
+        throughput = len(truncated) / elapsed if elapsed else 0.0
+        report[name] = {"texts_per_sec": throughput}
+
+    for name, results in outputs.items():
+        same_label = [
+            (result, expected)
+            for result, expected in zip(results, outputs[reference])
+            if result["label"] == expected["label"]
+        ]
+        report[name]["agreement"] = len(same_label) / len(truncated) if texts else 1.0
+        report[name]["max_score_diff"] = max(
+            (abs(r["score"] - e["score"]) for r, e in same_label), default=0.0
+        )
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Vergleicht Sentiment‑Backends mit dem fp32‑Modell."
+    )
+    parser.add_argument(
+        "--texts", help="Datei mit einem Text pro Zeile (Standard: Beispieltexte)"
+    )
+    parser.add_argument(
+        "--model", default=os.getenv("SENTIMENT_MODEL", "ProsusAI/finbert")
+    )
+    parser.add_argument(
+        "--backends", default="transformers,quantized,onnx", help="Kommagetrennt"
+    )
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    if args.texts:
+        with open(args.texts, encoding="utf-8") as handle:
+            texts = [line.strip() for line in handle if line.strip()]
+    else:
+        texts = SAMPLE_TEXTS
+    report = compare_backends(
+        texts,
+        args.model,
+        backends=[name.strip() for name in args.backends.split(",") if name.strip()],
+        batch_size=args.batch_size,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+cache.py
+========
+
+Inhaltsadressierter Cache für NLP‑Ergebnisse. Schlüssel sind ein Hash des
+Artikeltexts zusammen mit der Modell‑ bzw. Regelwerksversion, sodass
+unveränderte und syndizierte Texte nicht erneut durch spaCy, FinBERT und
+die Event‑Erkennung laufen.
+
+Der Cache hat zwei Ebenen: einen prozesslokalen LRU‑Speicher und optional
+Redis als gemeinsame Ebene für alle Worker. Beide Ebenen verwerfen
+Einträge nach Ablauf einer TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from ..metrics import NLP_CACHE_LOOKUPS
+from .events import classify_events_batch, get_matcher
+from .pipeline import FEATURES, model_version, process_texts
+
+logger = logging.getLogger(__name__)
+
+NLP_CACHE_SIZE = int(os.getenv("NLP_CACHE_SIZE", "10000"))
+NLP_CACHE_TTL = int(os.getenv("NLP_CACHE_TTL", str(7 * 24 * 3600)))
+# Ohne Angabe wird nur der prozesslokale Cache verwendet
+NLP_CACHE_REDIS_URL = os.getenv("NLP_CACHE_REDIS_URL")
+
+
+def text_key(namespace: str, version: str, text: str) -> str:
+    """Bildet den Cache‑Schlüssel für einen Text.
+
+    Args:
+        namespace: Art des Ergebnisses, z. B. ``"nlp"`` oder ``"events"``.
+        version: Modell‑ oder Regelwerksversion.
+        text: Der analysierte Text.
+
+    Returns:
+        Ein Schlüssel der Form ``namespace:version:sha256``.
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{namespace}:{version}:{digest}"
+
+
+class LRUCache:
+    """Threadsicherer LRU‑Speicher mit Größenlimit und TTL."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Liefert ``(True, Wert)`` bei einem Treffer, sonst ``(False, None)``."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class NLPCache:
+    """Zweistufiger Cache aus LRU‑Speicher und optionalem Redis.
+
+    Werte müssen JSON‑serialisierbar sein. Sie werden beim Speichern
+    einmal durch JSON geschickt, damit beide Ebenen identische Objekte
+    liefern (Tupel werden dabei zu Listen).
+
+    Args:
+        maxsize: Maximale Anzahl Einträge im LRU‑Speicher.
+        ttl: Lebensdauer eines Eintrags in Sekunden.
+        redis_client: Optionaler Redis‑Client für die gemeinsame Ebene.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, redis_client: Any = None) -> None:
+        self.memory = LRUCache(maxsize, ttl)
+        self.ttl = ttl
+        self.redis = redis_client
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        if amount:
+            with self._lock:
+                self.counters[name] += amount
+            NLP_CACHE_LOOKUPS.labels(name).inc(amount)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Liest mehrere Schlüssel; fehlende Einträge fehlen im Ergebnis."""
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        remaining: List[str] = []
+        for key in unique:
+            hit, value = self.memory.get(key)
+            if hit:
+                found[key] = value
+            else:
+                remaining.append(key)
+        self._count("memory_hits", len(found))
+
+        if remaining and self.redis is not None:
+            try:
+                raw_values = self.redis.mget(remaining)
+            except Exception:
+                logger.warning("Redis‑Cache nicht erreichbar", exc_info=True)
+                raw_values = [None] * len(remaining)
+            redis_hits = 0
+            for key, raw in zip(remaining, raw_values):
+                if raw is None:
+                    continue
+                value = json.loads(raw)
+                self.memory.set(key, value)
+                found[key] = value
+                redis_hits += 1
+            self._count("redis_hits", redis_hits)
+        self._count("misses", len(unique) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, Any]) -> Dict[str, Any]:
+        """Speichert mehrere Einträge in beiden Ebenen.
+
+        Returns:
+            Die gespeicherten Werte nach dem JSON‑Durchlauf.
+        """
+        if not items:
+            return {}
+        encoded = {key: json.dumps(value) for key, value in items.items()}
+        stored = {key: json.loads(raw) for key, raw in encoded.items()}
+        for key, value in stored.items():
+            self.memory.set(key, value)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, raw in encoded.items():
+                    pipe.set(key, raw, ex=self.ttl)
+                pipe.execute()
+            except Exception:
+                logger.warning("Redis‑Cache nicht erreichbar", exc_info=True)
+        return stored
+
+    def stats(self) -> Dict[str, int]:
+        """Liefert Trefferzähler und aktuelle Größe des LRU‑Speichers."""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["memory_size"] = len(self.memory)
+        return stats
+
+    def clear(self) -> None:
+        """Leert den prozesslokalen Speicher und setzt die Zähler zurück."""
+        self.memory.clear()
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> NLPCache:
+    """Erzeugt den prozessweiten Cache einmalig."""
+    redis_client = None
+    if NLP_CACHE_REDIS_URL:
+        import redis
+
+        redis_client = redis.Redis.from_url(NLP_CACHE_REDIS_URL)
+    return NLPCache(NLP_CACHE_SIZE, NLP_CACHE_TTL, redis_client=redis_client)
+
+
+def _cached(namespace: str, version: str, texts: Sequence[str], compute) -> List[Any]:
+    """Liest Ergebnisse aus dem Cache und berechnet nur die fehlenden.
+
+    Identische Texte innerhalb eines Aufrufs werden nur einmal berechnet.
+    """
+    cache = get_cache()
+    keys = [text_key(namespace, version, text) for text in texts]
+    found = cache.get_many(keys)
+    missing: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        computed = dict(zip(missing, compute(list(missing.values()))))
+        found.update(cache.set_many(computed))
+    return [found[key] for key in keys]
+
+
+def cached_process_texts(
+    texts: Sequence[str], features: Iterable[str] = FEATURES
+) -> List[Dict[str, Any]]:
+    """Wie :func:`process_texts`, aber mit Cache.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+        features: Gewünschte Merkmale.
+
+    Returns:
+        Pro Text ein Wörterbuch mit den angeforderten Merkmalen.
+    """
+    features = tuple(features)
+    version = f"{model_version()}|{','.join(sorted(features))}"
+    return _cached(
+        "nlp", version, texts, lambda batch: process_texts(batch, features=features)
+    )
+
+
+def cached_classify_events(texts: Sequence[str]) -> List[List[str]]:
+    """Wie :func:`classify_events_batch`, aber mit Cache.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+
+    Returns:
+        Pro Text die Liste der gefundenen Ereigniskategorien.
+    """
+    return _cached("events", get_matcher().version, texts, classify_events_batch)
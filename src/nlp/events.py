@@ -6,11 +6,26 @@ Regelbasierte Event‑Klassifikation. Diese Komponente erkennt
 wirtschaftsrelevante Ereignisse in Texten anhand einfacher
 Schlüsselwortmuster. Für produktive Einsätze sollte dieses Regelwerk
 umfassend gepflegt und bei Bedarf durch ML‑Modelle ergänzt werden.
+
+Alle Schlüsselwörter eines Regelwerks werden einmalig zu einem
+Aho‑Corasick‑Automaten kompiliert, sodass ein Text unabhängig von der
+Anzahl der Regeln nur einmal durchlaufen wird.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import ahocorasick
+
+from ..metrics import timed
+
+logger = logging.getLogger(__name__)
 
 
 EVENT_RULES = {
@@ -20,7 +35,221 @@ EVENT_RULES = {
     "dividend": ["dividend", "ausschüttung"],
 }
 
+# Optionaler Pfad zu einer JSON‑Datei mit einem eigenen Regelwerk
+EVENT_RULES_PATH = os.getenv("EVENT_RULES_PATH")
+# Schlüsselwörter nur am Wortanfang erkennen (siehe ``EventMatcher``)
+EVENT_WORD_BOUNDARY = os.getenv("EVENT_WORD_BOUNDARY", "0") == "1"
+# Bis zu dieser Anzahl Schlüsselwörter ist eine einfache Teilstring‑Suche
+# schneller als der Automat
+EVENT_SCAN_MAX_KEYWORDS = int(os.getenv("EVENT_SCAN_MAX_KEYWORDS", "32"))
+
+
+@dataclass(frozen=True)
+class EventMatch:
+    """Ein Treffer eines Schlüsselworts im Text."""
+
+    keyword: str
+    start: int
+    end: int
+
+
+class EventMatcher:
+    """Kompilierter Matcher für ein Regelwerk aus Kategorien und Schlüsselwörtern.
+
+    Die Schlüsselwörter werden in einen Aho‑Corasick‑Automaten übernommen,
+    der den kleingeschriebenen Text in einem Durchlauf nach allen
+    Schlüsselwörtern gleichzeitig durchsucht. Er meldet auch überlappende
+    Treffer; das Ergebnis entspricht damit einer Teilstring‑Suche für jedes
+    einzelne Wort, die Laufzeit hängt aber kaum von der Anzahl der
+    Schlüsselwörter ab. Kleine Regelwerke (bis ``EVENT_SCAN_MAX_KEYWORDS``)
+    klassifiziert :meth:`classify` per Teilstring‑Suche, die dort schneller
+    ist.
+
+    Args:
+        rules: Zuordnung von Kategorie zu Schlüsselwörtern.
+        word_boundary: Wenn ``True``, muss ein Schlüsselwort am Wortanfang
+            stehen („fusion“ trifft dann nicht mehr „confusion“). Endungen
+            wie in „Gewinnwarnungen“ bleiben erlaubt.
+    """
+
+    def __init__(
+        self, rules: Mapping[str, Sequence[str]], word_boundary: bool = False
+    ) -> None:
+        self.rules: Dict[str, List[str]] = {
+            category: [keyword.lower() for keyword in keywords]
+            for category, keywords in rules.items()
+        }
+        self.word_boundary = word_boundary
+
+        categories_by_keyword: Dict[str, List[str]] = {}
+        for category, keywords in self.rules.items():
+            for keyword in keywords:
+                if not keyword:
+                    continue
+                categories_by_keyword.setdefault(keyword, [])
+                if category not in categories_by_keyword[keyword]:
+                    categories_by_keyword[keyword].append(category)
+        self._categories = categories_by_keyword
+        self._scan = (
+            not word_boundary and len(categories_by_keyword) <= EVENT_SCAN_MAX_KEYWORDS
+        )
+
+        self._automaton: Optional[ahocorasick.Automaton] = None
+        if categories_by_keyword:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in categories_by_keyword:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    @property
+    def version(self) -> str:
+        """Kurzer Hash des Regelwerks, z. B. für Cache‑Schlüssel."""
+        payload = json.dumps(
+            {"rules": self.rules, "word_boundary": self.word_boundary},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+    def match(self, text: str) -> Dict[str, List[EventMatch]]:
+        """Findet alle Treffer im Text, gruppiert nach Kategorie.
+
+        Args:
+            text: Der zu analysierende Text.
+
+        Returns:
+            Zuordnung von Kategorie zu ihren Treffern mit Position im
+            Originaltext. Die Kategorien erscheinen in der Reihenfolge des
+            Regelwerks; Kategorien ohne Treffer fehlen.
+        """
+        found: Dict[str, List[EventMatch]] = {}
+        if self._automaton is None:
+            return found
+        hits = []
+        for last, keyword in self._automaton.iter(_lower(text)):
+            start = last + 1 - len(keyword)
+            if self.word_boundary and start and _is_word_char(text[start - 1]):
+                continue
+            hits.append(EventMatch(keyword=keyword, start=start, end=last + 1))
+        # Der Automat meldet Treffer nach ihrem Ende; wie bisher nach Beginn
+        # und bei gleichem Beginn das kürzere Schlüsselwort zuerst
+        hits.sort(key=lambda hit: (hit.start, hit.end))
+        for hit in hits:
+            for category in self._categories[hit.keyword]:
+                found.setdefault(category, []).append(hit)
+        return {
+            category: found[category] for category in self.rules if category in found
+        }
+
+    def classify(self, text: str) -> List[str]:
+        """Liefert die im Text gefundenen Ereigniskategorien.
+
+        Anders als :meth:`match` werden keine Positionen gesammelt; die
+        Suche endet, sobald alle Kategorien gefunden sind.
+        """
+        if self._automaton is None:
+            return []
+        lowered = _lower(text)
+        found = set()
+        if self._scan:
+            for keyword, categories in self._categories.items():
+                if keyword in lowered:
+                    found.update(categories)
+        else:
+            for last, keyword in self._automaton.iter(lowered):
+                start = last + 1 - len(keyword)
+                if self.word_boundary and start and _is_word_char(text[start - 1]):
+                    continue
+                found.update(self._categories[keyword])
+                if len(found) == len(self.rules):
+                    break
+        return [category for category in self.rules if category in found]
+
+    def classify_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """Klassifiziert mehrere Texte mit demselben kompilierten Automaten."""
+        return [self.classify(text) for text in texts]
+
+
+def _lower(text: str) -> str:
+    """Kleinschreibung, bei der jede Position im Originaltext erhalten bleibt."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # Wenige Zeichen wie „İ“ werden klein zu zwei Zeichen
+    return "".join(char.lower()[0] for char in text)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def load_rules(path: str) -> Dict[str, List[str]]:
+    """Liest ein Regelwerk aus einer JSON‑Datei.
+
+    Die Datei enthält ein Objekt, das Kategorien auf Listen von
+    Schlüsselwörtern abbildet, im selben Format wie ``EVENT_RULES``.
+
+    Args:
+        path: Pfad zur JSON‑Datei.
+
+    Returns:
+        Das geladene Regelwerk.
+    """
+    with open(path, encoding="utf-8") as handle:
+        rules = json.load(handle)
+    if not isinstance(rules, dict) or not all(
+        isinstance(keywords, list) for keywords in rules.values()
+    ):
+        raise ValueError(f"Ungültiges Regelwerk in {path}")
+    return rules
+
+
+_matcher: Optional[EventMatcher] = None
+
+
+def get_matcher() -> EventMatcher:
+    """Liefert den aktuell aktiven Matcher und baut ihn bei Bedarf auf."""
+    if _matcher is None:
+        reload_rules(EVENT_RULES_PATH)
+    assert _matcher is not None
+    return _matcher
+
+
+def reload_rules(
+    path: Optional[str] = None, word_boundary: bool = EVENT_WORD_BOUNDARY
+) -> EventMatcher:
+    """Ersetzt das aktive Regelwerk und kompiliert den Matcher neu.
+
+    Args:
+        path: Pfad zu einer JSON‑Datei; ohne Angabe wird ``EVENT_RULES``
+            verwendet.
+        word_boundary: Schlüsselwörter nur am Wortanfang erkennen;
+            Standard ist ``EVENT_WORD_BOUNDARY``.
+
+    Returns:
+        Der neu aufgebaute Matcher.
+    """
+    global _matcher
+    rules = load_rules(path) if path else EVENT_RULES
+    _matcher = EventMatcher(rules, word_boundary=word_boundary)
+    logger.info("Event‑Regelwerk %s geladen", _matcher.version)
+    return _matcher
+
 
+def match_events(text: str) -> Dict[str, List[EventMatch]]:
+    """Findet alle Ereignis‑Treffer mit Positionen im Text.
+
+    Args:
+        text: Der zu analysierende Text.
+
+    Returns:
+        Zuordnung von Kategorie zu ihren Treffern; die Anzahl der Treffer
+        ergibt sich aus der Länge der Liste.
+    """
+    return get_matcher().match(text)
+
+
+@timed("nlp.classify_events")
 def classify_events(text: str) -> List[str]:
     """Klassifiziert Ereignisse in einem Text anhand von Schlüsselwörtern.
 
@@ -30,9 +259,17 @@ def classify_events(text: str) -> List[str]:
     Returns:
         Eine Liste von Ereigniskategorien, die im Text gefunden wurden.
     """
-    text_lower = text.lower()
-    detected: List[str] = []
-    for category, keywords in EVENT_RULES.items():
-        if any(keyword in text_lower for keyword in keywords):
-            detected.append(category)
-    return detected
+    return get_matcher().classify(text)
+
+
+@timed("nlp.classify_events_batch")
+def classify_events_batch(texts: Iterable[str]) -> List[List[str]]:
+    """Klassifiziert Ereignisse für mehrere Texte.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+
+    Returns:
+        Pro Text die Liste der gefundenen Ereigniskategorien.
+    """
+    return get_matcher().classify_many(texts)
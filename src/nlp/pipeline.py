@@ -5,21 +5,69 @@ pipeline.py
 Dieses Modul definiert die NLP‑Pipeline zur Verarbeitung von Artikeln.
 Es verwendet spaCy für die linguistische Grundverarbeitung und das
 FinBERT‑Modell zur Sentiment‑Analyse. Darüber hinaus können regelbasierte
-Klassifikatoren integriert werden.
+Klassifikatoren integriert werden. Das Sentiment‑Backend (fp32, int8 oder
+ONNX Runtime) wird in :mod:`src.nlp.backends` ausgewählt.
+
+spaCy und transformers werden erst beim Laden der Modelle importiert,
+damit Prozesse, die nur lesen (z. B. die API), weder spaCy noch torch
+laden.
 """
 
 from __future__ import annotations
 
 import logging
+import os
 from functools import lru_cache
-from typing import Any, Dict
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..metrics import timed
+from .backends import SENTIMENT_BACKEND, load_backend
 
-import spacy
-from spacy.language import Language
-from transformers import pipeline as hf_pipeline
+if TYPE_CHECKING:
+    from spacy.language import Language
 
 logger = logging.getLogger(__name__)
 
+# Verwendete Modelle; fließen auch in die Versionskennung für Caches ein
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_lg")
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "ProsusAI/finbert")
+
+# Anzahl der Texte, die gemeinsam durch FinBERT geschickt werden
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+
+# Batch‑Größe und Prozessanzahl für ``nlp.pipe``
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+# Merkmale, die ``process_texts`` liefern kann
+FEATURES: Tuple[str, ...] = ("tokens", "sentences", "entities", "sentiment")
+
+# spaCy‑Komponenten, die für ein Merkmal benötigt werden; der Tokenizer
+# läuft immer und steht deshalb nicht in der Liste
+_FEATURE_COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    "tokens": (),
+    "sentences": ("parser",),
+    "entities": ("ner",),
+}
+
+# Im Streaming‑Modus werden so viele Texte gesammelt, bevor das Sentiment
+# berechnet wird; mehrere Batches pro Fenster erlauben Längen‑Bucketing
+SENTIMENT_WINDOW = SENTIMENT_BATCH_SIZE * 8
+
+# FinBERT verarbeitet maximal 512 Token; wir kürzen vorab auf Zeichenebene
+MAX_SENTIMENT_CHARS = 512
+
 
 @lru_cache(maxsize=1)
 def get_spacy_model() -> Language:
@@ -28,12 +76,16 @@ def get_spacy_model() -> Language:
     Returns:
         Ein geladenes spaCy‑Modell.
     """
+    import spacy
+
     try:
-        nlp = spacy.load("en_core_web_lg")
+        nlp = spacy.load(SPACY_MODEL)
     except OSError:
         logger.error(
-            "Das spaCy‑Modell 'en_core_web_lg' ist nicht installiert. "
-            "Bitte führen Sie `python -m spacy download en_core_web_lg` aus."
+            "Das spaCy‑Modell '%s' ist nicht installiert. "
+            "Bitte führen Sie `python -m spacy download %s` aus.",
+            SPACY_MODEL,
+            SPACY_MODEL,
         )
         raise
     return nlp
@@ -41,16 +93,158 @@ def get_spacy_model() -> Language:
 
 @lru_cache(maxsize=1)
 def get_sentiment_model():
-    """Lädt das FinBERT‑Sentiment‑Pipeline von HuggingFace.
+    """Lädt das FinBERT‑Sentiment‑Pipeline über das konfigurierte Backend.
 
     Returns:
         Eine transformers‑Pipeline zur Sentiment‑Analyse.
     """
-    return hf_pipeline(
-        "sentiment-analysis", model="ProsusAI/finbert", tokenizer="ProsusAI/finbert"
+    return load_backend(SENTIMENT_BACKEND, SENTIMENT_MODEL)
+
+
+def model_version() -> str:
+    """Kennung der verwendeten Modelle, z. B. für Cache‑Schlüssel."""
+    return f"{SPACY_MODEL}|{SENTIMENT_MODEL}|{SENTIMENT_BACKEND}"
+
+
+@timed("nlp.sentiment")
+def predict_sentiments(
+    texts: Sequence[str], batch_size: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """Berechnet das FinBERT‑Sentiment für mehrere Texte in Batches.
+
+    Die Texte werden vor dem Batching nach Länge sortiert, damit innerhalb
+    eines Batches möglichst wenig Padding anfällt. Die Ergebnisse werden
+    anschließend wieder in die ursprüngliche Reihenfolge gebracht.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+        batch_size: Anzahl Texte pro Modellaufruf; Standard ist
+            ``SENTIMENT_BATCH_SIZE``.
+
+    Returns:
+        Pro Text eine Liste mit einem Dict aus ``label`` und ``score`` –
+        dasselbe Format, das die Pipeline für einen einzelnen Text liefert.
+    """
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    if not texts:
+        return []
+    finbert = get_sentiment_model()
+    truncated = [text[:MAX_SENTIMENT_CHARS] for text in texts]
+    # Längen‑Bucketing: ähnlich lange Texte landen im selben Batch
+    order = sorted(range(len(truncated)), key=lambda i: len(truncated[i]))
+    results: List[List[Dict[str, Any]]] = [[] for _ in truncated]
+    for start in range(0, len(order), batch_size):
+        chunk = order[start : start + batch_size]
+        outputs = finbert(
+            [truncated[i] for i in chunk], batch_size=len(chunk), truncation=True
+        )
+        for index, output in zip(chunk, outputs):
+            results[index] = [output]
+    return results
+
+
+def _disabled_components(nlp: Language, features: Iterable[str]) -> List[str]:
+    """Ermittelt die spaCy‑Komponenten, die für ``features`` unnötig sind."""
+    required = set()
+    for feature in features:
+        required.update(_FEATURE_COMPONENTS.get(feature, ()))
+    # Komponenten wie ``tok2vec`` werden von anderen als Listener genutzt
+    # und müssen mitlaufen, sobald einer ihrer Zuhörer benötigt wird.
+    for name in nlp.pipe_names:
+        listeners = getattr(nlp.get_pipe(name), "listening_components", ())
+        if required.intersection(listeners):
+            required.add(name)
+    return [name for name in nlp.pipe_names if name not in required]
+
+
+def _chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Zerlegt ein Iterable in Listen der Länge ``size``."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_process_texts(
+    texts: Iterable[str],
+    features: Sequence[str] = FEATURES,
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Verarbeitet einen Strom von Texten und liefert die Ergebnisse einzeln.
+
+    spaCy läuft über ``nlp.pipe``; Komponenten, die für die angeforderten
+    Merkmale nicht gebraucht werden, sind dabei deaktiviert. Wird nur das
+    Sentiment angefordert, entfällt spaCy vollständig.
+
+    Args:
+        texts: Die zu analysierenden Texte; auch Generatoren sind erlaubt.
+        features: Gewünschte Merkmale, eine Teilmenge von ``FEATURES``.
+        batch_size: Batch‑Größe für ``nlp.pipe``.
+        n_process: Anzahl der spaCy‑Prozesse.
+
+    Yields:
+        Pro Text ein Wörterbuch, das nur die angeforderten Merkmale enthält.
+    """
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unbekannte Merkmale: {sorted(unknown)}")
+    needs_spacy = any(feature in _FEATURE_COMPONENTS for feature in features)
+    if needs_spacy:
+        nlp = get_spacy_model()
+        docs = nlp.pipe(
+            texts,
+            batch_size=batch_size or SPACY_BATCH_SIZE,
+            n_process=n_process or SPACY_N_PROCESS,
+            disable=_disabled_components(nlp, features),
+        )
+        items: Iterable[Tuple[str, Any]] = ((doc.text, doc) for doc in docs)
+    else:
+        items = ((text, None) for text in texts)
+
+    for chunk in _chunked(items, SENTIMENT_WINDOW):
+        if "sentiment" in features:
+            sentiments = predict_sentiments([text for text, _ in chunk])
+        else:
+            sentiments = [None] * len(chunk)
+        for (_, doc), sentiment in zip(chunk, sentiments):
+            result: Dict[str, Any] = {}
+            if "tokens" in features:
+                result["tokens"] = [token.text for token in doc]
+            if "sentences" in features:
+                result["sentences"] = [sent.text for sent in doc.sents]
+            if "entities" in features:
+                result["entities"] = [(ent.text, ent.label_) for ent in doc.ents]
+            if "sentiment" in features:
+                result["sentiment"] = sentiment
+            yield result
+
+
+@timed("nlp.process_texts")
+def process_texts(
+    texts: Sequence[str],
+    features: Sequence[str] = FEATURES,
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Verarbeitet mehrere Texte gemeinsam durch die NLP‑Pipeline.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+        features: Gewünschte Merkmale, eine Teilmenge von ``FEATURES``.
+        batch_size: Batch‑Größe für ``nlp.pipe``.
+        n_process: Anzahl der spaCy‑Prozesse.
+
+    Returns:
+        Pro Text ein Wörterbuch im Format von :func:`process_text`.
+    """
+    return list(
+        iter_process_texts(
+            texts, features=features, batch_size=batch_size, n_process=n_process
+        )
     )
 
 
+@timed("nlp.process_text")
 def process_text(text: str) -> Dict[str, Any]:
     """Verarbeitet den gegebenen Text durch die NLP‑Pipeline.
 
@@ -60,15 +254,4 @@ def process_text(text: str) -> Dict[str, Any]:
     Returns:
         Ein Wörterbuch mit Token, Sentiment‑Score und anderen Merkmalen.
     """
-    nlp = get_spacy_model()
-    finbert = get_sentiment_model()
-
-    doc = nlp(text)
-    sentiment = finbert(text[:512])  # FinBERT verarbeitet maximal 512 Token
-
-    return {
-        "tokens": [token.text for token in doc],
-        "sentences": [sent.text for sent in doc.sents],
-        "entities": [(ent.text, ent.label_) for ent in doc.ents],
-        "sentiment": sentiment,
-    }
+    return process_texts([text])[0]
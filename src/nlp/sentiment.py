@@ -7,9 +7,9 @@ Wrapper‑Funktionen für die Sentiment‑Analyse mit FinBERT.
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 
-from .pipeline import get_sentiment_model
+from .pipeline import predict_sentiments
 
 
 def analyze_sentiment(text: str) -> List[Dict[str, float | str]]:
@@ -21,5 +21,19 @@ def analyze_sentiment(text: str) -> List[Dict[str, float | str]]:
     Returns:
         Eine Liste von Ergebnisobjekten mit Label und Score.
     """
-    model = get_sentiment_model()
-    return model(text[:512])
+    return predict_sentiments([text])[0]
+
+
+def analyze_sentiments(
+    texts: Sequence[str], batch_size: Optional[int] = None
+) -> List[List[Dict[str, float | str]]]:
+    """Führt die Sentiment‑Analyse für mehrere Texte gebündelt durch.
+
+    Args:
+        texts: Die zu analysierenden Texte.
+        batch_size: Anzahl Texte pro Modellaufruf.
+
+    Returns:
+        Pro Text eine Liste von Ergebnisobjekten mit Label und Score.
+    """
+    return predict_sentiments(texts, batch_size=batch_size)
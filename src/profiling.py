@@ -0,0 +1,318 @@
+"""
+profiling.py
+============
+
+Optionale Profile einzelner API‑Anfragen und Celery‑Tasks. Während die
+Metriken aus :mod:`src.metrics` nur zeigen, welche Stufe langsam ist,
+zeigt ein Profil, wo innerhalb eines Aufrufs die Zeit vergeht.
+
+Profiliert wird nur mit ``PROFILE_ENABLED=1``, und dann nur ein Anteil
+von ``PROFILE_SAMPLE_RATE`` aller Anfragen bzw. ``PROFILE_TASK_SAMPLE_RATE``
+aller Tasks oder Anfragen mit dem Header ``X-Profile: 1``. Jedes Profil
+landet zusammen mit einer JSON‑Datei (Art, Name, ID, Dauer) in
+``PROFILE_DIR``; die langsamsten zeigt ``/profiles`` bzw.::
+
+    python -m src.profiling --limit 20
+
+Tasks werden mit ``cProfile`` profiliert (``.prof``, lesbar mit
+``pstats`` oder snakeviz). Synchrone Endpunkte laufen in einem
+Threadpool, den ``cProfile`` nicht sieht; API‑Anfragen werden deshalb mit
+einem Stack‑Sampler aufgezeichnet, der alle Threads abtastet und
+zusammengefasste Stacks (``.txt``, für flamegraph.pl oder speedscope)
+schreibt. Parallel laufende Anfragen erscheinen dabei mit im Profil.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, List, Mapping, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Anteil der API‑Anfragen bzw. Tasks, die ohne Header profiliert werden
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TASK_SAMPLE_RATE = float(
+    os.getenv("PROFILE_TASK_SAMPLE_RATE", str(PROFILE_SAMPLE_RATE))
+)
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+# Abtastintervall des Stack‑Samplers in Sekunden
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+# Ältere Profile werden über dieser Anzahl gelöscht
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class ProfileRecord:
+    """Metadaten eines gespeicherten Profils.
+
+    Attributes:
+        id: ID der Anfrage bzw. des Tasks.
+        kind: ``"request"`` oder ``"task"``.
+        name: Pfad der Anfrage bzw. Name des Tasks.
+        duration_ms: Dauer des profilierten Aufrufs.
+        started_at: Startzeitpunkt (UTC, ISO‑Format).
+        file: Dateiname des Profils in ``PROFILE_DIR``.
+    """
+
+    id: str
+    kind: str
+    name: str
+    duration_ms: float
+    started_at: str
+    file: str
+
+
+def requested(headers: Mapping[str, str]) -> bool:
+    """Prüft, ob eine Anfrage per Header ein Profil anfordert."""
+    return bool(PROFILE_HEADER) and headers.get(PROFILE_HEADER) == "1"
+
+
+def should_profile(rate: float, forced: bool = False) -> bool:
+    """Entscheidet, ob ein Aufruf profiliert wird."""
+    if not PROFILE_ENABLED:
+        return False
+    return forced or (rate > 0 and random.random() < rate)
+
+
+class StackSampler:
+    """Tastet in einem Hintergrund‑Thread die Stacks aller Threads ab.
+
+    Args:
+        interval: Abstand zwischen zwei Abtastungen in Sekunden.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(
+                        f"{code.co_name} ({Path(code.co_filename).name}:"
+                        f"{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Die Stacks im Format ``a;b;c Anzahl`` pro Zeile."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def save_profile(
+    kind: str,
+    name: str,
+    ident: str,
+    duration: float,
+    started_at: datetime,
+    write: Callable[[Path], Any],
+    suffix: str,
+    directory: Optional[str] = None,
+) -> ProfileRecord:
+    """Speichert ein Profil samt Metadaten und löscht zu alte Profile.
+
+    Args:
+        kind: ``"request"`` oder ``"task"``.
+        name: Pfad der Anfrage bzw. Name des Tasks.
+        ident: ID der Anfrage bzw. des Tasks.
+        duration: Dauer in Sekunden.
+        started_at: Startzeitpunkt.
+        write: Schreibt das Profil in den übergebenen Pfad.
+        suffix: Dateiendung des Profils, z. B. ``".prof"``.
+        directory: Zielverzeichnis; Standard ist ``PROFILE_DIR``.
+
+    Returns:
+        Die gespeicherten Metadaten.
+    """
+    path = Path(directory or PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    stem = "-".join(
+        [
+            started_at.strftime("%Y%m%dT%H%M%S%f"),
+            kind,
+            _UNSAFE_CHARS.sub("_", name).strip("_")[:60],
+            ident[:12],
+        ]
+    )
+    write(path / f"{stem}{suffix}")
+    record = ProfileRecord(
+        id=ident,
+        kind=kind,
+        name=name,
+        duration_ms=round(duration * 1000, 3),
+        started_at=started_at.isoformat(),
+        file=f"{stem}{suffix}",
+    )
+    (path / f"{stem}.json").write_text(json.dumps(asdict(record)), encoding="utf-8")
+    _prune(path)
+    return record
+
+
+def _prune(path: Path, keep: int = PROFILE_MAX_FILES) -> None:
+    # Dateinamen beginnen mit dem Startzeitpunkt
+    for meta in sorted(path.glob("*.json"))[:-keep]:
+        try:
+            record = json.loads(meta.read_text(encoding="utf-8"))
+            (path / record["file"]).unlink(missing_ok=True)
+        except (OSError, ValueError, KeyError):
+            logger.debug("Profil %s unvollständig", meta, exc_info=True)
+        meta.unlink(missing_ok=True)
+
+
+def list_profiles(
+    limit: int = 20, kind: Optional[str] = None, directory: Optional[str] = None
+) -> List[ProfileRecord]:
+    """Liefert die langsamsten gespeicherten Profile.
+
+    Args:
+        limit: Maximale Anzahl.
+        kind: Nur ``"request"`` oder nur ``"task"``.
+        directory: Verzeichnis der Profile; Standard ist ``PROFILE_DIR``.
+
+    Returns:
+        Die Profile absteigend nach Dauer.
+    """
+    path = Path(directory or PROFILE_DIR)
+    records = []
+    for meta in path.glob("*.json"):
+        try:
+            record = ProfileRecord(**json.loads(meta.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            continue
+        if kind is None or record.kind == kind:
+            records.append(record)
+    records.sort(key=lambda record: record.duration_ms, reverse=True)
+    return records[:limit]
+
+
+async def profile_request(request: Any, call_next: Callable) -> Any:
+    """HTTP‑Middleware, die ausgewählte Anfragen mit dem Stack‑Sampler aufzeichnet.
+
+    Bei Streaming‑Antworten endet die Messung, sobald die Header gesendet
+    werden. Die ID des Profils steht im Antwort‑Header ``X-Profile-Id``.
+    """
+    if not should_profile(PROFILE_SAMPLE_RATE, requested(request.headers)):
+        return await call_next(request)
+    sampler = StackSampler()
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        sampler.stop()
+        duration = time.perf_counter() - started
+        collapsed = sampler.collapsed()
+        record = save_profile(
+            "request",
+            f"{request.method} {request.url.path}",
+            uuid.uuid4().hex,
+            duration,
+            started_at,
+            lambda path: path.write_text(collapsed, encoding="utf-8"),
+            ".txt",
+        )
+    response.headers["X-Profile-Id"] = record.id
+    return response
+
+
+def profile_task(func: F) -> F:
+    """Dekorator, der ausgewählte Ausführungen eines Celery‑Tasks profiliert.
+
+    Wird zwischen ``@shared_task`` und die Funktion gesetzt. Neben der
+    Abtastrate erzwingt der Nachrichten‑Header ``profile`` ein Profil,
+    z. B. ``task.apply_async(args, headers={"profile": "1"})``. Ohne
+    ``PROFILE_ENABLED`` bleibt die Funktion unverändert.
+    """
+    if not PROFILE_ENABLED:
+        return func
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        from celery import current_task
+
+        request = getattr(current_task, "request", None)
+        forced = str(getattr(request, "profile", "")) == "1"
+        if not should_profile(PROFILE_TASK_SAMPLE_RATE, forced):
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Ein anderer Profiler ist bereits aktiv
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            save_profile(
+                "task",
+                func.__name__,
+                getattr(request, "id", None) or uuid.uuid4().hex,
+                time.perf_counter() - started,
+                started_at,
+                lambda path: profiler.dump_stats(str(path)),
+                ".prof",
+            )
+
+    return wrapper  # type: ignore[return-value]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Langsamste Profile anzeigen.")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--kind", choices=("request", "task"))
+    parser.add_argument("--directory", default=PROFILE_DIR)
+    args = parser.parse_args(argv)
+    for record in list_profiles(args.limit, args.kind, args.directory):
+        print(
+            f"{record.duration_ms:>10.1f} ms  {record.kind:<7}  {record.name:<40}  "
+            f"{record.id}  {record.file}"
+        )
+
+
+if __name__ == "__main__":
+    main()
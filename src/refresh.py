@@ -0,0 +1,384 @@
+"""
+refresh.py
+==========
+
+Gemeinsame Ablauflogik für die Aktualisierung der Datenbasis. Die
+Funktionen werden sowohl vom FastAPI‑Endpoint ``/refresh`` als auch von
+den Celery‑Tasks genutzt, damit beide Pfade identisch arbeiten.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .db import crud, models
+from .ingestion.article_processor import ArticleContent, download_articles
+from .ingestion.dedup import (
+    DEDUP_ENABLED,
+    DEDUP_THRESHOLD,
+    Fingerprint,
+    from_bytes,
+    similarity,
+    to_bytes,
+)
+from .ingestion.rss_fetcher import FeedEntry, FeedState, fetch_rss_feed, mark_seen
+from .ingestion.urls import normalize_url
+from .metrics import ARTICLES_PROCESSED, timed
+from .nlp.cache import cached_classify_events, cached_process_texts
+from .scoring.scoring import heuristic_score
+
+logger = logging.getLogger(__name__)
+
+FEED_URLS = [
+    "https://www.handelsblatt.com/rss",
+    "https://www.faz.net/rss/aktuell/",  # Beispiele; in Produktion konfigurieren
+]
+
+# Anzahl heruntergeladener Artikel, die gemeinsam gespeichert und
+# verarbeitet werden
+REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "50"))
+# Artikel ohne Signal werden erst nach so vielen Sekunden erneut
+# verarbeitet; jüngere sind womöglich noch in Arbeit
+REFRESH_RETRY_AFTER = int(os.getenv("REFRESH_RETRY_AFTER", "900"))
+
+
+@timed("refresh.process_articles")
+def process_articles(
+    db: Session, articles: Sequence[models.Article]
+) -> List[models.Signal]:
+    """Analysiert mehrere Artikel gebündelt und legt je ein Signal an.
+
+    Die Sentiment‑Analyse läuft über :func:`process_texts` in Batches,
+    statt das Modell für jeden Artikel einzeln aufzurufen. Da nur das
+    Sentiment benötigt wird, bleibt spaCy dabei außen vor. Ergebnisse für
+    bereits analysierte Texte kommen aus dem NLP‑Cache.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        articles: Die zu verarbeitenden Artikel.
+
+    Returns:
+        Die neu angelegten Signale in der Reihenfolge der Artikel.
+    """
+    texts = [article.text for article in articles]
+    nlp_results = cached_process_texts(texts, features=("sentiment",))
+    event_lists = cached_classify_events(texts)
+    rows = []
+    for article, nlp_result, events in zip(articles, nlp_results, event_lists):
+        score = heuristic_score(nlp_result["sentiment"], events)
+        rows.append(
+            {
+                "article_id": article.id,
+                "sentiment_label": nlp_result["sentiment"][0]["label"],
+                "sentiment_score": float(nlp_result["sentiment"][0]["score"]),
+                "events": events,
+                "score": score,
+            }
+        )
+    signals = crud.create_signals_bulk(db, rows)
+    ARTICLES_PROCESSED.inc(len(signals))
+    return signals
+
+
+def _find_duplicates(
+    db: Session, fingerprints: Sequence[Optional[Fingerprint]]
+) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """Sucht für jeden Fingerprint eines Blocks einen kanonischen Artikel.
+
+    Die LSH‑Kandidaten aller Fingerprints werden mit einer Abfrage
+    geladen. Innerhalb des Blocks wird zusätzlich gegen die vorherigen,
+    nicht als Duplikat erkannten Einträge verglichen.
+
+    Returns:
+        Zwei Zuordnungen: Index im Block → ID eines gespeicherten
+        kanonischen Artikels und Index im Block → Index des kanonischen
+        Eintrags im selben Block.
+    """
+    candidates = crud.find_lsh_candidates(
+        db, (key for fp in fingerprints if fp is not None for key in fp.bands)
+    )
+    stored: Dict[int, int] = {}
+    in_batch: Dict[int, int] = {}
+    batch_bands: Dict[Tuple[int, int], List[int]] = {}
+    for index, fp in enumerate(fingerprints):
+        if fp is None:
+            continue
+        best_score, best_stored, best_index = 0.0, None, None
+        for key in fp.bands:
+            for article_id, raw in candidates.get(key, ()):
+                score = similarity(fp.signature, from_bytes(raw))
+                if score > best_score:
+                    best_score, best_stored, best_index = score, article_id, None
+            for other in batch_bands.get(key, ()):
+                score = similarity(fp.signature, fingerprints[other].signature)
+                if score > best_score:
+                    best_score, best_stored, best_index = score, None, other
+        if best_score >= DEDUP_THRESHOLD:
+            if best_stored is not None:
+                stored[index] = best_stored
+            else:
+                in_batch[index] = best_index
+            continue
+        for key in fp.bands:
+            batch_bands.setdefault(key, []).append(index)
+    return stored, in_batch
+
+
+def store_articles(
+    db: Session, contents: Sequence[ArticleContent]
+) -> List[models.Article]:
+    """Speichert heruntergeladene Artikel gebündelt in der Datenbank.
+
+    Für jeden Artikel wird eine MinHash‑Signatur berechnet. Nahezu
+    identische Kopien bereits gespeicherter oder im selben Block
+    enthaltener Artikel werden über ``canonical_id`` ihrem kanonischen
+    Artikel zugeordnet; nur kanonische Artikel erhalten LSH‑Bänder.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        contents: Die heruntergeladenen Artikelinhalte.
+
+    Returns:
+        Die neu angelegten Artikel; Artikel, die parallel bereits von
+        einem anderen Worker gespeichert wurden, fehlen. Duplikate sind
+        enthalten und an ``canonical_id`` zu erkennen.
+    """
+    fingerprints: List[Optional[Fingerprint]] = [
+        Fingerprint.from_text(content.text) if DEDUP_ENABLED else None
+        for content in contents
+    ]
+    stored, in_batch = _find_duplicates(db, fingerprints)
+    rows = [
+        {
+            "url": content.url,
+            "title": content.title,
+            "authors": ", ".join(content.authors),
+            "text": content.text,
+            "published_at": content.publish_date,
+            "minhash": to_bytes(fp.signature) if fp is not None else None,
+            "canonical_id": stored.get(index),
+        }
+        for index, (content, fp) in enumerate(zip(contents, fingerprints))
+    ]
+    # Duplikate innerhalb des Blocks erst nach ihrem kanonischen Artikel
+    # speichern, dessen ID dann bekannt ist
+    articles = crud.create_articles_bulk(
+        db, [row for index, row in enumerate(rows) if index not in in_batch]
+    )
+    by_url = {article.url: article for article in articles}
+    duplicates = []
+    for index, canonical_index in in_batch.items():
+        canonical = by_url.get(rows[canonical_index]["url"])
+        duplicates.append(
+            dict(rows[index], canonical_id=canonical.id if canonical else None)
+        )
+    articles += crud.create_articles_bulk(db, duplicates)
+
+    crud.save_lsh_bands(
+        db,
+        [
+            {"band": band, "bucket": bucket, "article_id": by_url[row["url"]].id}
+            for row, fp in zip(rows, fingerprints)
+            if fp is not None and row["canonical_id"] is None and row["url"] in by_url
+            for band, bucket in fp.bands
+        ],
+    )
+    return articles
+
+
+def canonical_articles(articles: Sequence[models.Article]) -> List[models.Article]:
+    """Filtert Duplikate heraus; nur kanonische Artikel werden analysiert."""
+    return [article for article in articles if article.canonical_id is None]
+
+
+def load_feed_state(db: Session, feed_url: str) -> FeedState:
+    """Liest den gespeicherten Abrufzustand eines Feeds."""
+    feed = crud.get_feed(db, feed_url)
+    if feed is None:
+        return FeedState()
+    return FeedState(
+        etag=feed.etag,
+        modified=feed.modified,
+        seen_guids=list(feed.seen_guids or []),
+    )
+
+
+def save_feed_state(db: Session, feed_url: str, state: FeedState) -> None:
+    """Schreibt den Abrufzustand eines Feeds fest."""
+    crud.save_feed_state(db, feed_url, state.etag, state.modified, state.seen_guids)
+
+
+def commit_feed_state(
+    db: Session, feed_url: str, state: FeedState, entries: Sequence[FeedEntry]
+) -> FeedState:
+    """Schreibt den Abrufzustand fest, soweit die Artikel gespeichert sind.
+
+    Als gesehen gelten nur Einträge, deren Artikel jetzt in der Datenbank
+    liegen; endgültig fehlgeschlagene Downloads erscheinen beim nächsten
+    Abruf erneut. Fehlt ein Artikel, bleiben ETag und Last‑Modified auf dem
+    gespeicherten Stand, damit der Feed nicht mit ``304`` beantwortet wird.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        feed_url: URL des Feeds.
+        state: Zustand nach dem Abruf mit :func:`fetch_rss_feed`.
+        entries: Die beim Abruf gelieferten Einträge.
+
+    Returns:
+        Der gespeicherte Zustand.
+    """
+    previous = load_feed_state(db, feed_url)
+    links = [entry.link for entry in entries if entry.link]
+    known = crud.get_existing_urls(db, [*links, *map(normalize_url, links)])
+
+    def stored(entry: FeedEntry) -> bool:
+        return (
+            not entry.link or entry.link in known or normalize_url(entry.link) in known
+        )
+
+    pending = [entry for entry in entries if not stored(entry)]
+    result = FeedState(
+        etag=previous.etag if pending else state.etag,
+        modified=previous.modified if pending else state.modified,
+        seen_guids=list(previous.seen_guids),
+    )
+    mark_seen(result, [entry.guid for entry in entries if stored(entry)])
+    if pending:
+        logger.warning(
+            "%d Einträge aus %s nicht gespeichert; sie werden erneut abgerufen",
+            len(pending),
+            feed_url,
+        )
+    save_feed_state(db, feed_url, result)
+    return result
+
+
+def filter_new_links(db: Session, links: Iterable[str]) -> List[str]:
+    """Normalisiert Links und entfernt bereits gespeicherte Artikel.
+
+    Alle Links werden mit einer einzigen Abfrage geprüft; ältere Artikel
+    sind ggf. noch unter der nicht normalisierten URL gespeichert.
+
+    Returns:
+        Die normalisierten URLs der noch unbekannten Artikel.
+    """
+    # normalisierte URL -> URL aus dem Feed
+    candidates: Dict[str, str] = {}
+    for link in links:
+        if link:
+            candidates.setdefault(normalize_url(link), link)
+    known = crud.get_existing_urls(db, [*candidates, *candidates.values()])
+    return [
+        normalized
+        for normalized, original in candidates.items()
+        if normalized not in known and original not in known
+    ]
+
+
+def unprocessed_article_ids(
+    db: Session, retry_after: int = REFRESH_RETRY_AFTER
+) -> List[int]:
+    """IDs gespeicherter Artikel, deren Verarbeitung fehlgeschlagen ist.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        retry_after: Mindestalter der Artikel in Sekunden.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=retry_after)
+    return crud.get_unprocessed_article_ids(db, created_before=cutoff)
+
+
+def process_pending_articles(
+    db: Session,
+    batch_size: int = REFRESH_BATCH_SIZE,
+    retry_after: int = REFRESH_RETRY_AFTER,
+) -> int:
+    """Verarbeitet gespeicherte Artikel, die noch kein Signal haben.
+
+    Returns:
+        Anzahl der nachträglich verarbeiteten Artikel.
+    """
+    article_ids = unprocessed_article_ids(db, retry_after)
+    processed = 0
+    for start in range(0, len(article_ids), batch_size):
+        articles = crud.get_unprocessed_articles(
+            db, article_ids[start : start + batch_size]
+        )
+        processed += len(process_articles(db, articles))
+    if processed:
+        logger.info("%d liegengebliebene Artikel verarbeitet", processed)
+    return processed
+
+
+def download_and_process(
+    db: Session, links: Sequence[str], batch_size: int = REFRESH_BATCH_SIZE
+) -> int:
+    """Lädt Artikel parallel herunter, speichert und verarbeitet sie.
+
+    Heruntergeladene Artikel werden in Blöcken von ``batch_size``
+    gespeichert und verarbeitet, jeweils mit einem Bulk‑INSERT für Artikel
+    und Signale. Erkannte Duplikate werden gespeichert, aber nicht
+    analysiert.
+
+    Returns:
+        Anzahl der neu verarbeiteten Artikel.
+    """
+    processed = 0
+    batch: List[ArticleContent] = []
+    for article_content in download_articles(links):
+        batch.append(article_content)
+        if len(batch) >= batch_size:
+            articles = canonical_articles(store_articles(db, batch))
+            processed += len(process_articles(db, articles))
+            batch = []
+    if batch:
+        articles = canonical_articles(store_articles(db, batch))
+        processed += len(process_articles(db, articles))
+    return processed
+
+
+def refresh_feeds(
+    db: Session,
+    feed_urls: Sequence[str] = FEED_URLS,
+    batch_size: int = REFRESH_BATCH_SIZE,
+) -> int:
+    """Lädt neue Artikel aus den Feeds und verarbeitet sie.
+
+    Der Abrufzustand jedes Feeds (ETag, Last‑Modified, gesehene Einträge)
+    wird in der Datenbank gespeichert, sodass unveränderte Feeds nicht
+    erneut geladen und bekannte Einträge übersprungen werden. Die Links
+    werden normalisiert und mit einer einzigen Abfrage gegen die bereits
+    gespeicherten Artikel abgeglichen; neue Artikel werden unter der
+    normalisierten URL abgelegt. Gespeicherte Artikel, deren Verarbeitung
+    in einem früheren Lauf fehlgeschlagen ist, werden zuerst nachgeholt.
+
+    Dies ist der synchrone Ablauf in einem Prozess; die Celery‑Tasks
+    verteilen dieselben Schritte auf mehrere Worker.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        feed_urls: Die abzufragenden RSS‑Feeds.
+        batch_size: Anzahl Artikel pro Speicher‑ und Verarbeitungsblock.
+
+    Returns:
+        Anzahl der neu verarbeiteten Artikel.
+    """
+    processed = process_pending_articles(db, batch_size=batch_size)
+    states = {url: load_feed_state(db, url) for url in feed_urls}
+    entries = {url: fetch_rss_feed(url, state) for url, state in states.items()}
+    links = filter_new_links(
+        db, (entry.link for feed_entries in entries.values() for entry in feed_entries)
+    )
+    processed += download_and_process(db, links, batch_size=batch_size)
+    # Zustand erst nach der Verarbeitung festschreiben, damit ein
+    # abgebrochener Lauf oder ein fehlgeschlagener Download die Einträge
+    # beim nächsten Mal erneut sieht
+    for url, state in states.items():
+        commit_feed_state(db, url, state, entries[url])
+    logger.info("%d Artikel verarbeitet", processed)
+    return processed
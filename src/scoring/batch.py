@@ -0,0 +1,144 @@
+"""
+batch.py
+========
+
+Vektorisierte Variante des heuristischen Scores für viele Signale auf
+einmal. Die Ergebnisse entsprechen :func:`heuristic_score`, werden aber
+mit NumPy über Arrays von Labels, Wahrscheinlichkeiten und
+Ereignis‑Vektoren berechnet. Damit lassen sich gespeicherte Signale nach
+einer Änderung der Gewichte neu bewerten, ohne die NLP‑Modelle erneut
+auszuführen.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ..metrics import timed
+from .scoring import EVENT_WEIGHTS, SENTIMENT_WEIGHTS
+
+
+def label_weights(
+    labels: Sequence[Optional[str]],
+    weights: Optional[Mapping[str, float]] = None,
+) -> np.ndarray:
+    """Bildet Sentiment‑Labels auf ihre Gewichte ab.
+
+    Args:
+        labels: Sentiment‑Labels; Groß‑/Kleinschreibung wird ignoriert,
+            ``None`` und unbekannte Labels erhalten das Gewicht 0.
+        weights: Gewichte pro Label, standardmäßig ``SENTIMENT_WEIGHTS``.
+
+    Returns:
+        Ein Float‑Array mit einem Gewicht pro Label.
+    """
+    weights = SENTIMENT_WEIGHTS if weights is None else weights
+    if not len(labels):
+        return np.zeros(0)
+    # Jedes unterschiedliche Label wird nur einmal nachgeschlagen
+    unique, inverse = np.unique(
+        np.char.lower(np.asarray([label or "" for label in labels], dtype=str)),
+        return_inverse=True,
+    )
+    lookup = np.array([weights.get(label, 0.0) for label in unique], dtype=float)
+    return lookup[inverse]
+
+
+def encode_events(
+    event_lists: Iterable[Optional[Sequence[str]]], categories: Sequence[str]
+) -> np.ndarray:
+    """Kodiert Ereignislisten als Matrix der Häufigkeiten.
+
+    Args:
+        event_lists: Pro Signal die Liste der Ereigniskategorien.
+        categories: Spaltenreihenfolge der Matrix; andere Kategorien
+            werden ignoriert.
+
+    Returns:
+        Matrix der Form ``(Signale, Kategorien)``; bei eindeutigen
+        Kategorien pro Signal ist sie ein Multi‑Hot‑Vektor je Zeile.
+    """
+    event_lists = list(event_lists)
+    index: Dict[str, int] = {category: i for i, category in enumerate(categories)}
+    rows = []
+    columns = []
+    for row, events in enumerate(event_lists):
+        for event in events or ():
+            column = index.get(event)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+    matrix = np.zeros((len(event_lists), len(categories)))
+    np.add.at(matrix, (rows, columns), 1.0)
+    return matrix
+
+
+@timed("scoring.batch")
+def batch_scores(
+    labels: Sequence[Optional[str]],
+    probabilities: Sequence[Optional[float]],
+    event_matrix: np.ndarray,
+    categories: Optional[Sequence[str]] = None,
+    sentiment_weights: Optional[Mapping[str, float]] = None,
+    event_weights: Optional[Mapping[str, float]] = None,
+) -> np.ndarray:
+    """Berechnet den heuristischen Score für viele Signale.
+
+    Args:
+        labels: Sentiment‑Label pro Signal.
+        probabilities: Wahrscheinlichkeit des Labels pro Signal; ``None``
+            zählt als 0.
+        event_matrix: Ereignis‑Matrix aus :func:`encode_events`.
+        categories: Spalten der Ereignis‑Matrix, standardmäßig die
+            Schlüssel von ``event_weights``.
+        sentiment_weights: Gewichte pro Label, standardmäßig
+            ``SENTIMENT_WEIGHTS``.
+        event_weights: Gewichte pro Ereignis, standardmäßig
+            ``EVENT_WEIGHTS``.
+
+    Returns:
+        Ein Float‑Array mit einem Score pro Signal.
+    """
+    event_weights = EVENT_WEIGHTS if event_weights is None else event_weights
+    categories = list(event_weights) if categories is None else categories
+    probs = np.asarray([0.0 if p is None else p for p in probabilities], dtype=float)
+    event_vector = np.array(
+        [event_weights.get(category, 0.0) for category in categories], dtype=float
+    )
+    scores = label_weights(labels, sentiment_weights) * probs
+    if len(categories):
+        scores += event_matrix @ event_vector
+    return scores
+
+
+def score_rows(
+    labels: Sequence[Optional[str]],
+    probabilities: Sequence[Optional[float]],
+    event_lists: Sequence[Optional[Sequence[str]]],
+    sentiment_weights: Optional[Mapping[str, float]] = None,
+    event_weights: Optional[Mapping[str, float]] = None,
+) -> np.ndarray:
+    """Wie :func:`batch_scores`, aber mit Ereignislisten statt Matrix.
+
+    Args:
+        labels: Sentiment‑Label pro Signal.
+        probabilities: Wahrscheinlichkeit des Labels pro Signal.
+        event_lists: Pro Signal die Liste der Ereigniskategorien.
+        sentiment_weights: Gewichte pro Label.
+        event_weights: Gewichte pro Ereignis.
+
+    Returns:
+        Ein Float‑Array mit einem Score pro Signal.
+    """
+    event_weights = EVENT_WEIGHTS if event_weights is None else event_weights
+    categories = list(event_weights)
+    return batch_scores(
+        labels,
+        probabilities,
+        encode_events(event_lists, categories),
+        categories=categories,
+        sentiment_weights=sentiment_weights,
+        event_weights=event_weights,
+    )
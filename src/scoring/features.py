@@ -0,0 +1,147 @@
+"""
+features.py
+===========
+
+Merkmalsvektoren für das ML‑Scoring und deren Zwischenspeicher.
+
+Ein Vektor besteht aus den Sentiment‑Wahrscheinlichkeiten, den
+Treffern je Ereigniskategorie und der Anzahl erkannter Entitäten je Typ.
+Sentiment und Ereignisse stammen aus dem gespeicherten Signal eines
+Artikels, nur die Entitäten werden mit spaCy ermittelt. Die Vektoren
+werden in der Tabelle ``article_features`` abgelegt, sodass Training und
+Neubewertung die NLP‑Verarbeitung nur einmal pro Artikel auslösen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..db import crud, models
+from ..nlp.events import EVENT_RULES
+from ..nlp.pipeline import model_version
+from .batch import encode_events
+from .scoring import SENTIMENT_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_LABELS: Tuple[str, ...] = tuple(SENTIMENT_WEIGHTS)
+EVENT_CATEGORIES: Tuple[str, ...] = tuple(EVENT_RULES)
+ENTITY_LABELS: Tuple[str, ...] = ("ORG", "PERSON", "GPE", "MONEY", "PERCENT", "DATE")
+
+FEATURE_NAMES: List[str] = [
+    *(f"sentiment_{label}" for label in SENTIMENT_LABELS),
+    *(f"event_{category}" for category in EVENT_CATEGORIES),
+    *(f"entities_{label}" for label in ENTITY_LABELS),
+    "entities_total",
+]
+
+
+def feature_version() -> str:
+    """Kennung des Merkmalsschemas und der verwendeten Modelle.
+
+    Ändern sich Merkmale oder das spaCy‑Modell, ändert sich die Version
+    und gespeicherte Vektoren werden neu berechnet.
+    """
+    raw = "|".join([*FEATURE_NAMES, model_version()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def build_features(
+    labels: Sequence[Optional[str]],
+    probabilities: Sequence[Optional[float]],
+    event_lists: Sequence[Optional[Sequence[str]]],
+    entity_lists: Sequence[Sequence[Tuple[str, str]]],
+) -> np.ndarray:
+    """Baut die Merkmalsmatrix für mehrere Artikel.
+
+    Args:
+        labels: Sentiment‑Label pro Artikel oder ``None``.
+        probabilities: Wahrscheinlichkeit des Labels pro Artikel.
+        event_lists: Ereigniskategorien pro Artikel.
+        entity_lists: Entitäten als ``(Text, Typ)`` pro Artikel.
+
+    Returns:
+        Matrix der Form ``(Artikel, len(FEATURE_NAMES))``.
+    """
+    count = len(labels)
+    sentiment = np.zeros((count, len(SENTIMENT_LABELS)))
+    label_index = {label: i for i, label in enumerate(SENTIMENT_LABELS)}
+    for row, (label, prob) in enumerate(zip(labels, probabilities)):
+        column = label_index.get((label or "").lower())
+        if column is not None:
+            sentiment[row, column] = prob or 0.0
+
+    entities = np.zeros((count, len(ENTITY_LABELS) + 1))
+    entity_index = {label: i for i, label in enumerate(ENTITY_LABELS)}
+    for row, ents in enumerate(entity_lists):
+        for _, label in ents:
+            column = entity_index.get(label)
+            if column is not None:
+                entities[row, column] += 1
+        entities[row, -1] = len(ents)
+
+    return np.hstack(
+        [sentiment, encode_events(event_lists, EVENT_CATEGORIES), entities]
+    )
+
+
+def _compute_features(
+    db: Session, article_ids: Sequence[int]
+) -> Dict[int, List[float]]:
+    # Import erst hier, damit das Laden der gespeicherten Vektoren spaCy
+    # nicht benötigt
+    from ..nlp.cache import cached_process_texts
+
+    # Ohne Signal fehlen Sentiment und Ereignisse; solche Artikel werden
+    # erst nach ihrer Verarbeitung aufgenommen
+    signals = crud.latest_signals_for_articles(db, article_ids)
+    articles = (
+        db.query(models.Article)
+        .filter(models.Article.id.in_(list(signals)))
+        .order_by(models.Article.id)
+        .all()
+    )
+    nlp_results = cached_process_texts(
+        [article.text for article in articles], features=("entities",)
+    )
+    rows = [signals[article.id] for article in articles]
+    matrix = build_features(
+        [signal.sentiment_label for signal in rows],
+        [signal.sentiment_score for signal in rows],
+        [signal.events for signal in rows],
+        [result["entities"] for result in nlp_results],
+    )
+    return {article.id: vector.tolist() for article, vector in zip(articles, matrix)}
+
+
+def get_features(db: Session, article_ids: Sequence[int]) -> np.ndarray:
+    """Liefert die Merkmalsmatrix für Artikel aus dem Zwischenspeicher.
+
+    Fehlende Vektoren werden gebündelt berechnet und gespeichert.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        article_ids: IDs der Artikel; Artikel ohne Signal ergeben
+            Nullzeilen.
+
+    Returns:
+        Matrix der Form ``(len(article_ids), len(FEATURE_NAMES))`` in der
+        Reihenfolge von ``article_ids``.
+    """
+    version = feature_version()
+    stored = crud.get_article_features(db, article_ids, version)
+    missing = [article_id for article_id in article_ids if article_id not in stored]
+    if missing:
+        computed = _compute_features(db, list(dict.fromkeys(missing)))
+        crud.save_article_features(db, computed, version)
+        stored.update(computed)
+        logger.info("%d Merkmalsvektoren berechnet", len(computed))
+    empty = [0.0] * len(FEATURE_NAMES)
+    return np.array(
+        [stored.get(article_id, empty) for article_id in article_ids], dtype=float
+    ).reshape(len(article_ids), len(FEATURE_NAMES))
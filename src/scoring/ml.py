@@ -0,0 +1,290 @@
+"""
+ml.py
+=====
+
+Trainierbares ML‑Scoring auf Basis der gespeicherten Signale. Die
+Merkmale kommen aus dem Zwischenspeicher in :mod:`src.scoring.features`;
+Vorhersagen für einen ganzen Block von Artikeln erfolgen mit einem
+einzigen Aufruf des Modells.
+
+Trainierte Modelle werden mit einer Version unter ``ML_MODEL_DIR``
+abgelegt. Ohne Angabe einer Version wird das neueste Modell geladen.
+
+Vorhersagen landen in ``Signal.ml_score`` zusammen mit der Version des
+Scorers; ``Signal.score`` bleibt der heuristische Score. Trainiert wird
+standardmäßig auf der Spalte ``label``, also auf extern gesetzten
+Zielwerten. ``ML_TARGET=score`` trainiert auf dem heuristischen Score; das
+Modell lernt dann nur, die Heuristik nachzubilden. ``ml_score`` ist nie
+Trainingsziel, da der Scorer diese Spalte selbst schreibt.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from ..db import models
+from .features import FEATURE_NAMES, feature_version, get_features
+
+logger = logging.getLogger(__name__)
+
+ML_MODEL_DIR = os.getenv("ML_MODEL_DIR", "models")
+# Obergrenze der Trainingsbeispiele (neueste Signale zuerst)
+ML_MAX_SAMPLES = int(os.getenv("ML_MAX_SAMPLES", "100000"))
+# Trainingsziel: ``label`` (extern gesetzt) oder ``score`` (heuristisch)
+ML_TARGET = os.getenv("ML_TARGET", "label")
+ML_TARGETS = ("score", "label")
+
+
+@dataclass
+class MLScorer:
+    """Ein trainiertes Scoring‑Modell mit seinen Metadaten.
+
+    Attributes:
+        model: Das scikit‑learn‑Modell.
+        version: Version des Modells, zugleich Teil des Dateinamens.
+        feature_version: Merkmalsversion, mit der trainiert wurde.
+        feature_names: Spaltennamen der Merkmalsmatrix.
+        trained_at: Zeitpunkt des Trainings.
+        n_samples: Anzahl der Trainingsbeispiele.
+        target: Spalte der Signale, auf der trainiert wurde.
+    """
+
+    model: Any
+    version: str
+    feature_version: str
+    feature_names: List[str] = field(default_factory=list)
+    trained_at: Optional[datetime] = None
+    n_samples: int = 0
+    target: str = "label"
+
+    @classmethod
+    def fit(
+        cls,
+        features: np.ndarray,
+        targets: Sequence[float],
+        feature_version: str,
+        feature_names: Sequence[str] = FEATURE_NAMES,
+        target: str = "label",
+    ) -> "MLScorer":
+        """Trainiert ein Modell auf einer Merkmalsmatrix.
+
+        Args:
+            features: Matrix der Form ``(Beispiele, Merkmale)``.
+            targets: Zielwert pro Beispiel.
+            feature_version: Version der Merkmale.
+            feature_names: Spaltennamen der Matrix.
+            target: Name des Trainingsziels, siehe ``ML_TARGETS``.
+
+        Returns:
+            Der trainierte Scorer.
+        """
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        model = HistGradientBoostingRegressor()
+        model.fit(features, np.asarray(targets, dtype=float))
+        trained_at = datetime.utcnow()
+        return cls(
+            model=model,
+            version=trained_at.strftime("%Y%m%d%H%M%S"),
+            feature_version=feature_version,
+            feature_names=list(feature_names),
+            trained_at=trained_at,
+            n_samples=len(features),
+            target=target,
+        )
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Berechnet Scores für eine Merkmalsmatrix in einem Aufruf."""
+        if features.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Erwartet {len(self.feature_names)} Merkmale, "
+                f"erhalten {features.shape[1]}"
+            )
+        if not len(features):
+            return np.zeros(0)
+        return self.model.predict(features)
+
+    def save(self, directory: str = ML_MODEL_DIR) -> Path:
+        """Speichert den Scorer als ``scorer-<version>.joblib``."""
+        import joblib
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        target = path / f"scorer-{self.version}.joblib"
+        joblib.dump(self, target)
+        return target
+
+
+def load_scorer(
+    version: Optional[str] = None, directory: str = ML_MODEL_DIR
+) -> MLScorer:
+    """Lädt einen gespeicherten Scorer.
+
+    Args:
+        version: Gewünschte Version; ohne Angabe die neueste.
+        directory: Verzeichnis der gespeicherten Modelle.
+
+    Returns:
+        Der geladene Scorer.
+
+    Raises:
+        FileNotFoundError: Wenn kein passendes Modell existiert.
+    """
+    import joblib
+
+    path = Path(directory)
+    if version is None:
+        candidates = sorted(path.glob("scorer-*.joblib"))
+        if not candidates:
+            raise FileNotFoundError(f"Kein ML‑Scorer in {directory}")
+        target = candidates[-1]
+    else:
+        target = path / f"scorer-{version}.joblib"
+    return joblib.load(target)
+
+
+def train_scorer(
+    db: Session,
+    max_samples: int = ML_MAX_SAMPLES,
+    chunk_size: int = 1000,
+    target: str = ML_TARGET,
+) -> MLScorer:
+    """Trainiert einen Scorer auf den gespeicherten Signalen.
+
+    Zielwert ist pro Artikel das neueste Signal mit explizitem ``label``;
+    Signale ohne Label werden übergangen. Mit ``target="score"`` dient der
+    heuristische Score als Ziel, das Modell bildet dann nur die Heuristik
+    nach. ``ml_score`` dient nie als Ziel, damit ein Scorer nicht auf
+    eigenen Vorhersagen trainiert. Die Merkmale stammen aus dem
+    Zwischenspeicher und werden nur für noch unbekannte Artikel berechnet.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        max_samples: Maximale Anzahl Artikel, die neuesten zuerst.
+        chunk_size: Anzahl Artikel pro Block beim Laden der Merkmale.
+        target: Trainingsziel aus ``ML_TARGETS``.
+
+    Returns:
+        Der trainierte, noch nicht gespeicherte Scorer.
+
+    Raises:
+        ValueError: Bei unbekanntem Ziel oder wenn keine Signale mit
+            Zielwert vorhanden sind, etwa noch keine Labels.
+    """
+    if target not in ML_TARGETS:
+        raise ValueError(f"Unbekanntes Trainingsziel: {target}")
+    column = getattr(models.Signal, target)
+    query = db.query(models.Signal.article_id, column.label("target"))
+    if target == "label":
+        query = query.filter(column.isnot(None))
+    rows = query.order_by(models.Signal.id.desc()).limit(max_samples).all()
+    # Pro Artikel nur das neueste Signal
+    targets = {}
+    for row in rows:
+        targets.setdefault(row.article_id, row.target or 0.0)
+    article_ids = list(targets)
+    if not article_ids:
+        if target == "label":
+            raise ValueError(
+                "Keine Signale mit ``label`` vorhanden; Labels setzen oder "
+                "mit ML_TARGET=score auf dem heuristischen Score trainieren"
+            )
+        raise ValueError("Keine Signale zum Trainieren vorhanden")
+    features = np.vstack(
+        [
+            get_features(db, article_ids[start : start + chunk_size])
+            for start in range(0, len(article_ids), chunk_size)
+        ]
+    )
+    scorer = MLScorer.fit(
+        features,
+        [targets[article_id] for article_id in article_ids],
+        feature_version(),
+        target=target,
+    )
+    logger.info(
+        "ML‑Scorer %s mit %d Beispielen trainiert", scorer.version, scorer.n_samples
+    )
+    return scorer
+
+
+def predict_articles(
+    db: Session, scorer: MLScorer, article_ids: Sequence[int]
+) -> np.ndarray:
+    """Berechnet ML‑Scores für mehrere Artikel.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        scorer: Der zu verwendende Scorer.
+        article_ids: IDs der Artikel.
+
+    Returns:
+        Ein Score pro Artikel in der Reihenfolge von ``article_ids``.
+    """
+    if scorer.feature_version != feature_version():
+        raise ValueError(
+            f"Scorer {scorer.version} wurde mit Merkmalsversion "
+            f"{scorer.feature_version} trainiert, aktuell ist {feature_version()}"
+        )
+    return scorer.predict(get_features(db, article_ids))
+
+
+def rescore_signals(
+    db: Session, scorer: MLScorer, chunk_size: int = 1000, only_stale: bool = True
+) -> int:
+    """Schreibt die ML‑Vorhersage in ``ml_score`` und ``scorer_version``.
+
+    Der heuristische ``score`` bleibt unverändert. Die Signale werden
+    blockweise nach ID gelesen; pro Block gibt es einen Modellaufruf und
+    ein Bulk‑UPDATE.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        scorer: Der zu verwendende Scorer.
+        chunk_size: Anzahl Signale pro Block.
+        only_stale: Nur Signale ohne Vorhersage oder mit der Vorhersage
+            eines anderen Scorers bewerten, z. B. neu hinzugekommene.
+
+    Returns:
+        Anzahl der neu bewerteten Signale.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        query = db.query(models.Signal.id, models.Signal.article_id).filter(
+            models.Signal.id > last_id
+        )
+        if only_stale:
+            query = query.filter(
+                or_(
+                    models.Signal.scorer_version.is_(None),
+                    models.Signal.scorer_version != scorer.version,
+                )
+            )
+        rows = query.order_by(models.Signal.id).limit(chunk_size).all()
+        if not rows:
+            return updated
+        scores = predict_articles(db, scorer, [row.article_id for row in rows])
+        db.execute(
+            update(models.Signal),
+            [
+                {
+                    "id": row.id,
+                    "ml_score": float(score),
+                    "scorer_version": scorer.version,
+                }
+                for row, score in zip(rows, scores)
+            ],
+        )
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
@@ -4,66 +4,186 @@ streamlit_app.py
 
 Einfache Streamlit‑Oberfläche zur Anzeige der generierten Signale. Die
 App stellt Filtermöglichkeiten bereit und visualisiert die Score‑Werte.
+
+Die Filter der Seitenleiste werden direkt in die SQL‑Abfrage übernommen
+und auf ein Zeitfenster begrenzt. Ergebnisse werden mit ``st.cache_data``
+zwischengespeichert; neue Signale werden anhand der höchsten Signal‑ID
+erkannt und inkrementell nachgeladen. Die Datumsgrenzen gelten in UTC,
+wie die Zeitstempel der Signale.
 """
 
 from __future__ import annotations
 
+import os
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional, Sequence, Tuple
+
 import pandas as pd
 import streamlit as st
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from .db.database import SessionLocal
 from .db.models import Signal, Article
+from .nlp.events import EVENT_RULES
+from .scoring.scoring import SENTIMENT_WEIGHTS
+
+# Standard‑Zeitfenster in Tagen und Obergrenze der angezeigten Zeilen
+DEFAULT_WINDOW_DAYS = int(os.getenv("DASHBOARD_WINDOW_DAYS", "7"))
+MAX_ROWS = int(os.getenv("DASHBOARD_MAX_ROWS", "5000"))
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+
+COLUMNS = [
+    "id",
+    "created_at",
+    "score",
+    "sentiment",
+    "sentiment_score",
+    "events",
+    "article_title",
+    "article_url",
+]
 
 
-def load_signals(db: Session) -> pd.DataFrame:
-    """Lädt Signale aus der Datenbank und konvertiert sie in ein DataFrame."""
-    rows = (
-        db.query(Signal, Article)
+def load_signals(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    sentiments: Sequence[str] = (),
+    events: Sequence[str] = (),
+    after_id: Optional[int] = None,
+    limit: int = MAX_ROWS,
+) -> pd.DataFrame:
+    """Lädt gefilterte Signale aus der Datenbank als DataFrame.
+
+    Args:
+        db: Aktive Datenbank‑Session.
+        start: Beginn des Zeitfensters (inklusive).
+        end: Ende des Zeitfensters (exklusive).
+        sentiments: Nur Signale mit einem dieser Sentiment‑Labels.
+        events: Nur Signale mit mindestens einer dieser Ereigniskategorien.
+        after_id: Nur Signale mit größerer ID, für inkrementelles Nachladen.
+        limit: Maximale Anzahl Zeilen.
+
+    Returns:
+        Die neuesten passenden Signale, absteigend nach Zeit sortiert.
+    """
+    query = (
+        db.query(
+            Signal.id,
+            Signal.created_at,
+            Signal.score,
+            Signal.sentiment_label,
+            Signal.sentiment_score,
+            Signal.events,
+            Article.title,
+            Article.url,
+        )
         .join(Article, Signal.article_id == Article.id)
-        .order_by(Signal.created_at.desc())
-        .all()
+        .filter(Signal.created_at >= start, Signal.created_at < end)
     )
-    data = []
-    for signal, article in rows:
-        data.append(
-            {
-                "id": signal.id,
-                "created_at": signal.created_at,
-                "score": signal.score,
-                "sentiment": signal.sentiment_label,
-                "sentiment_score": signal.sentiment_score,
-                "events": ", ".join(signal.events or []),
-                "article_title": article.title,
-                "article_url": article.url,
-            }
-        )
-    return pd.DataFrame(data)
+    if sentiments:
+        query = query.filter(func.lower(Signal.sentiment_label).in_(sentiments))
+    if events:
+        query = query.filter(or_(*(Signal.events.contains([e]) for e in events)))
+    if after_id is not None:
+        query = query.filter(Signal.id > after_id)
+    rows = query.order_by(Signal.created_at.desc(), Signal.id.desc()).limit(limit)
+    data = [
+        {
+            "id": row.id,
+            "created_at": row.created_at,
+            "score": row.score,
+            "sentiment": row.sentiment_label,
+            "sentiment_score": row.sentiment_score,
+            "events": ", ".join(row.events or []),
+            "article_title": row.title,
+            "article_url": row.url,
+        }
+        for row in rows
+    ]
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def latest_signal_id(db: Session) -> int:
+    """Liefert die höchste Signal‑ID oder 0, wenn keine Signale existieren."""
+    return db.query(func.max(Signal.id)).scalar() or 0
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _load_window(
+    start: datetime, end: datetime, sentiments: tuple, events: tuple
+) -> Tuple[pd.DataFrame, int]:
+    # Die höchste ID wird vor der Abfrage über alle Signale ermittelt und
+    # mit dem Fenster gespeichert. Als Wasserzeichen taugt die höchste ID
+    # im gefilterten Fenster nicht: Signale außerhalb der Filter würden
+    # sonst bei jedem Aufruf erneut nachgeladen.
+    with SessionLocal() as db:
+        snapshot_id = latest_signal_id(db)
+        return load_signals(db, start, end, sentiments, events), snapshot_id
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _load_newer(
+    start: datetime,
+    end: datetime,
+    sentiments: tuple,
+    events: tuple,
+    after_id: int,
+    latest_id: int,
+) -> pd.DataFrame:
+    # ``latest_id`` ist Teil des Cache‑Schlüssels: Neue Signale erzeugen
+    # einen neuen Eintrag, ohne das große Basisfenster neu zu laden.
+    with SessionLocal() as db:
+        return load_signals(db, start, end, sentiments, events, after_id=after_id)
 
 
 def main() -> None:
     st.set_page_config(page_title="Economic Signals", layout="wide")
     st.title("Frühindikator‑Dashboard")
-    with SessionLocal() as db:
-        df = load_signals(db)
-    if df.empty:
-        st.info("Keine Signale in der Datenbank. Bitte `/refresh` aufrufen.")
-        return
+
     # Filter
     st.sidebar.header("Filter")
-    sentiments = st.sidebar.multiselect(
-        "Sentiment", options=df["sentiment"].unique().tolist(), default=[]
+    today = datetime.now(timezone.utc).date()
+    selected_range = st.sidebar.date_input(
+        "Zeitraum",
+        value=(today - timedelta(days=DEFAULT_WINDOW_DAYS), today),
+        max_value=today,
     )
-    events = st.sidebar.multiselect(
-        "Ereignisse", options=df["events"].unique().tolist(), default=[]
+    if isinstance(selected_range, (tuple, list)) and len(selected_range) == 2:
+        first_day, last_day = selected_range
+    else:
+        first_day = last_day = (
+            selected_range[0]
+            if isinstance(selected_range, (tuple, list))
+            else selected_range
+        )
+    start = datetime.combine(first_day, time.min)
+    end = datetime.combine(last_day + timedelta(days=1), time.min)
+    sentiments = tuple(
+        st.sidebar.multiselect("Sentiment", options=list(SENTIMENT_WEIGHTS), default=[])
     )
-    filtered = df
-    if sentiments:
-        filtered = filtered[filtered["sentiment"].isin(sentiments)]
-    if events:
-        filtered = filtered[filtered["events"].isin(events)]
-    st.dataframe(filtered, use_container_width=True)
-    st.line_chart(filtered.set_index("created_at")["score"])
+    events = tuple(
+        st.sidebar.multiselect("Ereignisse", options=list(EVENT_RULES), default=[])
+    )
+
+    df, snapshot_id = _load_window(start, end, sentiments, events)
+    # Neue Signale erhalten den aktuellen Zeitstempel und fallen nur in ein
+    # Fenster, das heute einschließt
+    if last_day >= today:
+        with SessionLocal() as db:
+            latest_id = latest_signal_id(db)
+        if latest_id > snapshot_id:
+            newer = _load_newer(start, end, sentiments, events, snapshot_id, latest_id)
+            df = pd.concat([newer, df], ignore_index=True).head(MAX_ROWS)
+
+    if df.empty:
+        st.info("Keine Signale im gewählten Zeitraum. Bitte `/refresh` aufrufen.")
+        return
+    if len(df) >= MAX_ROWS:
+        st.caption(f"Es werden die neuesten {MAX_ROWS} Signale angezeigt.")
+    st.dataframe(df, use_container_width=True)
+    st.line_chart(df.set_index("created_at")["score"])
 
 
 if __name__ == "__main__":
@@ -4,88 +4,372 @@ tasks.py
 
 Definiert Celery‑Tasks für die asynchrone Ausführung der Dateningestion und
 Artikelverarbeitung. Diese Tasks können über die FastAPI oder einen
-Scheduler (z. B. Celery Beat) ausgelöst werden.
+Scheduler (z. B. Celery Beat) ausgelöst werden.
+
+Die Aktualisierung ist als Fan‑out aufgebaut: Pro Feed läuft ein
+``fetch_feed_task``, danach werden die neuen Links in Blöcke aufgeteilt,
+die jeweils von ``download_articles_task`` (IO‑Queue) geladen und von
+``process_articles_task`` (CPU‑Queue) analysiert werden. Erst wenn alle
+Blöcke fertig sind, schreibt ``commit_feed_states_task`` den Abrufzustand
+der Feeds fest. ``process_articles_task`` wiederholt sich bei Fehlern;
+Artikel, die danach noch ohne Signal sind, verarbeitet der nächste Lauf.
+Die Zuordnung zu den Queues erfolgt in
+:func:`src.celery_app.make_celery_app`.
+
+Wird eine ``job_id`` übergeben, schreiben die Tasks ihren Fortschritt in
+den Auftragsspeicher aus :mod:`src.jobs`, den die API unter
+``/jobs/{job_id}`` ausliefert.
 """
 
 from __future__ import annotations
 
 import logging
-from celery import shared_task
+import os
+from typing import Any, Dict, List, Optional
+
+from celery import chain, chord, shared_task
 from sqlalchemy.orm import Session
 
 from .celery_app import celery_app
 from .db.database import SessionLocal
 from .db import crud
-from .ingestion.rss_fetcher import fetch_rss_feed
-from .ingestion.article_processor import download_article
-from .nlp.pipeline import process_text
-from .nlp.events import classify_events
-from .scoring.scoring import heuristic_score
+from .ingestion.article_processor import download_articles
+from .ingestion.rss_fetcher import FeedEntry, FeedState, fetch_rss_feed
+from .jobs import get_job_store
+from .profiling import profile_task
+from .refresh import (
+    FEED_URLS,
+    REFRESH_BATCH_SIZE,
+    canonical_articles,
+    commit_feed_state,
+    filter_new_links,
+    load_feed_state,
+    process_articles,
+    store_articles,
+    unprocessed_article_ids,
+)
 
 logger = logging.getLogger(__name__)
 
+# Wiederholungen von ``process_articles_task`` und Basis der Wartezeit in
+# Sekunden, die sich mit jedem Versuch verdoppelt
+PROCESS_MAX_RETRIES = int(os.getenv("PROCESS_MAX_RETRIES", "3"))
+PROCESS_RETRY_BACKOFF = int(os.getenv("PROCESS_RETRY_BACKOFF", "30"))
+
 
 @shared_task
-def refresh_task() -> int:
-    """Asynchrone Celery‑Task zum Abrufen und Verarbeiten neuer Feeds."""
+@profile_task
+def refresh_task(job_id: Optional[str] = None) -> str:
+    """Asynchrone Celery‑Task zum Abrufen und Verarbeiten neuer Feeds.
+
+    Startet für jeden Feed einen ``fetch_feed_task``; sobald alle Feeds
+    gelesen sind, verteilt ``dispatch_downloads_task`` die neuen Links.
+
+    Args:
+        job_id: Optionale Auftrags‑ID für die Fortschrittsanzeige.
+
+    Returns:
+        Die ID des gestarteten Chords.
+    """
+    get_job_store().update(job_id, status="running", feeds_total=len(FEED_URLS))
+    workflow = chord(
+        (fetch_feed_task.s(url, job_id=job_id) for url in FEED_URLS),
+        dispatch_downloads_task.s(job_id=job_id),
+    )
+    return workflow.apply_async().id
+
+
+@shared_task
+@profile_task
+def fetch_feed_task(
+    feed_url: str, job_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Liest einen Feed und liefert die noch unbekannten Artikel‑URLs.
+
+    Der Abrufzustand wird hier noch nicht gespeichert, sondern samt den
+    gelieferten Einträgen zurückgegeben; ``commit_feed_states_task``
+    schreibt ihn fest, nachdem die Artikel gespeichert sind.
+
+    Returns:
+        ``url``, ``etag``, ``modified``, ``entries`` (Paare aus Eintrags‑ID
+        und Link) und die neuen ``links``; ``None`` für einen fehlerhaften
+        Feed, damit die übrigen Feeds trotzdem verarbeitet werden.
+    """
+    jobs = get_job_store()
     db: Session = SessionLocal()
     try:
-        feed_urls = [
-            "https://www.handelsblatt.com/rss",
-            "https://www.faz.net/rss/aktuell/",
-        ]
-        processed = 0
-        for url in feed_urls:
-            for entry in fetch_rss_feed(url):
-                if crud.get_article_by_url(db, entry.link):
-                    continue
-                article_content = download_article(entry.link)
-                article = crud.create_article(
-                    db=db,
-                    url=article_content.url,
-                    title=article_content.title,
-                    authors=", ".join(article_content.authors),
-                    text=article_content.text,
-                    published_at=article_content.publish_date,
-                )
-                nlp_result = process_text(article.text)
-                events = classify_events(article.text)
-                score = heuristic_score(nlp_result["sentiment"], events)
-                crud.create_signal(
-                    db=db,
-                    article=article,
-                    sentiment_label=nlp_result["sentiment"][0]["label"],
-                    sentiment_score=float(nlp_result["sentiment"][0]["score"]),
-                    events=events,
-                    score=score,
-                )
-                processed += 1
-        logger.info("%d Artikel verarbeitet", processed)
-        return processed
+        state = load_feed_state(db, feed_url)
+        entries = fetch_rss_feed(feed_url, state)
+        links = filter_new_links(db, (entry.link for entry in entries))
+    except Exception:
+        logger.exception("Feed %s konnte nicht gelesen werden", feed_url)
+        jobs.incr(job_id, failures=1)
+        return None
+    finally:
+        db.close()
+    jobs.incr(job_id, feeds_fetched=1, links_found=len(links))
+    return {
+        "url": feed_url,
+        "etag": state.etag,
+        "modified": state.modified,
+        "entries": [[entry.guid, entry.link] for entry in entries],
+        "links": links,
+    }
+
+
+@shared_task
+@profile_task
+def dispatch_downloads_task(
+    feeds: List[Optional[Dict[str, Any]]], job_id: Optional[str] = None
+) -> int:
+    """Teilt die neuen Links in Blöcke und startet je Block eine Kette.
+
+    Jede Kette lädt ihren Block herunter und verarbeitet ihn anschließend,
+    unabhängig von den übrigen Blöcken. Ein langsamer Server verzögert so
+    nur die Artikel seines eigenen Blocks. Gespeicherte Artikel, deren
+    Verarbeitung in einem früheren Lauf endgültig fehlgeschlagen ist,
+    kommen als zusätzliche Blöcke hinzu. Die Ketten bilden einen Chord,
+    dessen Abschluss ``commit_feed_states_task`` den Abrufzustand der Feeds
+    speichert. Schlägt ein Block fehl, unterbleibt das; der nächste Lauf
+    liest die Feeds dann vollständig und überspringt nur gespeicherte
+    Artikel.
+
+    Args:
+        feeds: Ergebnisse der ``fetch_feed_task``‑Aufrufe.
+        job_id: Optionale Auftrags‑ID für die Fortschrittsanzeige.
+
+    Returns:
+        Anzahl der verteilten Links.
+    """
+    jobs = get_job_store()
+    feeds = [feed for feed in feeds if feed]
+    links = list(dict.fromkeys(link for feed in feeds for link in feed["links"]))
+    blocks = [
+        links[start : start + REFRESH_BATCH_SIZE]
+        for start in range(0, len(links), REFRESH_BATCH_SIZE)
+    ]
+    db: Session = SessionLocal()
+    try:
+        pending = unprocessed_article_ids(db)
+    finally:
+        db.close()
+    pending_blocks = [
+        pending[start : start + REFRESH_BATCH_SIZE]
+        for start in range(0, len(pending), REFRESH_BATCH_SIZE)
+    ]
+    states = [{key: feed[key] for key in feed if key != "links"} for feed in feeds]
+    commit = commit_feed_states_task.si(states)
+    # Die Anzahl der Blöcke muss feststehen, bevor der erste fertig wird
+    jobs.update(job_id, blocks_total=len(blocks) + len(pending_blocks))
+    if not blocks and not pending_blocks:
+        jobs.finish(job_id)
+        commit.apply_async()
+    else:
+        chord(
+            [
+                *(
+                    chain(
+                        download_articles_task.s(block, job_id=job_id),
+                        process_articles_task.s(job_id=job_id),
+                    )
+                    for block in blocks
+                ),
+                *(
+                    process_articles_task.s(block, job_id=job_id)
+                    for block in pending_blocks
+                ),
+            ]
+        )(commit)
+    logger.info(
+        "%d neue Links und %d liegengebliebene Artikel verteilt",
+        len(links),
+        len(pending),
+    )
+    return len(links)
+
+
+@shared_task
+@profile_task
+def commit_feed_states_task(states: List[Dict[str, Any]]) -> int:
+    """Speichert den Abrufzustand der Feeds nach Abschluss aller Blöcke.
+
+    Nur Einträge, deren Artikel gespeichert sind, gelten danach als
+    gesehen (siehe :func:`src.refresh.commit_feed_state`).
+
+    Returns:
+        Anzahl der gespeicherten Feed‑Zustände.
+    """
+    db: Session = SessionLocal()
+    try:
+        for feed in states:
+            entries = [
+                FeedEntry(title="", link=link, published=None, summary="", guid=guid)
+                for guid, link in feed["entries"]
+            ]
+            state = FeedState(etag=feed["etag"], modified=feed["modified"])
+            commit_feed_state(db, feed["url"], state, entries)
+    finally:
+        db.close()
+    return len(states)
+
+
+@shared_task
+@profile_task
+def download_articles_task(urls: List[str], job_id: Optional[str] = None) -> List[int]:
+    """Lädt einen Block von Artikeln parallel und speichert ihn gebündelt.
+
+    Returns:
+        Die IDs der neu angelegten kanonischen Artikel; Duplikate werden
+        nicht weiter verarbeitet.
+    """
+    jobs = get_job_store()
+    db: Session = SessionLocal()
+    try:
+        contents = list(download_articles(urls))
+        articles = store_articles(db, contents)
+    except Exception:
+        jobs.block_done(job_id, failures=len(urls))
+        raise
+    finally:
+        db.close()
+    # Endgültig fehlgeschlagene Downloads überspringt ``download_articles``
+    canonical = canonical_articles(articles)
+    jobs.incr(
+        job_id,
+        articles_downloaded=len(contents),
+        duplicates=len(articles) - len(canonical),
+        failures=len(set(urls)) - len(contents),
+    )
+    return [article.id for article in canonical]
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    max_retries=PROCESS_MAX_RETRIES,
+    retry_backoff=PROCESS_RETRY_BACKOFF,
+)
+@profile_task
+def process_articles_task(
+    self, article_ids: List[int], job_id: Optional[str] = None
+) -> int:
+    """Analysiert einen Block gespeicherter Artikel und legt Signale an.
+
+    Schlägt die Verarbeitung fehl, wird der Task bis zu
+    ``PROCESS_MAX_RETRIES``‑mal mit wachsendem Abstand wiederholt. Artikel,
+    die bereits ein Signal haben, werden dabei übersprungen.
+    """
+    jobs = get_job_store()
+    if not article_ids:
+        jobs.block_done(job_id)
+        return 0
+    db: Session = SessionLocal()
+    try:
+        articles = crud.get_unprocessed_articles(db, article_ids)
+        processed = len(process_articles(db, articles))
+    except Exception:
+        if self.request.retries >= self.max_retries:
+            jobs.block_done(job_id, failures=len(article_ids))
+        raise
     finally:
         db.close()
+    logger.info("%d Artikel verarbeitet", processed)
+    jobs.block_done(job_id, articles_processed=processed)
+    return processed
 
 
 @shared_task
-def process_article_task(article_id: int) -> int:
+@profile_task
+def process_article_task(article_id: int, job_id: Optional[str] = None) -> int:
     """Verarbeitet einen Artikel asynchron und legt ein Signal an."""
+    jobs = get_job_store()
+    jobs.start(job_id)
     db: Session = SessionLocal()
     try:
         article = db.query(crud.models.Article).get(article_id)
         if not article:
             logger.warning("Artikel %s nicht gefunden", article_id)
+            jobs.block_done(job_id, failures=1)
             return 0
-        nlp_result = process_text(article.text)
-        events = classify_events(article.text)
-        score = heuristic_score(nlp_result["sentiment"], events)
-        crud.create_signal(
-            db=db,
-            article=article,
-            sentiment_label=nlp_result["sentiment"][0]["label"],
-            sentiment_score=float(nlp_result["sentiment"][0]["score"]),
-            events=events,
-            score=score,
-        )
-        return 1
+        processed = len(process_articles(db, [article]))
+    except Exception:
+        jobs.block_done(job_id, failures=1)
+        raise
+    finally:
+        db.close()
+    jobs.block_done(job_id, articles_processed=processed)
+    return processed
+
+
+@shared_task
+@profile_task
+def rollup_task() -> int:
+    """Schreibt die Zeitreihen‑Aggregate der Signale fort."""
+    db: Session = SessionLocal()
+    try:
+        processed = crud.update_rollups(db)
+        logger.info("%d Signale aggregiert", processed)
+        return processed
+    finally:
+        db.close()
+
+
+@shared_task
+@profile_task
+def rescore_task() -> int:
+    """Bewertet alle Signale mit den aktuellen Gewichten neu.
+
+    Anschließend werden die Aggregate verworfen und neu aufgebaut, da
+    sie Score‑Summen enthalten; die jüngsten Signale übernimmt der nächste
+    reguläre ``rollup_task``.
+    """
+    db: Session = SessionLocal()
+    try:
+        updated = crud.rescore_signals(db)
+        crud.reset_rollups(db)
+        crud.update_rollups(db)
+        logger.info("%d Signale neu bewertet", updated)
+        return updated
+    finally:
+        db.close()
+
+
+@shared_task
+@profile_task
+def train_scorer_task() -> str:
+    """Trainiert einen ML‑Scorer auf den gespeicherten Signalen.
+
+    Returns:
+        Die Version des gespeicherten Scorers.
+    """
+    from .scoring.ml import train_scorer
+
+    db: Session = SessionLocal()
+    try:
+        scorer = train_scorer(db)
+        scorer.save()
+        return scorer.version
+    finally:
+        db.close()
+
+
+@shared_task
+@profile_task
+def ml_rescore_task(version: Optional[str] = None) -> int:
+    """Schreibt die Vorhersagen eines gespeicherten ML‑Scorers in ``ml_score``.
+
+    Bewertet werden nur Signale ohne Vorhersage dieser Version. Der
+    heuristische Score und die darauf beruhenden Rollups bleiben unverändert.
+
+    Args:
+        version: Version des Scorers; ohne Angabe der neueste.
+    """
+    from .scoring.ml import load_scorer, rescore_signals
+
+    db: Session = SessionLocal()
+    try:
+        updated = rescore_signals(db, load_scorer(version))
+        logger.info("%d Signale mit ML‑Scorer neu bewertet", updated)
+        return updated
     finally:
         db.close()
@@ -0,0 +1,342 @@
+"""
+Tests für die API‑Hilfsfunktionen.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from econ_signals_tool.src.api.export import _csv, _ndjson
+
+
+def test_export_formats_stream_chunks() -> None:
+    fields = ["id", "created_at", "events"]
+    chunks = [
+        [{"id": 1, "created_at": datetime(2024, 1, 1), "events": ["merger"]}],
+        [{"id": 2, "created_at": datetime(2024, 1, 2), "events": []}],
+    ]
+    ndjson = b"".join(_ndjson(chunks, fields)).decode("utf-8").splitlines()
+    assert json.loads(ndjson[0]) == {
+        "id": 1,
+        "created_at": "2024-01-01T00:00:00",
+        "events": ["merger"],
+    }
+    assert len(ndjson) == 2
+    csv_lines = b"".join(_csv(chunks, fields)).decode("utf-8").splitlines()
+    assert csv_lines == [
+        "id,created_at,events",
+        "1,2024-01-01T00:00:00,merger",
+        "2,2024-01-02T00:00:00,",
+    ]
+
+
+# Obergrenze für ``import src.api.main`` in Sekunden
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "2.0"))
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import econ_signals_tool.src.api.main
+elapsed = time.perf_counter() - started
+heavy = ["torch", "transformers", "spacy", "newspaper", "feedparser"]
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [name for name in heavy if name in sys.modules],
+}))
+"""
+
+
+def test_api_import_is_fast_and_skips_nlp() -> None:
+    # Eigener Interpreter, damit bereits importierte Module nicht mitzählen
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    ).stdout
+    probe = json.loads(output.strip().splitlines()[-1])
+    assert probe["loaded"] == []
+    assert probe["seconds"] < IMPORT_TIME_BUDGET, probe
+
+
+class _FakeRedis:
+    """Minimaler Ersatz für die von ``JobStore`` genutzten Hash‑Befehle."""
+
+    def __init__(self) -> None:
+        self.hashes = {}
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {name: str(value).encode("utf-8") for name, value in mapping.items()}
+        )
+
+    def hincrby(self, key, name, amount):
+        values = self.hashes.setdefault(key, {})
+        values[name] = str(int(values.get(name, b"0")) + amount).encode("utf-8")
+        return int(values[name])
+
+    def hget(self, key, name):
+        return self.hashes.get(key, {}).get(name)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, ttl):
+        pass
+
+
+def test_job_store_tracks_blocks_until_done() -> None:
+    from econ_signals_tool.src.jobs import JobStore
+
+    jobs = JobStore(_FakeRedis())
+    job_id = jobs.create("refresh")
+    assert jobs.get(job_id)["status"] == "queued"
+    jobs.update(job_id, status="running", feeds_total=2)
+    jobs.incr(job_id, feeds_fetched=2, links_found=3)
+    jobs.update(job_id, blocks_total=2)
+    jobs.block_done(job_id, articles_processed=2)
+    assert jobs.get(job_id)["status"] == "running"
+    jobs.block_done(job_id, failures=1)
+    job = jobs.get(job_id)
+    assert job["status"] == "done"
+    assert (job["articles_processed"], job["failures"]) == (2, 1)
+    assert jobs.get("unknown") is None
+    jobs.incr(None, failures=1)
+
+
+def test_metrics_record_stage_latency_and_failures() -> None:
+    import pytest
+
+    from econ_signals_tool.src import metrics
+
+    @metrics.timed("test.ok")
+    def ok() -> None:
+        pass
+
+    @metrics.timed("test.failing")
+    def failing() -> None:
+        raise RuntimeError("kaputt")
+
+    ok()
+    with pytest.raises(RuntimeError):
+        failing()
+    body, content_type = metrics.render()
+    text = body.decode("utf-8")
+    assert content_type.startswith("text/plain")
+    assert 'econ_stage_duration_seconds_count{stage="test.ok"} 1.0' in text
+    assert 'econ_stage_failures_total{stage="test.failing"} 1.0' in text
+
+
+def test_profiles_are_saved_and_listed_by_duration(tmp_path) -> None:
+    from datetime import timezone
+
+    from econ_signals_tool.src import profiling
+
+    sampler = profiling.StackSampler(interval=0.001)
+    sampler.start()
+    sum(range(200000))
+    sampler.stop()
+    started_at = datetime.now(timezone.utc)
+    for name, duration in [("fast", 0.01), ("slow", 0.5), ("medium", 0.1)]:
+        profiling.save_profile(
+            "task",
+            name,
+            name * 4,
+            duration,
+            started_at,
+            lambda path: path.write_text(sampler.collapsed()),
+            ".txt",
+            directory=str(tmp_path),
+        )
+    records = profiling.list_profiles(limit=2, directory=str(tmp_path))
+    assert [record.name for record in records] == ["slow", "medium"]
+    assert (tmp_path / records[0].file).exists()
+    assert profiling.list_profiles(kind="request", directory=str(tmp_path)) == []
+
+
+def test_async_crud_matches_sync_reads(tmp_path) -> None:
+    import asyncio
+
+    import pytest
+
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src.db import async_crud, crud, models
+    from econ_signals_tool.src.db.database import async_url
+
+    url = f"sqlite:///{tmp_path / 'signals.db'}"
+    assert async_url(url) == f"sqlite+aiosqlite:///{tmp_path / 'signals.db'}"
+    postgres = "postgresql+psycopg2://u:p@db/x"
+    assert async_url(postgres) == "postgresql+asyncpg://u:p@db/x"
+
+    engine = create_engine(url)
+    models.Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        articles = crud.create_articles_bulk(
+            db,
+            [
+                {"url": f"https://example.com/{i}", "title": str(i), "text": "x"}
+                for i in range(3)
+            ],
+        )
+        crud.create_signals_bulk(
+            db,
+            [
+                {"article_id": article.id, "events": [], "score": float(i)}
+                for i, article in enumerate(articles)
+            ],
+        )
+        expected = crud.list_signal_fields(db, limit=2)
+        first_id = articles[0].id
+
+    async def read():
+        async_engine = create_async_engine(async_url(url))
+        async with async_sessionmaker(async_engine)() as db:
+            rows = await async_crud.list_signal_fields(db, limit=2)
+            titles = await async_crud.list_signal_fields(
+                db, fields=["article.title"], limit=2
+            )
+            exists = await async_crud.article_exists(db, first_id)
+        await async_engine.dispose()
+        return rows, titles, exists
+
+    rows, titles, exists = asyncio.run(read())
+    assert rows == expected
+    assert [row["article.title"] for row in titles] == ["2", "1"]
+    assert exists
+
+
+def _signals_client(tmp_path, monkeypatch, signals):
+    """TestClient, dessen Endpunkte eine SQLite‑Datenbank lesen.
+
+    Legt pro Eintrag in ``signals`` einen Artikel samt Signal an und
+    liefert den Client, die IDs der Signale sowie eine Liste, in der alle
+    ausgeführten SQL‑Anweisungen landen.
+    """
+    import pytest
+
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src.api.main import app
+    from econ_signals_tool.src.db import crud, models
+    from econ_signals_tool.src.db.database import async_url, get_async_db
+
+    url = f"sqlite:///{tmp_path / 'api.db'}"
+    engine = create_engine(url)
+    models.Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        articles = crud.create_articles_bulk(
+            db,
+            [
+                {
+                    "url": f"https://example.com/{i}",
+                    "title": f"Titel {i}",
+                    "text": "Volltext",
+                }
+                for i in range(len(signals))
+            ],
+        )
+        ids = [
+            signal.id
+            for signal in crud.create_signals_bulk(
+                db,
+                [
+                    dict({"events": [], "score": 0.0}, **signal, article_id=article.id)
+                    for signal, article in zip(signals, articles)
+                ],
+            )
+        ]
+
+    async_engine = create_async_engine(async_url(url))
+    statements = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    session_factory = async_sessionmaker(async_engine)
+
+    async def get_test_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, get_test_db)
+    return TestClient(app), ids, statements
+
+
+def test_signals_cursor_pages_through_ties(tmp_path, monkeypatch) -> None:
+    base = datetime(2024, 3, 1, 12)
+    # Je zwei Signale teilen sich einen Zeitstempel
+    created = [base, base, base.replace(hour=13), base.replace(hour=13), base]
+    client, ids, _ = _signals_client(
+        tmp_path, monkeypatch, [{"created_at": value} for value in created]
+    )
+    expected = [signal_id for _, signal_id in sorted(zip(created, ids), reverse=True)]
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/signals", params=params)
+        assert response.status_code == 200
+        seen += [item["id"] for item in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 3
+
+    for cursor in ["kein-cursor", "Zm9v", "MjAyNC0wMy0wMXx4"]:
+        response = client.get("/signals", params={"cursor": cursor})
+        assert response.status_code == 400
+
+
+def test_signals_fields_select_only_requested_columns(tmp_path, monkeypatch) -> None:
+    client, ids, statements = _signals_client(
+        tmp_path, monkeypatch, [{"score": 1.5, "events": ["merger"]}]
+    )
+
+    def selects():
+        return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+    response = client.get("/signals")
+    assert response.status_code == 200
+    (item,) = response.json()
+    assert item["id"] == ids[0]
+    assert item["events"] == ["merger"]
+    assert item["article"]["title"] == "Titel 0"
+    assert "text" not in item["article"]
+    assert "articles.text" not in selects()[-1]
+
+    statements.clear()
+    response = client.get("/signals", params={"fields": "id,article.title"})
+    assert response.json() == [{"id": ids[0], "article": {"title": "Titel 0"}}]
+    (select,) = selects()
+    assert "articles.title" in select
+    assert "score" not in select and "articles.text" not in select
+
+    statements.clear()
+    response = client.get("/signals", params={"fields": "id, score"})
+    assert response.json() == [{"id": ids[0], "score": 1.5}]
+    (select,) = selects()
+    assert "articles" not in select and "events" not in select
+
+    response = client.get("/signals", params={"fields": "id,article.body,secret"})
+    assert response.status_code == 400
+    assert "article.body" in response.json()["detail"]
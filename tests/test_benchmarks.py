@@ -0,0 +1,63 @@
+"""
+Tests für die Benchmarks der Pipeline‑Stufen.
+"""
+
+from econ_signals_tool.src.benchmarks.corpus import generate_corpus
+from econ_signals_tool.src.benchmarks.run import compare, percentile, run_benchmarks
+
+
+def test_corpus_is_deterministic() -> None:
+    first = generate_corpus(20, seed=7)
+    second = generate_corpus(20, seed=7)
+    assert [a.text for a in first] == [a.text for a in second]
+    assert len({a.url for a in first}) == 20
+
+
+def test_percentile_and_compare() -> None:
+    assert percentile([0.3, 0.1, 0.2, 0.4], 50) == 0.2
+    assert percentile([0.3, 0.1, 0.2, 0.4], 99) == 0.4
+    baseline = {"stage": {"items_per_sec": 100.0, "p99_ms": 10.0}}
+    assert compare({"stage": {"items_per_sec": 90.0, "p99_ms": 11.0}}, baseline) == []
+    slower = compare({"stage": {"items_per_sec": 50.0, "p99_ms": 30.0}}, baseline)
+    assert len(slower) == 2
+
+
+def test_run_benchmarks_on_sqlite() -> None:
+    results = run_benchmarks(
+        articles=30,
+        stages=[
+            "rss_parse",
+            "classify_events",
+            "classify_events_large",
+            "heuristic_score",
+            "crud_write",
+        ],
+        batch_size=10,
+        keywords=100,
+    )
+    assert results["classify_events_large"]["items"] == 30
+    assert results["rss_parse"]["items"] == 30
+    assert results["crud_write"]["items"] == 30
+    assert results["crud_write"]["calls"] == 3
+    assert all(stage["items_per_sec"] > 0 for stage in results.values())
+
+
+def test_repeated_runs_against_one_database(tmp_path) -> None:
+    from sqlalchemy import create_engine, func
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src.db import models
+
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    for _ in range(2):
+        results = run_benchmarks(
+            articles=20,
+            database_url=url,
+            stages=["crud_write", "store_articles"],
+            batch_size=10,
+        )
+        assert results["crud_write"]["items"] == 20
+        assert results["store_articles"]["items"] == 20
+    with sessionmaker(bind=create_engine(url))() as db:
+        for model in (models.Article, models.Signal, models.ArticleLSHBand):
+            assert db.query(func.count()).select_from(model).scalar() == 0
@@ -0,0 +1,195 @@
+"""
+Tests für die Datenbankfunktionen auf SQLite.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from econ_signals_tool.src.db import crud, models
+
+
+def _session(tmp_path) -> Session:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    models.Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _articles(db: Session, count: int, prefix: str = "a") -> list:
+    return crud.create_articles_bulk(
+        db,
+        [
+            {"url": f"https://example.com/{prefix}{i}", "title": str(i), "text": "x"}
+            for i in range(count)
+        ],
+    )
+
+
+def test_update_rollups_is_incremental(tmp_path) -> None:
+    day = datetime(2024, 3, 1, 9, 30)
+    with _session(tmp_path) as db:
+        articles = _articles(db, 7)
+        crud.create_signals_bulk(
+            db,
+            [
+                {
+                    "article_id": article.id,
+                    "sentiment_label": label,
+                    "events": events,
+                    "score": score,
+                    "created_at": created_at,
+                }
+                for article, (label, events, score, created_at) in zip(
+                    articles,
+                    [
+                        ("Positive", ["merger"], 1.0, day),
+                        ("negative", [], -2.0, day + timedelta(minutes=10)),
+                        # Ohne Zeitstempel: wird übersprungen
+                        ("neutral", [], 5.0, None),
+                        ("positive", ["merger"], 0.5, day + timedelta(hours=1)),
+                        ("positive", ["dividend"], 1.5, day + timedelta(days=1)),
+                        # Noch zu jung für den ersten Lauf
+                        ("negative", ["merger"], -1.0, datetime.utcnow()),
+                        ("positive", [], 2.0, datetime.utcnow()),
+                    ],
+                )
+            ],
+        )
+
+        # Der Bulk‑INSERT setzt für ``None`` den Standardwert ein
+        db.execute(
+            update(models.Signal)
+            .where(models.Signal.article_id == articles[2].id)
+            .values(created_at=None)
+        )
+        db.commit()
+
+        # Vier alte Signale über mehrere Blöcke, das NULL‑Signal blockiert nicht
+        assert crud.update_rollups(db, chunk_size=2) == 4
+        first_day = crud.get_rollups(db, "day", end=datetime(2024, 3, 2))
+        assert [(r.signal_count, r.score_sum) for r in first_day] == [(3, -0.5)]
+        assert first_day[0].sentiment_counts == {"positive": 2, "negative": 1}
+        assert first_day[0].event_counts == {"merger": 2}
+        hours = crud.get_rollups(db, "hour", end=datetime(2024, 3, 2))
+        assert [r.signal_count for r in hours] == [2, 1]
+        watermark = db.get(models.RollupWatermark, "signals")
+        assert watermark.last_signal_id == articles[4].id
+
+        # Zweiter Lauf: nur neue, alt genug gewordene Signale
+        later = _articles(db, 2, prefix="b")
+        crud.create_signals_bulk(
+            db,
+            [
+                {
+                    "article_id": article.id,
+                    "sentiment_label": "negative",
+                    "events": ["merger"],
+                    "score": -1.0,
+                    "created_at": day + timedelta(minutes=45),
+                }
+                for article in later
+            ],
+        )
+        assert crud.update_rollups(db, chunk_size=2) == 0
+        assert crud.update_rollups(db, chunk_size=2, lag=timedelta(0)) == 4
+        first_day = crud.get_rollups(db, "day", end=datetime(2024, 3, 2))
+        assert [(r.signal_count, r.score_sum) for r in first_day] == [(5, -2.5)]
+        assert first_day[0].sentiment_counts == {"positive": 2, "negative": 3}
+        assert first_day[0].event_counts == {"merger": 4}
+        assert crud.update_rollups(db, lag=timedelta(0)) == 0
+        total = sum(r.signal_count for r in crud.get_rollups(db, "day"))
+        assert total == 8
+
+
+def test_create_articles_bulk_returns_only_new_rows(tmp_path) -> None:
+    with _session(tmp_path) as db:
+        first = _articles(db, 2)
+        rows = [
+            {"url": "https://example.com/a1", "title": "neu", "text": "x"},
+            {"url": "https://example.com/c0", "title": "c0", "text": "x"},
+            {"url": "https://example.com/a0", "title": "neu", "text": "x"},
+            {"url": "https://example.com/c1", "title": "c1", "text": "x"},
+        ]
+        created = crud.create_articles_bulk(db, rows)
+        assert [article.title for article in created] == ["c0", "c1"]
+        assert crud.create_articles_bulk(db, rows) == []
+        # Vorhandene Artikel bleiben unverändert
+        assert [db.get(models.Article, a.id).title for a in first] == ["0", "1"]
+
+
+def test_create_signals_bulk_keeps_input_order(tmp_path) -> None:
+    with _session(tmp_path) as db:
+        articles = _articles(db, 5)
+        order = [3, 0, 4, 1, 2]
+        signals = crud.create_signals_bulk(
+            db,
+            [
+                {"article_id": articles[i].id, "events": [], "score": float(i)}
+                for i in order
+            ],
+        )
+        assert [signal.article_id for signal in signals] == [
+            articles[i].id for i in order
+        ]
+        assert [signal.score for signal in signals] == [float(i) for i in order]
+        assert crud.create_signals_bulk(db, []) == []
+
+
+def test_rescore_signals_matches_score_rows(tmp_path) -> None:
+    from econ_signals_tool.src.scoring.batch import score_rows
+
+    rows = [
+        ("Negative", 0.9, ["merger", "dividend"]),
+        ("positive", 0.6, ["earnings warning"]),
+        ("neutral", None, []),
+        (None, None, None),
+        ("positive", 0.8, ["unbekannt"]),
+    ]
+    sentiment_weights = {"positive": 2.0, "negative": -3.0}
+    event_weights = {"merger": 0.5, "dividend": 1.5, "earnings warning": -4.0}
+    with _session(tmp_path) as db:
+        articles = _articles(db, len(rows))
+        crud.create_signals_bulk(
+            db,
+            [
+                {
+                    "article_id": article.id,
+                    "sentiment_label": label,
+                    "sentiment_score": prob,
+                    "events": events,
+                    "score": 0.0,
+                }
+                for article, (label, prob, events) in zip(articles, rows)
+            ],
+        )
+        assert crud.rescore_signals(
+            db,
+            sentiment_weights=sentiment_weights,
+            event_weights=event_weights,
+            chunk_size=2,
+        ) == len(rows)
+        scores = db.scalars(select(models.Signal.score).order_by(models.Signal.id))
+        expected = score_rows(
+            *zip(*rows),
+            sentiment_weights=sentiment_weights,
+            event_weights=event_weights,
+        )
+        assert [round(s, 6) for s in scores] == [round(e, 6) for e in expected]
+
+
+def test_rescore_statement_compiles_for_postgres() -> None:
+    from sqlalchemy.dialects import postgresql
+
+    compiled = crud._rescore_stmt(
+        {"positive": 2.0, "negative": -3.0}, {"merger": 0.5, "ignored": 0.0}
+    ).compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+    assert sql.startswith("UPDATE signals SET score=")
+    assert "CASE lower(signals.sentiment_label) WHEN" in sql
+    assert "coalesce(signals.sentiment_score" in sql
+    assert sql.count("signals.events @>") == 1
+    assert "WHERE" not in sql
+    params = list(compiled.params.values())
+    assert all(weight in params for weight in [2.0, -3.0, 0.5])
+    assert ["merger"] in params
@@ -7,3 +7,320 @@ from econ_signals_tool.src.ingestion.rss_fetcher import parse_date
 
 def test_parse_date_none() -> None:
     assert parse_date(None) is None
+
+
+def test_download_articles_from_stub_server() -> None:
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from econ_signals_tool.src.ingestion.article_processor import download_articles
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/missing":
+                self.send_error(404)
+                return
+            body = (
+                f"<html><head><title>Artikel {self.path}</title></head>"
+                f"<body><p>Text zu {self.path}.</p></body></html>"
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        urls = [f"{base}/a", f"{base}/b", f"{base}/c", f"{base}/missing"]
+        results = list(
+            download_articles(urls, per_host=2, timeout=5, retries=1, backoff=0)
+        )
+    finally:
+        server.shutdown()
+    assert sorted(r.url for r in results) == urls[:3]
+    assert all(r.title.startswith("Artikel") for r in results)
+
+
+def test_fetch_rss_feed_skips_seen_entries(tmp_path) -> None:
+    from econ_signals_tool.src.ingestion.rss_fetcher import (
+        FeedState,
+        fetch_rss_feed,
+        mark_seen,
+    )
+
+    items = "".join(
+        f"<item><title>Titel {i}</title><link>https://example.com/{i}</link>"
+        f"<guid>id-{i}</guid></item>"
+        for i in range(3)
+    )
+    feed_file = tmp_path / "feed.xml"
+    feed_file.write_text(
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+        f"{items}</channel></rss>",
+        encoding="utf-8",
+    )
+    state = FeedState(seen_guids=["id-0"])
+    entries = fetch_rss_feed(str(feed_file), state)
+    assert [entry.guid for entry in entries] == ["id-1", "id-2"]
+    # Gesehen sind Einträge erst nach dem Speichern ihrer Artikel
+    assert len(fetch_rss_feed(str(feed_file), state)) == 2
+    mark_seen(state, [entry.guid for entry in entries])
+    assert fetch_rss_feed(str(feed_file), state) == []
+
+
+def test_failed_download_is_retried_on_next_refresh(tmp_path, monkeypatch) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src import refresh
+    from econ_signals_tool.src.db import crud, models
+    from econ_signals_tool.src.ingestion.article_processor import ArticleContent
+
+    urls = ["https://example.com/a", "https://example.com/b"]
+    items = "".join(
+        f"<item><title>{url}</title><link>{url}</link><guid>id-{url[-1]}</guid></item>"
+        for url in urls
+    )
+    feed_file = tmp_path / "feed.xml"
+    feed_file.write_text(
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+        f"{items}</channel></rss>",
+        encoding="utf-8",
+    )
+    failing = {urls[1]}
+
+    def download(links):
+        for url in links:
+            if url not in failing:
+                text = " ".join(f"{url[-1]}wort{i}" for i in range(50))
+                yield ArticleContent(
+                    url=url, title=url, text=text, authors=[], publish_date=None
+                )
+
+    monkeypatch.setattr(refresh, "download_articles", download)
+    monkeypatch.setattr(refresh, "process_articles", lambda db, articles: articles)
+    engine = create_engine(f"sqlite:///{tmp_path / 'refresh.db'}")
+    models.Base.metadata.create_all(engine)
+    feed_url = str(feed_file)
+
+    with sessionmaker(bind=engine)() as db:
+        refresh.refresh_feeds(db, [feed_url])
+        assert crud.get_existing_urls(db, urls) == {urls[0]}
+        assert refresh.load_feed_state(db, feed_url).seen_guids == ["id-a"]
+
+        failing.clear()
+        refresh.refresh_feeds(db, [feed_url])
+        assert crud.get_existing_urls(db, urls) == set(urls)
+        seen = refresh.load_feed_state(db, feed_url).seen_guids
+        assert sorted(seen) == ["id-a", "id-b"]
+
+
+def _signal_writer(failures: int):
+    """Ersatz für ``process_articles``, der die ersten Aufrufe scheitern lässt."""
+    from econ_signals_tool.src.db import crud
+
+    calls = []
+
+    def process(db, articles):
+        calls.append([article.id for article in articles])
+        if len(calls) <= failures:
+            raise RuntimeError("FinBERT nicht verfügbar")
+        return crud.create_signals_bulk(
+            db,
+            [
+                {"article_id": article.id, "events": [], "score": 1.0}
+                for article in articles
+            ],
+        )
+
+    return process, calls
+
+
+def test_failed_processing_is_retried_on_next_refresh(tmp_path, monkeypatch) -> None:
+    from datetime import datetime, timedelta
+
+    import pytest
+    from sqlalchemy import create_engine, func, update
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src import refresh
+    from econ_signals_tool.src.db import models
+    from econ_signals_tool.src.ingestion.article_processor import ArticleContent
+
+    url = "https://example.com/a"
+    feed_file = tmp_path / "feed.xml"
+    feed_file.write_text(
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+        f"<item><title>A</title><link>{url}</link><guid>id-a</guid></item>"
+        "</channel></rss>",
+        encoding="utf-8",
+    )
+
+    def download(links):
+        for link in links:
+            text = " ".join(f"wort{i}" for i in range(50))
+            yield ArticleContent(
+                url=link, title=link, text=text, authors=[], publish_date=None
+            )
+
+    process, calls = _signal_writer(failures=1)
+    monkeypatch.setattr(refresh, "download_articles", download)
+    monkeypatch.setattr(refresh, "process_articles", process)
+    engine = create_engine(f"sqlite:///{tmp_path / 'refresh.db'}")
+    models.Base.metadata.create_all(engine)
+    feed_url = str(feed_file)
+
+    with sessionmaker(bind=engine)() as db:
+        with pytest.raises(RuntimeError):
+            refresh.refresh_feeds(db, [feed_url])
+        assert db.query(func.count(models.Signal.id)).scalar() == 0
+        assert refresh.load_feed_state(db, feed_url).seen_guids == []
+        # Zu junge Artikel gelten als noch in Arbeit
+        assert refresh.unprocessed_article_ids(db) == []
+
+        db.execute(
+            update(models.Article).values(
+                created_at=datetime.utcnow() - timedelta(hours=1)
+            )
+        )
+        db.commit()
+        assert refresh.refresh_feeds(db, [feed_url]) == 1
+        assert db.query(func.count(models.Signal.id)).scalar() == 1
+        assert refresh.load_feed_state(db, feed_url).seen_guids == ["id-a"]
+        assert refresh.unprocessed_article_ids(db, retry_after=0) == []
+    assert len(calls) == 2
+
+
+def test_process_articles_task_retries_failed_block(tmp_path, monkeypatch) -> None:
+    from sqlalchemy import create_engine, func
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src import tasks
+    from econ_signals_tool.src.db import crud, models
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    models.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    process, calls = _signal_writer(failures=1)
+    monkeypatch.setattr(tasks, "SessionLocal", session_factory)
+    monkeypatch.setattr(tasks, "process_articles", process)
+
+    with session_factory() as db:
+        articles = crud.create_articles_bulk(
+            db,
+            [
+                {"url": f"https://example.com/{i}", "title": str(i), "text": "x"}
+                for i in range(2)
+            ],
+        )
+        ids = [article.id for article in articles]
+        crud.create_signals_bulk(
+            db, [{"article_id": ids[0], "events": [], "score": 0.0}]
+        )
+
+    result = tasks.process_articles_task.apply(args=[ids])
+    assert result.get() == 1
+    # Der Artikel mit Signal wird nicht erneut verarbeitet
+    assert calls == [[ids[1]], [ids[1]]]
+    with session_factory() as db:
+        assert db.query(func.count(models.Signal.id)).scalar() == 2
+
+
+def test_store_articles_links_duplicates_to_canonical(tmp_path, monkeypatch) -> None:
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src import refresh
+    from econ_signals_tool.src.db import models
+    from econ_signals_tool.src.ingestion.article_processor import ArticleContent
+
+    words = [f"wort{i}" for i in range(200)]
+    texts = {
+        "a": " ".join(words),
+        # Kopie von ``a`` im selben Block
+        "a-copy": " ".join(words[:-2] + ["Reuters", "berichtete"]),
+        "b": " ".join(f"anders{i}" for i in range(200)),
+        # Kopie des bereits gespeicherten ``a``
+        "a-later": " ".join(["Eilmeldung", "heute"] + words[2:]),
+        "c": " ".join(f"drittes{i}" for i in range(200)),
+        # Zu kurz für eine Signatur, auch wenn die Texte gleich sind
+        "short-1": "Dax schließt fester",
+        "short-2": "Dax schließt fester",
+    }
+
+    def download(links):
+        for url in links:
+            name = url.rsplit("/", 1)[-1]
+            yield ArticleContent(
+                url=url, title=name, text=texts[name], authors=[], publish_date=None
+            )
+
+    processed = []
+    monkeypatch.setattr(refresh, "download_articles", download)
+    monkeypatch.setattr(
+        refresh,
+        "process_articles",
+        lambda db, articles: processed.extend(a.url for a in articles) or articles,
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}")
+    models.Base.metadata.create_all(engine)
+
+    def link(name):
+        return f"https://example.com/{name}"
+
+    with sessionmaker(bind=engine)() as db:
+        refresh.download_and_process(db, [link("a"), link("a-copy"), link("b")])
+        refresh.download_and_process(
+            db, [link(name) for name in ["a-later", "c", "short-1", "short-2"]]
+        )
+        articles = {
+            article.url.rsplit("/", 1)[-1]: article
+            for article in db.scalars(select(models.Article))
+        }
+        banded = set(db.scalars(select(models.ArticleLSHBand.article_id)))
+
+    canonical = {name for name, article in articles.items() if not article.canonical_id}
+    assert canonical == {"a", "b", "c", "short-1", "short-2"}
+    assert articles["a-copy"].canonical_id == articles["a"].id
+    assert articles["a-later"].canonical_id == articles["a"].id
+    assert banded == {articles[name].id for name in ["a", "b", "c"]}
+    assert articles["short-1"].minhash is None
+    assert sorted(processed) == sorted(link(name) for name in canonical)
+
+
+def test_normalize_url_strips_tracking_and_trailing_slash() -> None:
+    from econ_signals_tool.src.ingestion.urls import normalize_url
+
+    url = "HTTPS://WWW.Example.com:443/Artikel/123/?utm_source=rss&b=2&a=1#kommentare"
+    assert normalize_url(url) == "https://www.example.com/Artikel/123?a=1&b=2"
+    assert normalize_url("https://example.com") == "https://example.com/"
+    assert normalize_url("https://example.com/a/?wt_mc=rss") == normalize_url(
+        "https://example.com/a"
+    )
+
+
+def test_minhash_detects_near_duplicates() -> None:
+    from econ_signals_tool.src.ingestion import dedup
+
+    words = [f"wort{i}" for i in range(200)]
+    original = " ".join(words)
+    edited = " ".join(words[:-2] + ["Reuters", "berichtete"])
+    other = " ".join(f"anders{i}" for i in range(200))
+
+    first = dedup.Fingerprint.from_text(original)
+    second = dedup.Fingerprint.from_text(edited)
+    third = dedup.Fingerprint.from_text(other)
+    assert dedup.similarity(first.signature, second.signature) >= 0.8
+    assert dedup.similarity(first.signature, third.signature) < 0.2
+    assert set(first.bands) & set(second.bands)
+    restored = dedup.from_bytes(dedup.to_bytes(first.signature))
+    assert (restored == first.signature).all()
+    assert dedup.Fingerprint.from_text("  ...  ") is None
+    assert dedup.Fingerprint.from_text("Dax schließt fester") is None
@@ -2,6 +2,8 @@
 Tests für die NLP‑Komponenten.
 """
 
+import pytest
+
 from econ_signals_tool.src.nlp.events import classify_events
 
 
@@ -10,3 +12,126 @@ def test_classify_events() -> None:
     events = classify_events(text)
     assert "earnings warning" in events
     assert "merger" in events
+
+
+def test_predict_sentiments_batches_by_length(monkeypatch) -> None:
+    from econ_signals_tool.src.nlp import pipeline
+
+    calls = []
+
+    def fake_model(texts, batch_size, truncation):
+        calls.append(list(texts))
+        return [{"label": "neutral", "score": float(len(t))} for t in texts]
+
+    monkeypatch.setattr(pipeline, "get_sentiment_model", lambda: fake_model)
+    texts = ["ccc", "a", "bbbb", "dd"]
+    results = pipeline.predict_sentiments(texts, batch_size=2)
+    assert calls == [["a", "dd"], ["ccc", "bbbb"]]
+    assert [r[0]["score"] for r in results] == [3.0, 1.0, 4.0, 2.0]
+
+
+def test_process_texts_sentiment_only_skips_spacy(monkeypatch) -> None:
+    from econ_signals_tool.src.nlp import pipeline
+
+    def fail():
+        raise AssertionError("spaCy darf nicht geladen werden")
+
+    monkeypatch.setattr(pipeline, "get_spacy_model", fail)
+    monkeypatch.setattr(
+        pipeline,
+        "get_sentiment_model",
+        lambda: lambda texts, **kwargs: [{"label": "neutral", "score": 1.0}]
+        * len(texts),
+    )
+    results = pipeline.process_texts(["a", "b"], features=("sentiment",))
+    assert results == [{"sentiment": [{"label": "neutral", "score": 1.0}]}] * 2
+
+
+def test_event_matcher_positions_and_word_boundary() -> None:
+    from econ_signals_tool.src.nlp.events import EventMatcher
+
+    matcher = EventMatcher({"merger": ["fusion"], "warning": ["profit warning"]})
+    matches = matcher.match("Fusion announced. Profit warning, then another fusion.")
+    assert [(m.start, m.end) for m in matches["merger"]] == [(0, 6), (47, 53)]
+    assert len(matches["warning"]) == 1
+    assert matcher.classify("Some confusion") == ["merger"]
+    strict = EventMatcher({"merger": ["fusion"]}, word_boundary=True)
+    assert strict.classify_many(["Some confusion", "Fusionen"]) == [[], ["merger"]]
+    overlapping = EventMatcher({"a": ["profit"], "b": ["warning"], "c": ["fit warn"]})
+    hits = overlapping.match("PROFIT WARNING")
+    assert [(m.start, m.end) for hit in hits.values() for m in hit] == [
+        (0, 6),
+        (7, 14),
+        (3, 11),
+    ]
+
+
+def test_event_matcher_agrees_with_substring_scan_on_large_rules() -> None:
+    from econ_signals_tool.src.benchmarks.corpus import (
+        generate_corpus,
+        generate_event_rules,
+    )
+    from econ_signals_tool.src.benchmarks.run import _keyword_scan
+    from econ_signals_tool.src.nlp.events import EventMatcher
+
+    rules = generate_event_rules(300)
+    assert sum(len(keywords) for keywords in rules.values()) == 300
+    texts = [article.text for article in generate_corpus(40)]
+    texts.append(" ".join(rules["synthetic 3"]).upper())
+    scan = _keyword_scan(rules)
+    assert EventMatcher(rules).classify_many(texts) == [scan(text) for text in texts]
+
+
+def test_reload_rules_applies_word_boundary() -> None:
+    from econ_signals_tool.src.nlp import events
+
+    try:
+        assert events.reload_rules(word_boundary=True).word_boundary
+        assert events.classify_events("Some confusion") == []
+        assert events.get_matcher().version != events.reload_rules().version
+    finally:
+        events.reload_rules()
+
+
+def test_nlp_cache_computes_each_text_once(monkeypatch) -> None:
+    from econ_signals_tool.src.nlp import cache
+
+    store = cache.NLPCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(cache, "get_cache", lambda: store)
+    computed = []
+
+    def compute(texts):
+        computed.extend(texts)
+        return [len(text) for text in texts]
+
+    assert cache._cached("test", "v1", ["aa", "b", "aa"], compute) == [2, 1, 2]
+    assert cache._cached("test", "v1", ["b", "aa"], compute) == [1, 2]
+    assert computed == ["aa", "b"]
+    assert store.stats()["memory_hits"] == 2
+    assert store.stats()["misses"] == 2
+
+
+def test_compare_backends_reports_agreement(monkeypatch) -> None:
+    from econ_signals_tool.src.nlp import backends
+
+    def fake_loader(label: str, score: float):
+        def model(texts, **kwargs):
+            return [{"label": label, "score": score} for _ in texts]
+
+        return lambda model_name: model
+
+    monkeypatch.setattr(
+        backends,
+        "BACKENDS",
+        {
+            "transformers": fake_loader("positive", 0.9),
+            "quantized": fake_loader("positive", 0.85),
+            "onnx": fake_loader("negative", 0.9),
+        },
+    )
+    report = backends.compare_backends(["a", "b"], "model")
+    assert report["quantized"]["agreement"] == 1.0
+    assert abs(report["quantized"]["max_score_diff"] - 0.05) < 1e-9
+    assert report["onnx"]["agreement"] == 0.0
+    with pytest.raises(ValueError):
+        backends.load_backend("tensorrt", "model")
@@ -11,3 +11,155 @@ def test_heuristic_score() -> None:
     score = heuristic_score(sentiment, events)
     # score = sentiment weight (1 * 0.9) + event weight (2)
     assert abs(score - 2.9) < 0.001
+
+
+def test_batch_scores_match_heuristic_score() -> None:
+    from econ_signals_tool.src.scoring.batch import score_rows
+
+    rows = [
+        ("negative", 0.9, ["earnings warning"]),
+        ("Positive", 0.7, ["dividend", "merger"]),
+        ("neutral", 0.5, []),
+        ("unknown", 0.8, ["unknown event"]),
+        (None, None, None),
+    ]
+    scores = score_rows(
+        [label for label, _, _ in rows],
+        [prob for _, prob, _ in rows],
+        [events for _, _, events in rows],
+    )
+    expected = [
+        heuristic_score(
+            [{"label": label, "score": prob}] if label else [], events or []
+        )
+        for label, prob, events in rows
+    ]
+    assert [round(score, 6) for score in scores] == [round(e, 6) for e in expected]
+    custom = score_rows(["negative"], [1.0], [["merger"]], event_weights={"merger": 3})
+    assert custom.tolist() == [4.0]
+
+
+def test_feature_matrix_and_ml_scorer_roundtrip(tmp_path) -> None:
+    from econ_signals_tool.src.scoring import features
+    from econ_signals_tool.src.scoring.ml import MLScorer, load_scorer
+
+    matrix = features.build_features(
+        ["Negative", None],
+        [0.8, None],
+        [["merger"], None],
+        [[("ACME", "ORG"), ("Berlin", "GPE"), ("x", "UNKNOWN")], []],
+    )
+    assert matrix.shape == (2, len(features.FEATURE_NAMES))
+    row = dict(zip(features.FEATURE_NAMES, matrix[0]))
+    assert row["sentiment_negative"] == 0.8
+    assert row["event_merger"] == 1.0
+    assert (row["entities_ORG"], row["entities_total"]) == (1.0, 3.0)
+    assert not matrix[1].any()
+
+    scorer = MLScorer.fit(matrix.repeat(10, axis=0), [2.0] * 10 + [0.0] * 10, "test")
+    scorer.save(str(tmp_path))
+    loaded = load_scorer(directory=str(tmp_path))
+    assert loaded.version == scorer.version
+    assert loaded.predict(matrix).shape == (2,)
+
+
+def test_ml_rescore_keeps_heuristic_score(tmp_path, monkeypatch) -> None:
+    import numpy as np
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src.db import crud, models
+    from econ_signals_tool.src.scoring import ml
+
+    monkeypatch.setattr(
+        ml, "predict_articles", lambda db, scorer, ids: np.full(len(ids), 9.0)
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'signals.db'}")
+    models.Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        articles = crud.create_articles_bulk(
+            db,
+            [
+                {"url": f"https://example.com/{i}", "title": str(i), "text": "x"}
+                for i in range(3)
+            ],
+        )
+        crud.create_signals_bulk(
+            db,
+            [
+                {"article_id": article.id, "events": [], "score": float(i)}
+                for i, article in enumerate(articles)
+            ],
+        )
+        scorer = ml.MLScorer(model=None, version="v1", feature_version="test")
+        assert ml.rescore_signals(db, scorer, chunk_size=2) == 3
+        assert ml.rescore_signals(db, scorer) == 0
+        rows = crud.list_signal_fields(
+            db, fields=["score", "ml_score", "scorer_version"], limit=3
+        )
+        assert sorted(row["score"] for row in rows) == [0.0, 1.0, 2.0]
+        assert {(row["ml_score"], row["scorer_version"]) for row in rows} == {
+            (9.0, "v1")
+        }
+
+
+def test_train_scorer_uses_labels_not_own_predictions(tmp_path, monkeypatch) -> None:
+    import numpy as np
+    import pytest
+    from sqlalchemy import create_engine, update
+    from sqlalchemy.orm import sessionmaker
+
+    from econ_signals_tool.src.db import crud, models
+    from econ_signals_tool.src.scoring import ml
+
+    monkeypatch.setattr(
+        ml,
+        "get_features",
+        lambda db, ids: np.arange(
+            len(ids) * len(ml.FEATURE_NAMES), dtype=float
+        ).reshape(len(ids), -1),
+    )
+    fitted = []
+    fit = ml.MLScorer.fit.__func__
+
+    def record(cls, features, targets, *args, **kwargs):
+        fitted.append(list(targets))
+        return fit(cls, features, targets, *args, **kwargs)
+
+    monkeypatch.setattr(ml.MLScorer, "fit", classmethod(record))
+    engine = create_engine(f"sqlite:///{tmp_path / 'signals.db'}")
+    models.Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        articles = crud.create_articles_bulk(
+            db,
+            [
+                {"url": f"https://example.com/{i}", "title": str(i), "text": "x"}
+                for i in range(3)
+            ],
+        )
+        signals = crud.create_signals_bulk(
+            db,
+            [
+                {"article_id": articles[i].id, "events": [], "score": score}
+                for i, score in [(0, 1.0), (1, 2.0), (1, 3.0), (2, 4.0)]
+            ],
+        )
+        with pytest.raises(ValueError, match="ML_TARGET=score"):
+            ml.train_scorer(db)
+
+        # Vorhersagen eines früheren Scorers dürfen nie zum Ziel werden
+        db.execute(update(models.Signal).values(ml_score=100.0))
+        for signal, label in zip(signals, [-1.0, 0.5, None, None]):
+            signal.label = label
+        db.commit()
+
+        scorer = ml.train_scorer(db)
+        assert scorer.target == "label"
+        # Artikel 1: neuestes Signal mit Label, Artikel 2 ohne Label
+        assert fitted[-1] == [0.5, -1.0]
+        assert scorer.n_samples == 2
+
+        scorer = ml.train_scorer(db, target="score")
+        assert scorer.target == "score"
+        assert fitted[-1] == [4.0, 3.0, 1.0]
+        assert 100.0 not in fitted[0] + fitted[1]